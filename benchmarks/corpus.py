@@ -0,0 +1,247 @@
+"""
+Generator korpus arsip sintetis untuk benchmark
+
+Menghasilkan dokumen TXT, PDF dan DOCX berbahasa Indonesia/Inggris secara
+deterministik (seed). Ukuran dokumen diatur dalam jumlah paragraf, dan
+sebagian dokumen dapat berupa salinan byte-identik dokumen lain
+(--duplicate-rate) untuk menguji deduplikasi berbasis hash. PDF ditulis
+langsung (satu font standar, tanpa dependensi tambahan); DOCX memakai
+python-docx. Daftar file beserta atributnya ditulis ke
+manifest.jsonl yang dapat dipakai sebagai --manifest pada CLI ingest.
+
+Pemakaian:
+    python benchmarks/corpus.py korpus/ --count 500 --formats txt,pdf,docx --duplicate-rate 0.1
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+import argparse
+import io
+import json
+import random
+import sys
+import zipfile
+
+FORMATS = ("txt", "pdf", "docx")
+LANGUAGES = ("id", "en")
+
+# Kosakata per bahasa untuk judul, pencipta dan isi dokumen
+VOCABULARY = {
+    "id": {
+        "types": ("Laporan", "Surat Keputusan", "Notulen Rapat", "Memorandum", "Peraturan", "Nota Dinas"),
+        "topics": ("Keuangan", "Kepegawaian", "Pendidikan", "Kesehatan", "Infrastruktur", "Pertanian",
+                   "Kearsipan", "Hukum", "Perencanaan", "Pengadaan"),
+        "creators": ("Departemen Keuangan", "Kementerian Pendidikan", "Badan Kepegawaian Negara",
+                     "Dinas Kesehatan Provinsi", "Arsip Nasional Republik Indonesia", "Sekretariat Daerah"),
+        "months": ("Januari", "Februari", "Maret", "April", "Mei", "Juni", "Juli", "Agustus", "September",
+                   "Oktober", "November", "Desember"),
+        "sentences": (
+            "Dokumen ini membahas pelaksanaan program {topic} pada tahun anggaran {year}.",
+            "Kegiatan dilaksanakan oleh unit kerja terkait sesuai dengan rencana strategis.",
+            "Realisasi anggaran mencapai {percent} persen dari pagu yang ditetapkan.",
+            "Hasil evaluasi menunjukkan perlunya koordinasi antar instansi yang lebih baik.",
+            "Arsip ini disimpan sebagai bukti akuntabilitas penyelenggaraan pemerintahan.",
+            "Rapat dihadiri oleh {count} peserta dari berbagai satuan kerja.",
+            "Rekomendasi disampaikan kepada pimpinan untuk ditindaklanjuti.",
+            "Data pendukung terlampir dalam bentuk tabel dan grafik."
+        ),
+        "signature": "Disusun oleh Tim {topic} pada tanggal {day} {month} {year}."
+    },
+    "en": {
+        "types": ("Report", "Decree", "Meeting Minutes", "Memorandum", "Regulation", "Official Note"),
+        "topics": ("Finance", "Personnel", "Education", "Health", "Infrastructure", "Agriculture",
+                   "Records Management", "Law", "Planning", "Procurement"),
+        "creators": ("Ministry of Finance", "Ministry of Education", "National Civil Service Agency",
+                     "Provincial Health Office", "National Archives", "Regional Secretariat"),
+        "months": ("January", "February", "March", "April", "May", "June", "July", "August", "September",
+                   "October", "November", "December"),
+        "sentences": (
+            "This document covers the implementation of the {topic} programme in fiscal year {year}.",
+            "Activities were carried out by the responsible units according to the strategic plan.",
+            "Budget realisation reached {percent} percent of the approved ceiling.",
+            "The evaluation shows that better coordination between agencies is required.",
+            "This record is kept as evidence of accountable public administration.",
+            "The meeting was attended by {count} participants from several work units.",
+            "Recommendations were submitted to management for follow-up.",
+            "Supporting data are attached as tables and charts."
+        ),
+        "signature": "Prepared by the {topic} Team on {month} {day}, {year}."
+    }
+}
+
+SENTENCES_PER_PARAGRAPH = 5
+
+# Waktu tetap untuk properti dan entri ZIP DOCX
+DOCX_TIMESTAMP = datetime(2024, 1, 1)
+
+
+def make_text(index: int, language: str, paragraphs: int, rng: random.Random) -> Dict[str, Any]:
+    """Satu dokumen sintetis: judul, pencipta, tanggal dan paragraf isi"""
+    words = VOCABULARY[language]
+    topic = rng.choice(words["topics"])
+    year = rng.randint(1950, 2024)
+    title = f"{rng.choice(words['types'])} {topic} {year} No. {index}"
+    creator = rng.choice(words["creators"])
+    values = {
+        "topic": topic.lower(), "year": year, "percent": rng.randint(40, 100), "count": rng.randint(5, 80),
+        "day": rng.randint(1, 28), "month": rng.choice(words["months"])
+    }
+    body = [
+        " ".join(rng.choice(words["sentences"]).format(**values) for _ in range(SENTENCES_PER_PARAGRAPH))
+        for _ in range(max(1, paragraphs))
+    ]
+    body.append(words["signature"].format(**{**values, "topic": topic}))
+    return {"title": title, "creator": creator, "year": year, "language": language, "paragraphs": [creator, *body]}
+
+
+def render_txt(document: Dict[str, Any]) -> bytes:
+    return "\n\n".join([document["title"], *document["paragraphs"]]).encode("utf-8")
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str, width: int) -> List[str]:
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + len(word) + 1 > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def render_pdf(document: Dict[str, Any], lines_per_page: int = 48, width: int = 90) -> bytes:
+    """PDF minimal (Helvetica, WinAnsi) dengan satu content stream per halaman"""
+    lines: List[str] = [document["title"], ""]
+    for paragraph in document["paragraphs"]:
+        lines.extend(_wrap(paragraph, width))
+        lines.append("")
+    pages = [lines[start:start + lines_per_page] for start in range(0, len(lines), lines_per_page)]
+
+    # Objek 1: catalog, 2: pages, 3: font; halaman dan stream mulai dari objek 4
+    objects: List[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    page_ids = []
+    for page_lines in pages:
+        commands = ["BT", "/F1 10 Tf", "12 TL", "50 790 Td"]
+        commands.extend(f"({_pdf_escape(line)}) Tj T*" for line in page_lines)
+        commands.append("ET")
+        stream = "\n".join(commands).encode("cp1252", errors="replace")
+        page_id, content_id = len(objects) + 1, len(objects) + 2
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {content_id} 0 R >>".encode("latin-1")
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(page_id)
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>".encode("latin-1")
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    output.writelines(b"%010d 00000 n \n" % offset for offset in offsets)
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return output.getvalue()
+
+
+def render_docx(document: Dict[str, Any]) -> bytes:
+    import docx
+
+    result = docx.Document()
+    result.core_properties.author = document["creator"]
+    result.core_properties.title = document["title"]
+    result.core_properties.created = result.core_properties.modified = DOCX_TIMESTAMP
+    result.add_heading(document["title"], level=1)
+    for paragraph in document["paragraphs"]:
+        result.add_paragraph(paragraph)
+    saved = io.BytesIO()
+    result.save(saved)
+
+    # Tulis ulang arsip ZIP dengan waktu entri tetap agar byte keluaran deterministik
+    output = io.BytesIO()
+    with zipfile.ZipFile(saved) as source, zipfile.ZipFile(output, "w") as target:
+        for info in source.infolist():
+            entry = zipfile.ZipInfo(info.filename, DOCX_TIMESTAMP.timetuple()[:6])
+            entry.compress_type = zipfile.ZIP_DEFLATED
+            target.writestr(entry, source.read(info))
+    return output.getvalue()
+
+
+RENDERERS = {"txt": render_txt, "pdf": render_pdf, "docx": render_docx}
+
+
+def generate_corpus(output_dir: str, count: int, formats: Sequence[str] = FORMATS,
+                    languages: Sequence[str] = LANGUAGES, paragraphs: int = 8, size_jitter: float = 0.5,
+                    duplicate_rate: float = 0.0, seed: int = 42) -> List[Dict[str, Any]]:
+    """Tulis count dokumen ke output_dir beserta manifest.jsonl; kembalikan entri manifest"""
+    rng = random.Random(seed)
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    entries: List[Dict[str, Any]] = []
+    originals: List[Dict[str, Any]] = []
+    for index in range(count):
+        if originals and rng.random() < duplicate_rate:
+            # Salinan byte-identik dengan nama file berbeda
+            source = rng.choice(originals)
+            path = directory / f"doc_{index:06d}.{source['format']}"
+            path.write_bytes(Path(source["path"]).read_bytes())
+            entries.append({**source, "path": str(path), "duplicate_of": source["path"]})
+            continue
+
+        file_format = rng.choice(list(formats))
+        language = rng.choice(list(languages))
+        size = max(1, round(paragraphs * (1 + rng.uniform(-size_jitter, size_jitter))))
+        document = make_text(index, language, size, rng)
+        content = RENDERERS[file_format](document)
+        path = directory / f"doc_{index:06d}.{file_format}"
+        path.write_bytes(content)
+        entry = {
+            "path": str(path), "format": file_format, "language": language, "paragraphs": size,
+            "bytes": len(content), "title": document["title"], "duplicate_of": None
+        }
+        entries.append(entry)
+        originals.append(entry)
+
+    with open(directory / "manifest.jsonl", "w", encoding="utf-8") as manifest:
+        for entry in entries:
+            manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return entries
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generator korpus arsip sintetis")
+    parser.add_argument("output_dir")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--formats", default=",".join(FORMATS), help="Daftar format, mis. txt,pdf,docx")
+    parser.add_argument("--languages", default=",".join(LANGUAGES), help="Daftar bahasa, mis. id,en")
+    parser.add_argument("--paragraphs", type=int, default=8, help="Rata-rata jumlah paragraf per dokumen")
+    parser.add_argument("--size-jitter", type=float, default=0.5, help="Variasi relatif jumlah paragraf")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0, help="Proporsi dokumen salinan identik")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    entries = generate_corpus(
+        args.output_dir, args.count, [f for f in args.formats.split(",") if f],
+        [language for language in args.languages.split(",") if language], args.paragraphs,
+        args.size_jitter, args.duplicate_rate, args.seed
+    )
+    duplicates = sum(1 for entry in entries if entry["duplicate_of"])
+    total_bytes = sum(entry["bytes"] for entry in entries)
+    print(f"{len(entries)} files ({duplicates} duplicates, {total_bytes / 1e6:.1f} MB) in {args.output_dir}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Benchmark waktu impor lapisan library
+
+Setiap modul diimpor di interpreter baru (subprocess) beberapa kali; hasil
+berupa median waktu impor dan daftar dependensi berat yang ikut termuat.
+Lapisan library seharusnya dapat diimpor tanpa Streamlit, Gemini, pandas,
+PyPDF2 maupun python-docx.
+
+Pemakaian:
+    python benchmarks/import_time.py [--repeat 5] [--json hasil.json] [modul ...]
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Modul yang diukur secara default
+DEFAULT_MODULES = (
+    "metadata_curator_agent",
+    "database",
+    "utils",
+    "validation_rules",
+    "streaming_metrics",
+    "entity_resolution",
+    "similarity_index",
+    "linked_data",
+    "triple_store",
+    "job_queue",
+    "incremental_analysis"
+)
+
+# Dependensi berat yang tidak boleh termuat oleh lapisan library
+HEAVY_MODULES = ("streamlit", "google.generativeai", "pandas", "numpy", "PyPDF2", "docx")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure(module: str, repeat: int = 5) -> Dict[str, Any]:
+    """Median waktu impor satu modul di interpreter baru"""
+    timings: List[float] = []
+    heavy: List[str] = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines()
+            return {"module": module, "error": error[-1] if error else "import failed"}
+        probe = json.loads(completed.stdout.strip().splitlines()[-1])
+        timings.append(probe["seconds"])
+        heavy = probe["heavy"]
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "max_ms": round(max(timings) * 1000, 2),
+        "heavy_modules": heavy
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark waktu impor modul library")
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", help="Simpan hasil ke file JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure(module, args.repeat) for module in args.modules]
+    for result in results:
+        if "error" in result:
+            print(f"{result['module']:<24} ERROR {result['error']}")
+        else:
+            heavy = ", ".join(result["heavy_modules"]) or "-"
+            print(f"{result['module']:<24} {result['median_ms']:>9.2f} ms  (max {result['max_ms']:.2f})  heavy: {heavy}")
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps({"python": sys.version.split()[0], "results": results}, indent=2),
+                                        encoding="utf-8")
+
+    # Kode keluar non-nol jika ada modul yang gagal diimpor atau memuat dependensi berat
+    return int(any("error" in result or result["heavy_modules"] for result in results))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
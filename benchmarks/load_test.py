@@ -0,0 +1,187 @@
+"""
+Load test layanan HTTP ekstraksi (extraction_service)
+
+Secara default server dijalankan di proses yang sama dengan OfflineModel
+(latensi model disimulasikan) dan database sementara, sehingga tidak perlu
+API key. Klien asyncio memakai koneksi keep-alive; sebagian request dibuat
+identik (--duplicate-rate) untuk mengukur efek coalescing, dan concurrency
+di atas kapasitas worker + antrian memperlihatkan backpressure (503).
+
+Pemakaian:
+    python benchmarks/load_test.py --requests 2000 --concurrency 64 --duplicate-rate 0.3
+    python benchmarks/load_test.py --url http://127.0.0.1:8080 --endpoint search
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from curator_agent import EnhancedMetadataCuratorAgent  # noqa: E402
+from database import MetadataDatabase  # noqa: E402
+from extraction_service import ExtractionService  # noqa: E402
+from offline_model import OfflineModel  # noqa: E402
+
+ENDPOINTS = ("extract", "validate", "search", "mixed")
+
+TOPICS = ("keuangan", "kepegawaian", "pendidikan", "kesehatan", "infrastruktur", "pertanian", "arsip", "hukum")
+CREATORS = ("Departemen Keuangan", "Kementerian Pendidikan", "Badan Kepegawaian Negara", "Dinas Kesehatan")
+
+
+def make_document(index: int, rng: random.Random) -> str:
+    topic = rng.choice(TOPICS)
+    return (
+        f"Laporan {topic.title()} Nomor {index}\n\n{rng.choice(CREATORS)}\n\n"
+        f"Dokumen ini membahas program {topic} tahun {rng.randint(1990, 2024)} "
+        f"dan disusun oleh Tim {topic.title()} pada tanggal {rng.randint(1, 28)} Maret {rng.randint(1990, 2024)}."
+    )
+
+
+def build_requests(count: int, endpoint: str, duplicate_rate: float, seed: int) -> List[Tuple[str, Dict[str, Any]]]:
+    """Daftar (path, body); request duplikat memakai ulang dokumen dari kumpulan kecil"""
+    rng = random.Random(seed)
+    hot = [make_document(-index, rng) for index in range(1, 9)]
+    requests = []
+    for index in range(count):
+        text = rng.choice(hot) if rng.random() < duplicate_rate else make_document(index, rng)
+        name = endpoint if endpoint != "mixed" else rng.choice(ENDPOINTS[:3])
+        if name == "extract":
+            body = {"text": text, "file_name": "dokumen.txt"}
+        elif name == "validate":
+            body = {"metadata": {"dublin_core": {"title": text.splitlines()[0], "description": text, "date": "2020-01-01"}}}
+        else:
+            body = {"query": text.splitlines()[0], "k": 5}
+        requests.append((f"/{name}", body))
+    return requests
+
+
+async def http_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, method: str,
+                       path: str, body: Optional[Dict[str, Any]] = None) -> Tuple[int, Dict[str, Any]]:
+    """Kirim satu request pada koneksi keep-alive; kembalikan (status, body JSON)"""
+    data = json.dumps(body).encode("utf-8") if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+    )
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    status = int(head[0].split(" ")[1])
+    headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(":") for line in head[1:]) if name}
+    payload = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, json.loads(payload) if payload else {}
+
+
+async def run_clients(host: str, port: int, requests: List[Tuple[str, Dict[str, Any]]],
+                      concurrency: int) -> Tuple[List[float], Counter, float]:
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in requests:
+        queue.put_nowait(item)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while not queue.empty():
+                path, body = queue.get_nowait()
+                started = time.perf_counter()
+                status, _ = await http_request(reader, writer, host, "POST", path, body)
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[status] += 1
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+async def health(host: str, port: int) -> Dict[str, Any]:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return (await http_request(reader, writer, host, "GET", "/health"))[1]
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(fraction * len(values) + 0.999999) - 1))]
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    requests = build_requests(args.requests, args.endpoint, args.duplicate_rate, args.seed)
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        db_path = str(Path(tempfile.mkdtemp(prefix="load-test-")) / "metadata.db")
+        agent = EnhancedMetadataCuratorAgent(model=OfflineModel(latency=args.model_latency), db=MetadataDatabase(db_path))
+        service = ExtractionService(agent, args.workers, args.queue_size)
+        server = await service.start("127.0.0.1", 0)
+        host, port = server.sockets[0].getsockname()[:2]
+
+    try:
+        latencies, statuses, elapsed = await run_clients(host, port, requests, args.concurrency)
+        server_stats = await health(host, port)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+    latencies.sort()
+    return {
+        "endpoint": args.endpoint,
+        "requests": len(requests),
+        "concurrency": args.concurrency,
+        "duplicate_rate": args.duplicate_rate,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "status_counts": {str(status): count for status, count in sorted(statuses.items())},
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0
+        },
+        "server": server_stats
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test layanan HTTP ekstraksi")
+    parser.add_argument("--url", help="Target server yang sudah berjalan (default: server in-process)")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="extract")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duplicate-rate", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=8, help="Worker pool server in-process")
+    parser.add_argument("--queue-size", type=int, default=32, help="Antrian server in-process")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="Latensi OfflineModel (detik)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="Simpan hasil ke file JSON")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(main_async(args))
+    print(json.dumps(result, indent=2))
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
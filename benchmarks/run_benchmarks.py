@@ -0,0 +1,400 @@
+"""
+Benchmark end-to-end atas korpus arsip sintetis
+
+Korpus dibuat dengan benchmarks/corpus.py dan model Gemini diganti
+OfflineModel (deterministik, latensi dapat diatur), sehingga hasil dapat
+dibandingkan antar rilis tanpa API key. Kelompok benchmark:
+
+    document_processor  ekstraksi teks TXT/PDF/DOCX (DocumentProcessor.process_file)
+    validator           MetadataValidator per nilai vs batch
+    quality             QualityMetrics per record vs tervektorisasi
+    database            penulisan dan pembacaan MetadataDatabase
+    pipeline            BatchIngestor penuh (baca, teks, model, validasi, simpan)
+    records             memori per record dan biaya konversi dict vs record __slots__
+
+Hasil ditulis sebagai JSON (metadata lingkungan + median/min/max per
+benchmark). Dengan --baseline, benchmark yang median-nya melambat melebihi
+--threshold dilaporkan dan exit code menjadi 1.
+
+Pemakaian:
+    python benchmarks/run_benchmarks.py --count 300 --output hasil.json
+    python benchmarks/run_benchmarks.py --only database,pipeline --baseline hasil.json
+    python benchmarks/run_benchmarks.py --only records --batch-size 100000
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import io
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import generate_corpus  # noqa: E402
+from curator_agent import EnhancedMetadataCuratorAgent  # noqa: E402
+from database import MetadataDatabase  # noqa: E402
+from metadata_curator_agent.main import BatchIngestor  # noqa: E402
+from offline_model import OfflineModel, extract_offline_metadata  # noqa: E402
+from records import MetadataRecord, ValidationResultRecord  # noqa: E402
+from schemas import DUBLIN_CORE_SCHEMA  # noqa: E402
+from utils import DocumentProcessor, MetadataValidator, QualityMetrics  # noqa: E402
+
+GROUPS = ("document_processor", "validator", "quality", "database", "pipeline", "records")
+
+# Format hasil; dinaikkan bila struktur JSON berubah
+RESULT_VERSION = 1
+
+# Perlambatan median relatif terhadap baseline yang dianggap regresi
+REGRESSION_THRESHOLD = 0.2
+
+# Benchmark dengan median di bawah batas ini terlalu berisik untuk dibandingkan
+MIN_COMPARABLE_MS = 1.0
+
+# Jumlah record untuk benchmark memori (kelompok records)
+RECORD_BATCH_SIZE = 100000
+
+
+def allocated_bytes(build: Callable[[], Any]) -> int:
+    """Memori yang masih dialokasikan oleh hasil build() (tracemalloc)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return allocated
+
+
+def measure(function: Callable[[], Any], items: int, repeat: int, setup: Optional[Callable[[], Any]] = None,
+            **extra: Any) -> Dict[str, Any]:
+    """Jalankan function sebanyak repeat kali; items = jumlah unit kerja per panggilan"""
+    timings: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    return {
+        "items": items,
+        "repeat": repeat,
+        "median_ms": round(median * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3),
+        "items_per_second": round(items / median, 1) if median else None,
+        **extra
+    }
+
+
+class BenchmarkContext:
+    """Korpus, record metadata dan database sementara yang dipakai bersama"""
+
+    def __init__(self, work_dir: Path, count: int, duplicate_rate: float, paragraphs: int, seed: int,
+                 model_latency: float, concurrency: int, repeat: int, batch_size: int = RECORD_BATCH_SIZE):
+        self.work_dir = work_dir
+        self.repeat = repeat
+        self.batch_size = batch_size
+        self.model_latency = model_latency
+        self.concurrency = concurrency
+        self.entries = generate_corpus(str(work_dir / "corpus"), count, paragraphs=paragraphs,
+                                       duplicate_rate=duplicate_rate, seed=seed)
+        self.files = [(entry, Path(entry["path"]).read_bytes()) for entry in self.entries]
+        self.texts = [
+            (Path(entry["path"]).name, DocumentProcessor.process_file(content, Path(entry["path"]).name, ""))
+            for entry, content in self.files
+        ]
+        self.records = [extract_offline_metadata(text, name) for name, text in self.texts]
+        self._databases = 0
+
+    def new_database(self) -> MetadataDatabase:
+        self._databases += 1
+        return MetadataDatabase(str(self.work_dir / f"bench_{self._databases}.db"))
+
+
+def bench_document_processor(context: BenchmarkContext) -> Dict[str, Any]:
+    results = {}
+    for file_format in ("txt", "pdf", "docx"):
+        files = [(Path(entry["path"]).name, content) for entry, content in context.files
+                 if entry["format"] == file_format]
+        if not files:
+            continue
+
+        def run():
+            for name, content in files:
+                DocumentProcessor.process_file(content, name, "")
+
+        total_bytes = sum(len(content) for _, content in files)
+        result = measure(run, len(files), context.repeat, bytes=total_bytes)
+        if result["median_ms"]:
+            result["mb_per_second"] = round(total_bytes / 1e6 / (result["median_ms"] / 1000), 2)
+        results[file_format] = result
+    return results
+
+
+def bench_validator(context: BenchmarkContext) -> Dict[str, Any]:
+    dublin_core = [record["dublin_core"] for record in context.records]
+    dates = [metadata.get("date", "") for metadata in dublin_core]
+    languages = [metadata.get("language", "") for metadata in dublin_core]
+    creators = [metadata.get("creator", "") for metadata in dublin_core]
+    repeat = context.repeat
+    return {
+        "date_per_value": measure(lambda: [MetadataValidator.validate_date_format(d) for d in dates], len(dates), repeat),
+        "date_batch": measure(lambda: MetadataValidator.validate_dates_batch(dates), len(dates), repeat),
+        "language_per_value": measure(
+            lambda: [MetadataValidator.validate_language_code(code) for code in languages], len(languages), repeat
+        ),
+        "language_batch": measure(lambda: MetadataValidator.validate_language_codes_batch(languages),
+                                  len(languages), repeat),
+        "creator": measure(lambda: [MetadataValidator.validate_creator_format(c) for c in creators], len(creators), repeat)
+    }
+
+
+def bench_quality(context: BenchmarkContext) -> Dict[str, Any]:
+    dublin_core = [record["dublin_core"] for record in context.records]
+    repeat = context.repeat
+
+    def per_record():
+        for metadata in dublin_core:
+            QualityMetrics.calculate_completeness_score(metadata, DUBLIN_CORE_SCHEMA)
+            QualityMetrics.calculate_richness_score(metadata)
+
+    return {
+        "scores_per_record": measure(per_record, len(dublin_core), repeat),
+        "scores_vectorized": measure(lambda: QualityMetrics.calculate_quality_scores(dublin_core, DUBLIN_CORE_SCHEMA),
+                                     len(dublin_core), repeat),
+        "consistency_batch": measure(lambda: QualityMetrics.calculate_consistency_score(dublin_core),
+                                     len(dublin_core), repeat),
+        "consistency_stream": measure(lambda: QualityMetrics.calculate_consistency_score_stream(iter(dublin_core)),
+                                      len(dublin_core), repeat)
+    }
+
+
+def bench_database(context: BenchmarkContext) -> Dict[str, Any]:
+    agent = EnhancedMetadataCuratorAgent(model=OfflineModel(), db=context.new_database())
+    validations = [agent.advanced_validation(record, "dublin_core") for record in context.records]
+    names = [name for name, _ in context.texts]
+    results: Dict[str, Any] = {}
+    state: Dict[str, Any] = {}
+
+    def fresh_database():
+        state["db"] = context.new_database()
+
+    def save_records():
+        db = state["db"]
+        for name, record, validation in zip(names, context.records, validations):
+            metadata_id = db.save_metadata(name, record, "dublin_core")
+            db.save_validation_result(metadata_id, validation)
+
+    def save_file_records():
+        db = state["db"]
+        for index, (name, record, validation) in enumerate(zip(names, context.records, validations)):
+            db.save_file_metadata(f"hash-{index}", name, record, "dublin_core", validation)
+
+    results["write_save_metadata"] = measure(save_records, len(names), context.repeat, setup=fresh_database)
+    results["write_save_file_metadata"] = measure(save_file_records, len(names), context.repeat, setup=fresh_database)
+
+    # Pembacaan atas database terakhir yang sudah terisi
+    db = state["db"]
+    ids = [row["id"] for row in db.get_metadata_page(page_size=len(names))["rows"]]
+
+    def read_pages():
+        cursor = None
+        while True:
+            page = db.get_metadata_page(cursor=cursor, page_size=50)
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+    results["read_pages_uncached"] = measure(read_pages, len(names), context.repeat, setup=db.clear_cache)
+    results["read_pages_cached"] = measure(read_pages, len(names), context.repeat)
+    results["read_statistics_uncached"] = measure(db.get_statistics, 1, context.repeat, setup=db.clear_cache)
+    results["read_statistics_cached"] = measure(db.get_statistics, 1, context.repeat)
+    results["read_records_by_id"] = measure(lambda: db.get_metadata_records(ids), len(ids), context.repeat)
+    results["read_detail"] = measure(lambda: [db.get_metadata_detail(i) for i in ids[:100]], min(100, len(ids)),
+                                     context.repeat, setup=db.clear_cache)
+    return results
+
+
+def bench_pipeline(context: BenchmarkContext) -> Dict[str, Any]:
+    items = [{"seq": seq, "path": entry["path"], "state": "pending"} for seq, (entry, _) in enumerate(context.files)]
+    summaries: List[Dict[str, Any]] = []
+    state: Dict[str, Any] = {}
+
+    def fresh_agent():
+        model = OfflineModel(latency=context.model_latency)
+        state["agent"] = EnhancedMetadataCuratorAgent(model=model, db=context.new_database())
+
+    def run():
+        ingestor = BatchIngestor(state["agent"], concurrency=context.concurrency, save=True)
+        summaries.append(ingestor.run([dict(item) for item in items], io.StringIO()))
+
+    result = measure(run, len(items), context.repeat, setup=fresh_agent,
+                     concurrency=context.concurrency, model_latency=context.model_latency)
+    last = summaries[-1]
+    result.update({
+        "succeeded": last["succeeded"],
+        "duplicates": last["duplicates"],
+        "failed": last["failed"],
+        "latency_ms": last["latency_ms"],
+        "stage_mean_ms": last["stage_mean_ms"]
+    })
+    return {"ingest": result}
+
+
+def bench_records(context: BenchmarkContext) -> Dict[str, Any]:
+    # Batch besar seperti dibaca dari database: setiap record hasil decode JSON sendiri
+    engine = EnhancedMetadataCuratorAgent(model=OfflineModel(), db=context.new_database())
+    metadata_json = [json.dumps(record, ensure_ascii=False) for record in context.records]
+    validation_json = [json.dumps(engine.advanced_validation(record, "dublin_core")) for record in context.records]
+    count = context.batch_size
+    metadata_batch = [metadata_json[index % len(metadata_json)] for index in range(count)]
+    validation_batch = [validation_json[index % len(validation_json)] for index in range(count)]
+    repeat = context.repeat
+
+    def load_dicts(batch: List[str]) -> Callable[[], List[Any]]:
+        return lambda: [json.loads(text) for text in batch]
+
+    def load_records(batch: List[str], record_type: type) -> Callable[[], List[Any]]:
+        return lambda: [record_type.from_json(text) for text in batch]
+
+    results: Dict[str, Any] = {}
+    for name, batch, record_type in (("metadata", metadata_batch, MetadataRecord),
+                                     ("validation", validation_batch, ValidationResultRecord)):
+        dict_bytes = allocated_bytes(load_dicts(batch))
+        record_bytes = allocated_bytes(load_records(batch, record_type))
+        results[f"{name}_dict_load"] = measure(load_dicts(batch), count, repeat,
+                                               bytes_per_record=round(dict_bytes / count, 1))
+        results[f"{name}_record_load"] = measure(load_records(batch, record_type), count, repeat,
+                                                 bytes_per_record=round(record_bytes / count, 1),
+                                                 memory_saved=round(1 - record_bytes / dict_bytes, 3))
+        records = load_records(batch, record_type)()
+        results[f"{name}_record_to_dict"] = measure(lambda: [record.to_dict() for record in records], count, repeat)
+        del records
+    return results
+
+
+BENCHMARKS = {
+    "document_processor": bench_document_processor,
+    "validator": bench_validator,
+    "quality": bench_quality,
+    "database": bench_database,
+    "pipeline": bench_pipeline,
+    "records": bench_records
+}
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine()
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Benchmark yang median-nya lebih lambat dari baseline melebihi threshold"""
+    regressions = []
+    for group, benchmarks in results["results"].items():
+        for name, result in benchmarks.items():
+            previous = baseline.get("results", {}).get(group, {}).get(name)
+            if not previous or previous.get("items") != result["items"]:
+                continue
+            if previous["median_ms"] < MIN_COMPARABLE_MS:
+                continue
+            change = result["median_ms"] / previous["median_ms"] - 1
+            if change > threshold:
+                regressions.append({
+                    "benchmark": f"{group}.{name}",
+                    "baseline_ms": previous["median_ms"],
+                    "median_ms": result["median_ms"],
+                    "change": round(change, 3)
+                })
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end atas korpus arsip sintetis")
+    parser.add_argument("--count", type=int, default=200, help="Jumlah dokumen korpus")
+    parser.add_argument("--paragraphs", type=int, default=8, help="Rata-rata paragraf per dokumen")
+    parser.add_argument("--duplicate-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="Pengulangan per benchmark (median dilaporkan)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Worker pipeline")
+    parser.add_argument("--batch-size", type=int, default=RECORD_BATCH_SIZE, help="Jumlah record benchmark memori")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Latensi OfflineModel (detik)")
+    parser.add_argument("--only", help=f"Kelompok yang dijalankan, mis. database,pipeline ({', '.join(GROUPS)})")
+    parser.add_argument("--output", default="benchmark-results.json", help="File JSON hasil")
+    parser.add_argument("--baseline", help="Hasil sebelumnya untuk deteksi regresi")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--keep", action="store_true", help="Jangan hapus korpus dan database sementara")
+    args = parser.parse_args(argv)
+
+    groups = [group for group in (args.only or ",".join(GROUPS)).split(",") if group]
+    unknown = [group for group in groups if group not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmark group: {', '.join(unknown)}")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="metadata-bench-"))
+    try:
+        started = time.perf_counter()
+        context = BenchmarkContext(work_dir, args.count, args.duplicate_rate, args.paragraphs, args.seed,
+                                   args.model_latency, args.concurrency, args.repeat, args.batch_size)
+        print(f"Corpus: {len(context.entries)} files in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+        results = {
+            "version": RESULT_VERSION,
+            "environment": environment(),
+            "parameters": {key: value for key, value in vars(args).items()
+                           if key not in ("output", "baseline", "keep")},
+            "results": {}
+        }
+        for group in groups:
+            started = time.perf_counter()
+            results["results"][group] = BENCHMARKS[group](context)
+            print(f"{group}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            for name, result in results["results"][group].items():
+                print(f"  {name:28s} {result['median_ms']:>10.2f} ms  {result['items_per_second'] or 0:>10.1f} items/s",
+                      file=sys.stderr)
+    finally:
+        if args.keep:
+            print(f"Work directory: {work_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    exit_code = 0
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        results["regressions"] = regressions
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']}: {regression['baseline_ms']} -> "
+                  f"{regression['median_ms']} ms (+{regression['change']:.0%})", file=sys.stderr)
+        exit_code = 1 if regressions else 0
+
+    Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"Results written to {args.output}", file=sys.stderr)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""
+Agent kurasi metadata tanpa ketergantungan UI
+
+Logika ekstraksi (Gemini), validasi, pencarian record serupa dan pemrosesan
+batch dipakai bersama oleh aplikasi Streamlit, CLI headless dan layanan
+lain. Model dapat diganti dengan objek apapun yang menyediakan
+generate_content(prompt) -> response dengan atribut text (mis. OfflineModel).
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Union
+import json
+import threading
+import time
+
+from database import MetadataDatabase
+from instrumentation import increment, span
+from records import MetadataRecord
+from schemas import DUBLIN_CORE_SCHEMA, ISAD_G_SCHEMA
+from similarity_index import field_consensus, get_index
+from streaming_metrics import ConsistencyAccumulator
+from usage_ledger import TokenBudget, TokenBudgetExceeded, UsageLedger
+from utils import DocumentProcessor, MetadataValidator, QualityMetrics, file_sha256
+from validation_rules import ValidationEngine
+
+# Model Gemini default
+DEFAULT_MODEL_NAME = "gemini-1.5-flash"
+
+# Batas karakter konten yang dikirim ke model
+PROMPT_CONTENT_CHARS = 4000
+
+# Versi template prompt ekstraksi; naikkan setiap kali build_prompt diubah
+PROMPT_TEMPLATE_VERSION = "1"
+
+
+class EnhancedMetadataCuratorAgent:
+    def __init__(self, api_key: Optional[str] = None, model: Any = None, db: Optional[MetadataDatabase] = None,
+                 on_error: Optional[Callable[[str], Any]] = None, token_budget: Optional[TokenBudget] = None):
+        """Initialize Enhanced Metadata Curator Agent dengan Gemini AI
+
+        model menggantikan GenerativeModel Gemini (mis. OfflineModel),
+        on_error menerima pesan error ekstraksi (mis. st.error di UI) dan
+        token_budget membatasi total token panggilan model.
+        """
+        if model is None:
+            # Gemini dimuat saat agent dibuat, bukan saat modul diimpor
+            import google.generativeai as genai
+
+            genai.configure(api_key=api_key)
+            model = genai.GenerativeModel(DEFAULT_MODEL_NAME)
+        self.model = model
+        self.model_name = str(getattr(model, "model_name", DEFAULT_MODEL_NAME)).replace("models/", "", 1)
+        self.on_error = on_error
+        self.token_budget = token_budget
+        self.db = db or MetadataDatabase()
+        self.usage = UsageLedger(self.db)
+        self._local = threading.local()
+        self.doc_processor = DocumentProcessor()
+        self.validator = MetadataValidator()
+        self.quality_metrics = QualityMetrics()
+        
+        # Skema metadata standar
+        self.dublin_core_schema = dict(DUBLIN_CORE_SCHEMA)
+        self.isad_g_schema = dict(ISAD_G_SCHEMA)
+
+        # Rule engine validasi dikompilasi sekali per skema
+        self.validation_engines = {
+            "dublin_core": ValidationEngine("dublin_core", self.dublin_core_schema),
+            "isad_g": ValidationEngine("isad_g", self.isad_g_schema)
+        }
+
+    def build_prompt(self, content: str, file_name: str = "") -> str:
+        """Prompt ekstraksi metadata untuk satu dokumen"""
+        return f"""
+        Sebagai AI spesialis metadata arsip, analisis konten berikut dan ekstrak metadata yang relevan sesuai dengan standar Dublin Core dan ISAD(G).
+        
+        Nama file: {file_name}
+        Konten:
+        {content[:PROMPT_CONTENT_CHARS]}
+        
+        Berikan output dalam format JSON dengan struktur berikut:
+        {{
+            "dublin_core": {{
+                "title": "judul yang diekstrak dari konten",
+                "creator": "pembuat/penulis yang teridentifikasi",
+                "subject": "subjek/topik utama",
+                "description": "ringkasan konten yang informatif",
+                "publisher": "penerbit jika ada",
+                "date": "tanggal dalam format YYYY-MM-DD jika ditemukan",
+                "type": "jenis dokumen (laporan/surat/memo/dll)",
+                "format": "format file berdasarkan nama file",
+                "language": "kode bahasa (id/en/dll)",
+                "rights": "informasi hak akses jika ada"
+            }},
+            "isad_g": {{
+                "reference_code": "kode referensi jika ada",
+                "title": "judul untuk arsip",
+                "date": "tanggal pembuatan",
+                "level_of_description": "tingkat deskripsi (file/series/fonds)",
+                "name_of_creator": "nama pembuat arsip",
+                "scope_and_content": "ruang lingkup dan isi dokumen",
+                "language_of_material": "bahasa materi"
+            }},
+            "confidence_score": 0.85,
+            "extraction_notes": ["catatan tentang kualitas ekstraksi"],
+            "suggestions": ["saran perbaikan metadata"]
+        }}
+        
+        Berikan confidence score 0-1 berdasarkan kejelasan konten dan kualitas ekstraksi.
+        Sertakan notes tentang kesulitan ekstraksi dan saran untuk perbaikan.
+        """
+
+    def parse_response(self, response_text: str) -> Dict[str, Any]:
+        """Parse JSON jawaban model dan tambahkan quality metrics"""
+        # Clean response text to ensure valid JSON
+        response_text = response_text.strip()
+        if response_text.startswith('```json'):
+            response_text = response_text[7:-3].strip()
+        elif response_text.startswith('```'):
+            response_text = response_text[3:-3].strip()
+        
+        metadata = json.loads(response_text)
+        
+        # Calculate additional quality metrics
+        dc_metadata = metadata.get("dublin_core", {})
+        metadata["quality_metrics"] = {
+            "completeness_score": self.quality_metrics.calculate_completeness_score(
+                dc_metadata, self.dublin_core_schema
+            ),
+            "richness_score": self.quality_metrics.calculate_richness_score(dc_metadata)
+        }
+        return metadata
+
+    def extract_metadata_from_text(self, content: str, file_name: str = "", raise_errors: bool = False,
+                                   schema_type: str = "") -> Dict[str, Any]:
+        """Ekstrak metadata dari konten teks menggunakan Gemini
+
+        Secara default error dilaporkan lewat on_error dan struktur metadata
+        kosong dikembalikan; dengan raise_errors=True exception diteruskan.
+        TokenBudgetExceeded selalu diteruskan agar batch dapat berhenti.
+        """
+        try:
+            if self.token_budget is not None:
+                self.token_budget.check()
+            with span("prompt_build"):
+                prompt = self.build_prompt(content, file_name)
+            started = time.perf_counter()
+            try:
+                with span("model_call"):
+                    response = self.model.generate_content(prompt)
+            except Exception:
+                increment("model_calls_total", status="error")
+                self._record_usage(None, started, file_name, schema_type, "error")
+                raise
+            increment("model_calls_total", status="ok")
+            self._record_usage(response, started, file_name, schema_type)
+            with span("json_parse"):
+                return self.parse_response(response.text)
+        except TokenBudgetExceeded:
+            raise
+        except Exception as e:
+            if raise_errors:
+                raise
+            if self.on_error is not None:
+                self.on_error(f"Error dalam ekstraksi metadata: {str(e)}")
+            return self._get_empty_metadata()
+
+    def _record_usage(self, response: Any, started: float, file_name: str, schema_type: str, status: str = "ok"):
+        """Catat token, latensi dan biaya panggilan model; kurangi token budget"""
+        call = self.usage.record(
+            self.model_name, PROMPT_TEMPLATE_VERSION, getattr(response, "usage_metadata", None),
+            (time.perf_counter() - started) * 1000, file_name, schema_type, status
+        )
+        if self.token_budget is not None:
+            self.token_budget.charge(call["total_tokens"])
+        self._local.last_call = call
+
+    def last_call_usage(self) -> Optional[Dict[str, Any]]:
+        """Catatan panggilan model terakhir pada thread ini"""
+        return getattr(self._local, "last_call", None)
+
+    def advanced_validation(self, metadata: Dict[str, Any], schema_type: str = "dublin_core") -> Dict[str, Any]:
+        """Validasi metadata yang lebih canggih"""
+        engine = self.validation_engines.get(schema_type)
+        if engine is None:
+            engine = ValidationEngine(schema_type, self.isad_g_schema)
+        with span("validation"):
+            return engine.validate(metadata)
+
+    def validate_many(self, metadata_list: List[Dict[str, Any]], schema_type: str = "dublin_core") -> Dict[str, List[Any]]:
+        """Validasi batch metadata; hasil kolumnar siap untuk save_validation_results"""
+        engine = self.validation_engines.get(schema_type)
+        if engine is None:
+            engine = ValidationEngine(schema_type, self.isad_g_schema)
+        with span("validation_batch"):
+            return engine.validate_many(metadata_list)
+
+    def find_similar_records(self, metadata: Union[Dict[str, Any], str], k: int = 5,
+                             exclude_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Cari k record tersimpan yang paling mirip (BM25 atas field Dublin Core)
+
+        metadata dapat berupa hasil ekstraksi (dengan section dublin_core)
+        atau teks query bebas.
+        """
+        index = get_index(self.db)
+        exclude = [exclude_id] if exclude_id is not None else []
+        query = metadata if isinstance(metadata, str) else metadata.get("dublin_core", {})
+        matches = index.search(query, k=k, exclude=exclude)
+        scores = dict(matches)
+        records = self.db.get_metadata_records([record_id for record_id, _ in matches])
+        for record in records:
+            record["similarity"] = scores[record["id"]]
+        return records
+
+    def suggest_prefill(self, metadata: Dict[str, Any], similar_records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Nilai usulan untuk field Dublin Core kosong berdasarkan record serupa"""
+        neighbours = [record["dublin_core"] for record in similar_records]
+        return field_consensus(metadata.get("dublin_core", {}), neighbours, self.dublin_core_schema)
+
+    def process_batch_item(self, payload: Dict[str, Any], content: Optional[bytes]) -> Dict[str, Any]:
+        """Handler job 'extract_validate': ekstraksi, validasi dan simpan satu file
+
+        Error model diteruskan agar antrian mencatat item gagal dan mencobanya
+        ulang. Record dan hasil validasi ditulis dalam satu transaksi berkunci
+        hash konten, sehingga klaim ulang item yang sama tidak menggandakan
+        record.
+        """
+        file_name = payload.get("file_name", "")
+        schema_type = payload.get("schema_type", "dublin_core")
+        content = content or b""
+        file_hash = file_sha256(content)
+        self._local.last_call = None
+        
+        metadata_id = self.db.get_ingested_file(file_hash)
+        if metadata_id is not None:
+            return {"metadata_id": metadata_id, "duplicate": True, "total_tokens": 0}
+        
+        text = self.doc_processor.process_file(content, file_name, payload.get("mime_type", ""))
+        metadata = self.extract_metadata_from_text(text, file_name, raise_errors=True, schema_type=schema_type)
+        validation_results = self.advanced_validation(metadata, schema_type)
+        metadata_id, created = self.db.save_file_metadata(file_hash, file_name, metadata, schema_type,
+                                                          validation_results)
+        
+        call = self.last_call_usage()
+        return {
+            "metadata_id": metadata_id,
+            "duplicate": not created,
+            "is_valid": validation_results["is_valid"],
+            "completeness_score": validation_results["completeness_score"],
+            "total_tokens": call["total_tokens"] if call else 0
+        }
+
+    def calculate_archive_quality(self, batch_size: int = 10000) -> Dict[str, Any]:
+        """Hitung distribusi kualitas Dublin Core untuk seluruh database secara batch"""
+        import pandas as pd
+
+        score_frames = []
+        accumulator = ConsistencyAccumulator()
+        for chunk in self.db.iter_metadata_sections("dublin_core", batch_size):
+            score_frames.append(self.quality_metrics.calculate_quality_scores(chunk, self.dublin_core_schema))
+            accumulator.update_many(chunk)
+        
+        scores = (
+            pd.concat(score_frames, ignore_index=True) if score_frames
+            else pd.DataFrame(columns=["id", "completeness_score", "richness_score"])
+        )
+        return {
+            "scores": scores,
+            "consistency": accumulator.consistency_scores(),
+            "field_statistics": accumulator.summary()["fields"]
+        }
+
+    def _get_empty_metadata(self) -> Dict[str, Any]:
+        """Return empty metadata structure"""
+        return MetadataRecord.empty().to_dict()
@@ -1,15 +1,152 @@
+import copy
+import functools
 import json
 import sqlite3
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Optional, Tuple
+import math
 import os
 
+from instrumentation import increment, timed
+
+# TTL cache query baca (detik); menutup penulisan dari proses lain
+CACHE_TTL_SECONDS = 30
+CACHE_MAX_ENTRIES = 256
+
+
+class _QueryCache:
+    """Cache hasil query per database dengan TTL dan versi data per tabel
+    
+    Setiap save_* menaikkan versi tabel yang ditulisnya, sehingga hanya entri
+    yang bergantung pada tabel tersebut yang menjadi tidak valid. Versi
+    disimpan in-process dan dibagi oleh semua instance MetadataDatabase
+    dengan db_path yang sama.
+    """
+    
+    def __init__(self):
+        self.versions: Dict[Tuple[str, str], int] = {}
+        self.entries: Dict[Tuple, Tuple[Tuple[int, ...], float, Any]] = {}
+        self.lock = threading.Lock()
+    
+    def snapshot(self, db_path: str, tables: Tuple[str, ...]) -> Tuple[int, ...]:
+        return tuple(self.versions.get((db_path, table), 0) for table in tables)
+    
+    def bump(self, db_path: str, *tables: str):
+        with self.lock:
+            for table in tables:
+                self.versions[(db_path, table)] = self.versions.get((db_path, table), 0) + 1
+    
+    def get(self, key: Tuple, versions: Tuple[int, ...]):
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == versions and entry[1] > time.monotonic():
+            return True, copy.deepcopy(entry[2])
+        return False, None
+    
+    def put(self, key: Tuple, versions: Tuple[int, ...], ttl: float, value: Any):
+        with self.lock:
+            if len(self.entries) >= CACHE_MAX_ENTRIES:
+                now = time.monotonic()
+                self.entries = {k: v for k, v in self.entries.items() if v[1] > now}
+                if len(self.entries) >= CACHE_MAX_ENTRIES:
+                    self.entries.clear()
+            self.entries[key] = (versions, time.monotonic() + ttl, copy.deepcopy(value))
+    
+    def clear(self, db_path: str):
+        with self.lock:
+            self.entries = {key: entry for key, entry in self.entries.items() if key[0] != db_path}
+
+
+# Batas jumlah parameter per query IN (...)
+SQL_VARIABLE_CHUNK = 500
+
+# Kolom yang boleh dipakai untuk mengurutkan riwayat (keyset pagination)
+HISTORY_SORT_COLUMNS = {
+    "created_at": "mr.created_at",
+    # NULL diurutkan sebagai -1 agar perbandingan keyset (kolom, id) tetap terdefinisi
+    "confidence_score": "COALESCE(mr.confidence_score, -1)",
+    "id": "mr.id"
+}
+
+# Kolom metadata_records berisi hasil validasi dan status feedback terbaru, diisi trigger
+LATEST_STATUS_COLUMNS = (
+    ("latest_is_valid", "BOOLEAN"),
+    ("latest_completeness", "REAL"),
+    ("latest_feedback_status", "TEXT")
+)
+
+# Status feedback terbaru dan hasil validasi terbaru per record (backfill kolom latest_*)
+_LATEST_FEEDBACK_STATUS = "(SELECT validation_status FROM human_feedback WHERE metadata_id = mr.id ORDER BY id DESC LIMIT 1)"
+_LATEST_VALIDATION = "(SELECT {column} FROM validation_results WHERE metadata_id = mr.id ORDER BY id DESC LIMIT 1)"
+
+_QUERY_CACHE = _QueryCache()
+# Identitas file (device, inode) per (skema, path kanonik) yang tabelnya sudah dibuat
+_INITIALIZED_PATHS: Dict[Tuple[str, str], Optional[Tuple[int, int]]] = {}
+
+
+def _file_identity(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def init_once(db_path: str, schema: str, init: Callable[[], Any]):
+    """Jalankan init (DDL) sekali per proses untuk setiap file database
+
+    Path berbeda ke file yang sama berbagi entri; file yang belum ada,
+    dihapus atau diganti diinisialisasi ulang.
+    """
+    real_path = os.path.realpath(db_path)
+    identity = _file_identity(real_path)
+    if identity is None or _INITIALIZED_PATHS.get((schema, real_path)) != identity:
+        # File hilang atau diganti (inode bisa dipakai ulang): skema lain di file ini juga dibuat ulang
+        for key in [key for key, known in _INITIALIZED_PATHS.items()
+                    if key[1] == real_path and (identity is None or known != identity)]:
+            del _INITIALIZED_PATHS[key]
+        init()
+        _INITIALIZED_PATHS[(schema, real_path)] = _file_identity(real_path)
+
+
+def cached_query(*tables: str, ttl: float = CACHE_TTL_SECONDS):
+    """Cache hasil method baca; tidak valid bila versi salah satu tabel berubah atau TTL habis"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (self.db_path, method.__name__, json.dumps([args, kwargs], sort_keys=True, default=str))
+            versions = _QUERY_CACHE.snapshot(self.db_path, tables)
+            hit, value = _QUERY_CACHE.get(key, versions)
+            increment("cache_requests_total", result="hit" if hit else "miss")
+            if hit:
+                return value
+            value = method(self, *args, **kwargs)
+            _QUERY_CACHE.put(key, versions, ttl, value)
+            return value
+        return wrapper
+    return decorator
+
+
 class MetadataDatabase:
     """Database manager untuk menyimpan metadata dan hasil validasi"""
     
     def __init__(self, db_path: str = "metadata.db"):
         self.db_path = db_path
-        self.init_database()
+        # Skema cukup dibuat sekali per proses untuk setiap file database
+        init_once(db_path, "metadata", self.init_database)
+    
+    def bump_data_version(self, *tables: str):
+        """Tandai tabel berubah sehingga cache query yang bergantung padanya tidak valid"""
+        _QUERY_CACHE.bump(self.db_path, *tables)
+    
+    def data_version(self, *tables: str) -> Tuple[int, ...]:
+        """Versi data in-process tabel; berubah setiap kali save_* menulis tabel tersebut"""
+        return _QUERY_CACHE.snapshot(self.db_path, tables)
+    
+    def clear_cache(self):
+        """Kosongkan seluruh cache query untuk database ini"""
+        _QUERY_CACHE.clear(self.db_path)
     
     def init_database(self):
         """Initialize database tables"""
@@ -26,7 +163,10 @@ class MetadataDatabase:
                 isad_g TEXT,
                 confidence_score REAL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                latest_is_valid BOOLEAN,
+                latest_completeness REAL,
+                latest_feedback_status TEXT
             )
         ''')
         
@@ -68,9 +208,125 @@ class MetadataDatabase:
             )
         ''')
         
+        # State analyzer inkremental: watermark id record terakhir yang diproses
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_state (
+                analyzer TEXT PRIMARY KEY,
+                watermark INTEGER NOT NULL DEFAULT 0,
+                records INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Statistik per field (histogram format dan sketch) milik analyzer
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS field_statistics (
+                analyzer TEXT,
+                field TEXT,
+                count INTEGER,
+                formats TEXT,
+                top_values TEXT,
+                distinct_sketch BLOB,
+                frequency_sketch BLOB,
+                frequency_total INTEGER,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (analyzer, field)
+            )
+        ''')
+        
+        # Cluster entitas creator: setiap varian nama dipetakan ke entity_id
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS creator_entities (
+                variant TEXT PRIMARY KEY,
+                normalized TEXT,
+                entity_id INTEGER,
+                occurrences INTEGER DEFAULT 0,
+                first_metadata_id INTEGER,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_creator_entities_entity ON creator_entities (entity_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_creator_entities_normalized ON creator_entities (normalized)")
+        
+        # Posting list n-gram kunci creator ternormalisasi untuk blocking inkremental:
+        # kunci baru hanya di-probe terhadap posting n-gram terjarangnya
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS creator_keys (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                normalized TEXT UNIQUE
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS creator_grams (
+                gram TEXT,
+                key_id INTEGER,
+                PRIMARY KEY (gram, key_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS creator_gram_counts (
+                gram TEXT PRIMARY KEY,
+                postings INTEGER DEFAULT 0
+            ) WITHOUT ROWID
+        ''')
+        
+        # File yang sudah di-ingest (hash SHA-256 konten) agar penulisan batch idempoten
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ingested_files (
+                file_hash TEXT PRIMARY KEY,
+                metadata_id INTEGER,
+                file_name TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (metadata_id) REFERENCES metadata_records (id)
+            )
+        ''')
+        
+        # Database lama: tambah kolom latest_* dan isi sekali dari validasi/feedback terakhir
+        cursor.execute("PRAGMA table_info(metadata_records)")
+        record_columns = {row[1] for row in cursor.fetchall()}
+        missing_columns = [(name, kind) for name, kind in LATEST_STATUS_COLUMNS if name not in record_columns]
+        for name, kind in missing_columns:
+            cursor.execute(f"ALTER TABLE metadata_records ADD COLUMN {name} {kind}")
+        if missing_columns:
+            cursor.execute(f'''
+                UPDATE metadata_records AS mr SET
+                    latest_is_valid = {_LATEST_VALIDATION.format(column="is_valid")},
+                    latest_completeness = {_LATEST_VALIDATION.format(column="completeness_score")},
+                    latest_feedback_status = {_LATEST_FEEDBACK_STATUS}
+            ''')
+        
+        # Trigger menjaga kolom latest_* untuk setiap penulis (save_*, review queue, merge shard)
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_validation_latest AFTER INSERT ON validation_results
+            BEGIN
+                UPDATE metadata_records SET latest_is_valid = NEW.is_valid, latest_completeness = NEW.completeness_score
+                WHERE id = NEW.metadata_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_feedback_latest AFTER INSERT ON human_feedback
+            BEGIN
+                UPDATE metadata_records SET latest_feedback_status = NEW.validation_status WHERE id = NEW.metadata_id;
+            END
+        ''')
+        
+        # Index untuk riwayat: keyset pagination per kolom urut, filter status dan lookup per record
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_metadata_created ON metadata_records (created_at, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_metadata_confidence ON metadata_records (confidence_score, id)")
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_metadata_confidence_sort ON metadata_records (COALESCE(confidence_score, -1), id)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_metadata_feedback_status ON metadata_records (latest_feedback_status, created_at, id)
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_metadata_schema ON metadata_records (schema_type, created_at, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_validation_metadata ON validation_results (metadata_id, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_feedback_metadata ON human_feedback (metadata_id, id)")
+        
         conn.commit()
         conn.close()
     
+    @timed("sqlite_write")
     def save_metadata(self, file_name: str, metadata: Dict[str, Any], schema_type: str) -> int:
         """Simpan metadata ke database"""
         conn = sqlite3.connect(self.db_path)
@@ -88,9 +344,11 @@ class MetadataDatabase:
         metadata_id = cursor.lastrowid
         conn.commit()
         conn.close()
+        self.bump_data_version("metadata_records")
         
         return metadata_id
     
+    @timed("sqlite_write")
     def save_validation_result(self, metadata_id: int, validation_results: Dict[str, Any]):
         """Simpan hasil validasi"""
         conn = sqlite3.connect(self.db_path)
@@ -109,7 +367,90 @@ class MetadataDatabase:
         
         conn.commit()
         conn.close()
+        self.bump_data_version("validation_results")
+    
+    def get_ingested_file(self, file_hash: str) -> Optional[int]:
+        """Id metadata untuk file dengan hash tertentu, None jika belum pernah di-ingest"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT metadata_id FROM ingested_files WHERE file_hash = ?", (file_hash,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+    
+    @timed("sqlite_write")
+    def save_file_metadata(self, file_hash: str, file_name: str, metadata: Dict[str, Any], schema_type: str,
+                           validation_results: Dict[str, Any]) -> Tuple[int, bool]:
+        """Simpan metadata dan hasil validasi satu file secara idempoten
+        
+        Record, hasil validasi dan hash file ditulis dalam satu transaksi;
+        jika hash sudah ada, id yang tersimpan dikembalikan tanpa menulis
+        ulang. Mengembalikan (metadata_id, True jika baru ditulis).
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT metadata_id FROM ingested_files WHERE file_hash = ?", (file_hash,))
+            row = cursor.fetchone()
+            if row is not None:
+                conn.rollback()
+                return row[0], False
+            
+            cursor.execute('''
+                INSERT INTO metadata_records (file_name, schema_type, dublin_core, isad_g, confidence_score)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (
+                file_name,
+                schema_type,
+                json.dumps(metadata.get("dublin_core", {})),
+                json.dumps(metadata.get("isad_g", {})),
+                metadata.get("confidence_score", 0.0)
+            ))
+            metadata_id = cursor.lastrowid
+            cursor.execute('''
+                INSERT INTO validation_results (metadata_id, is_valid, completeness_score, missing_fields, invalid_fields)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (
+                metadata_id,
+                validation_results["is_valid"],
+                validation_results["completeness_score"],
+                json.dumps(validation_results["missing_fields"]),
+                json.dumps(validation_results["invalid_fields"])
+            ))
+            cursor.execute(
+                "INSERT INTO ingested_files (file_hash, metadata_id, file_name) VALUES (?, ?, ?)",
+                (file_hash, metadata_id, file_name)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        self.bump_data_version("metadata_records", "validation_results")
+        return metadata_id, True
+    
+    @timed("sqlite_write")
+    def save_validation_results(self, metadata_ids: List[int], validation_results: Dict[str, List[Any]]):
+        """Simpan hasil validasi batch (format kolumnar dari validate_many) dalam satu transaksi"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        rows = zip(
+            metadata_ids,
+            validation_results["is_valid"],
+            validation_results["completeness_score"],
+            (json.dumps(fields) for fields in validation_results["missing_fields"]),
+            (json.dumps(fields) for fields in validation_results["invalid_fields"])
+        )
+        cursor.executemany('''
+            INSERT INTO validation_results (metadata_id, is_valid, completeness_score, missing_fields, invalid_fields)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+        
+        conn.commit()
+        conn.close()
+        self.bump_data_version("validation_results")
     
+    @timed("sqlite_write")
     def save_human_feedback(self, metadata_id: int, validation_status: str, feedback: str, user_id: str = "user"):
         """Simpan feedback manual dari human validator"""
         conn = sqlite3.connect(self.db_path)
@@ -122,7 +463,9 @@ class MetadataDatabase:
         
         conn.commit()
         conn.close()
+        self.bump_data_version("human_feedback")
     
+    @cached_query("metadata_records", "validation_results", "human_feedback")
     def get_metadata_history(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Ambil riwayat metadata yang sudah diproses"""
         conn = sqlite3.connect(self.db_path)
@@ -145,6 +488,386 @@ class MetadataDatabase:
         conn.close()
         return results
     
+    @staticmethod
+    def _history_filters(filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        """Klausa WHERE untuk filter riwayat (schema, status validasi, confidence, tanggal)"""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if filters.get("schema_type"):
+            clauses.append("mr.schema_type = ?")
+            params.append(filters["schema_type"])
+        if filters.get("validation_status") == "unreviewed":
+            clauses.append("mr.latest_feedback_status IS NULL")
+        elif filters.get("validation_status"):
+            clauses.append("mr.latest_feedback_status = ?")
+            params.append(filters["validation_status"])
+        if filters.get("min_confidence") is not None:
+            clauses.append("mr.confidence_score >= ?")
+            params.append(filters["min_confidence"])
+        if filters.get("max_confidence") is not None:
+            clauses.append("mr.confidence_score <= ?")
+            params.append(filters["max_confidence"])
+        if filters.get("date_from"):
+            clauses.append("mr.created_at >= ?")
+            params.append(str(filters["date_from"]))
+        if filters.get("date_to"):
+            clauses.append("mr.created_at < date(?, '+1 day')")
+            params.append(str(filters["date_to"]))
+        return clauses, params
+    
+    @cached_query("metadata_records", "validation_results", "human_feedback")
+    def get_metadata_page(self, filters: Dict[str, Any] = None, sort_by: str = "created_at", descending: bool = True,
+                          cursor: List[Any] = None, page_size: int = 50) -> Dict[str, Any]:
+        """Satu halaman riwayat metadata dengan keyset pagination
+        
+        cursor adalah [nilai kolom urut, id] dari baris terakhir halaman
+        sebelumnya (next_cursor pada hasil); hanya baris halaman ini yang
+        dibaca dari database.
+        """
+        if sort_by not in HISTORY_SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column: {sort_by}")
+        column = HISTORY_SORT_COLUMNS[sort_by]
+        order = "DESC" if descending else "ASC"
+        
+        clauses, params = self._history_filters(filters or {})
+        if cursor is not None:
+            clauses.append(f"({column}, mr.id) {'<' if descending else '>'} (?, ?)")
+            params.extend(cursor)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor_db = conn.cursor()
+        cursor_db.execute(f'''
+            SELECT mr.id, mr.file_name, mr.schema_type, mr.confidence_score, mr.created_at,
+                   mr.latest_is_valid AS is_valid, mr.latest_completeness AS completeness_score,
+                   mr.latest_feedback_status AS validation_status, {column} AS sort_key
+            FROM metadata_records mr
+            {where}
+            ORDER BY {column} {order}, mr.id {order}
+            LIMIT ?
+        ''', params + [page_size + 1])
+        rows = [dict(row) for row in cursor_db.fetchall()]
+        conn.close()
+        
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = [rows[-1]["sort_key"], rows[-1]["id"]] if has_more else None
+        for row in rows:
+            del row["sort_key"]
+        return {"rows": rows, "next_cursor": next_cursor}
+    
+    @cached_query("metadata_records", "human_feedback")
+    def count_metadata(self, filters: Dict[str, Any] = None) -> int:
+        """Jumlah record yang cocok dengan filter riwayat"""
+        clauses, params = self._history_filters(filters or {})
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM metadata_records mr {where}", params)
+        total = cursor.fetchone()[0]
+        conn.close()
+        return total
+    
+    def get_metadata_detail(self, metadata_id: int) -> Dict[str, Any]:
+        """Detail satu record beserta riwayat validasi dan feedback-nya"""
+        records = self.get_metadata_records([metadata_id])
+        if not records:
+            return {}
+        record = records[0]
+        
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT is_valid, completeness_score, missing_fields, invalid_fields, created_at
+            FROM validation_results WHERE metadata_id = ? ORDER BY id DESC
+        ''', (metadata_id,))
+        record["validations"] = [dict(row) for row in cursor.fetchall()]
+        cursor.execute('''
+            SELECT validation_status, feedback, user_id, created_at
+            FROM human_feedback WHERE metadata_id = ? ORDER BY id DESC
+        ''', (metadata_id,))
+        record["feedback"] = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return record
+    
+    def get_metadata_records(self, metadata_ids: List[int]) -> List[Dict[str, Any]]:
+        """Ambil record metadata berdasarkan id (urutan mengikuti metadata_ids)"""
+        if not metadata_ids:
+            return []
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        placeholders = ", ".join("?" for _ in metadata_ids)
+        cursor.execute(f"SELECT * FROM metadata_records WHERE id IN ({placeholders})", list(metadata_ids))
+        records = {}
+        for row in cursor.fetchall():
+            record = dict(row)
+            record["dublin_core"] = json.loads(record["dublin_core"] or "{}")
+            record["isad_g"] = json.loads(record["isad_g"] or "{}")
+            records[record["id"]] = record
+        
+        conn.close()
+        return [records[metadata_id] for metadata_id in metadata_ids if metadata_id in records]
+    
+    def iter_metadata_sections(self, section: str = "dublin_core", batch_size: int = 10000,
+                               after_id: int = 0) -> Iterator[List[Dict[str, Any]]]:
+        """Iterasi record dengan id > after_id per batch; setiap item berisi id dan field dari section skema"""
+        if section not in ("dublin_core", "isad_g"):
+            raise ValueError(f"Unknown metadata section: {section}")
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT id, {section} FROM metadata_records WHERE id > ? ORDER BY id", (after_id,))
+        
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [{**json.loads(section_json or "{}"), "id": row_id} for row_id, section_json in rows]
+        finally:
+            conn.close()
+    
+    def get_analysis_state(self, analyzer: str) -> Dict[str, Any]:
+        """Ambil watermark, jumlah record dan statistik field milik analyzer"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT watermark, records FROM analysis_state WHERE analyzer = ?", (analyzer,))
+        row = cursor.fetchone()
+        watermark, records = row if row else (0, 0)
+        
+        cursor.execute('''
+            SELECT field, count, formats, top_values, distinct_sketch, frequency_sketch, frequency_total
+            FROM field_statistics WHERE analyzer = ?
+        ''', (analyzer,))
+        field_statistics = {
+            field: {
+                "count": count,
+                "formats": json.loads(formats),
+                "top_values": json.loads(top_values),
+                "distinct_sketch": distinct_sketch,
+                "frequency_sketch": frequency_sketch,
+                "frequency_total": frequency_total
+            }
+            for field, count, formats, top_values, distinct_sketch, frequency_sketch, frequency_total in cursor.fetchall()
+        }
+        
+        conn.close()
+        return {"watermark": watermark, "records": records, "field_statistics": field_statistics}
+    
+    def get_creator_entities(self, variants: Optional[List[str]] = None,
+                             entity_ids: Optional[List[int]] = None) -> Dict[str, Dict[str, Any]]:
+        """Ambil varian nama creator beserta entity_id-nya
+        
+        Tanpa filter semua varian dikembalikan; dengan variants dan/atau
+        entity_ids hanya baris yang cocok (lookup lewat index).
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        query = "SELECT variant, normalized, entity_id, occurrences, first_metadata_id FROM creator_entities"
+        entities = {}
+        if variants is None and entity_ids is None:
+            cursor.execute(query)
+            entities = {row["variant"]: dict(row) for row in cursor.fetchall()}
+        for column, values in (("variant", variants), ("entity_id", entity_ids)):
+            values = list(values or [])
+            for start in range(0, len(values), SQL_VARIABLE_CHUNK):
+                chunk = values[start:start + SQL_VARIABLE_CHUNK]
+                cursor.execute(f"{query} WHERE {column} IN ({', '.join('?' for _ in chunk)})", chunk)
+                entities.update((row["variant"], dict(row)) for row in cursor.fetchall())
+        
+        conn.close()
+        return entities
+    
+    def get_creator_key_entities(self, keys: List[str]) -> Dict[str, int]:
+        """Entity id untuk kunci creator ternormalisasi yang sudah dikenal"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        entities = {}
+        for start in range(0, len(keys), SQL_VARIABLE_CHUNK):
+            chunk = keys[start:start + SQL_VARIABLE_CHUNK]
+            cursor.execute(f'''
+                SELECT normalized, MIN(entity_id) FROM creator_entities
+                WHERE normalized IN ({', '.join('?' for _ in chunk)}) GROUP BY normalized
+            ''', chunk)
+            entities.update(cursor.fetchall())
+        conn.close()
+        return entities
+    
+    def get_max_creator_entity_id(self) -> int:
+        """Entity id creator terbesar (0 jika belum ada)"""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute("SELECT COALESCE(MAX(entity_id), 0) FROM creator_entities").fetchone()
+        conn.close()
+        return row[0]
+    
+    def find_creator_candidates(self, grams: List[str], threshold: float, max_postings: int) -> List[str]:
+        """Kunci creator tersimpan yang mungkin memiliki Jaccard n-gram >= threshold dengan grams
+        
+        Kunci dengan Jaccard >= t berbagi setidaknya ceil(t*|x|) n-gram dengan
+        kunci probe, sehingga cukup membaca posting |x| - ceil(t*|x|) + 1
+        n-gram terjarang. N-gram dengan posting > max_postings dilewati.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT gram, postings FROM creator_gram_counts WHERE gram IN ({', '.join('?' for _ in grams)})", grams
+        )
+        postings = dict(cursor.fetchall())
+        ranked = sorted(grams, key=lambda gram: (postings.get(gram, 0), gram))
+        probe = [gram for gram in ranked[:len(ranked) - math.ceil(threshold * len(ranked)) + 1]
+                 if 0 < postings.get(gram, 0) <= max_postings]
+        keys = []
+        if probe:
+            cursor.execute(f'''
+                SELECT DISTINCT k.normalized FROM creator_grams g JOIN creator_keys k ON k.id = g.key_id
+                WHERE g.gram IN ({', '.join('?' for _ in probe)})
+            ''', probe)
+            keys = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return keys
+    
+    def needs_creator_gram_backfill(self) -> bool:
+        """True jika creator_entities terisi tetapi posting n-gram belum pernah dibangun (database lama)
+
+        Setelah backfill, save_analysis_run memelihara posting dalam transaksi
+        yang sama sehingga cukup diperiksa apakah creator_keys masih kosong.
+        """
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute('''
+            SELECT EXISTS (SELECT 1 FROM creator_entities) AND NOT EXISTS (SELECT 1 FROM creator_keys)
+        ''').fetchone()
+        conn.close()
+        return bool(row[0])
+    
+    @timed("sqlite_write")
+    def backfill_creator_grams(self, grams: Callable[[str], Iterable[str]]):
+        """Bangun posting n-gram untuk kunci creator_entities yang belum terindeks (migrasi sekali jalan)"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            keys = [row[0] for row in conn.execute('''
+                SELECT DISTINCT normalized FROM creator_entities
+                WHERE normalized NOT IN (SELECT normalized FROM creator_keys)
+            ''')]
+            self._insert_creator_grams(conn.cursor(), {key: grams(key) for key in keys})
+            conn.commit()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _insert_creator_grams(cursor: sqlite3.Cursor, creator_grams: Dict[str, Iterable[str]]):
+        """Daftarkan kunci baru beserta posting n-gram-nya (kunci yang sudah ada dilewati)"""
+        keys = list(creator_grams)
+        key_ids: Dict[str, int] = {}
+        for start in range(0, len(keys), SQL_VARIABLE_CHUNK):
+            chunk = keys[start:start + SQL_VARIABLE_CHUNK]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor.execute(f"SELECT normalized FROM creator_keys WHERE normalized IN ({placeholders})", chunk)
+            existing = {row[0] for row in cursor.fetchall()}
+            new_keys = [key for key in chunk if key not in existing]
+            cursor.executemany("INSERT INTO creator_keys (normalized) VALUES (?)", [(key,) for key in new_keys])
+            cursor.execute(f"SELECT normalized, id FROM creator_keys WHERE normalized IN ({placeholders})", chunk)
+            key_ids.update((key, key_id) for key, key_id in cursor.fetchall() if key not in existing)
+
+        postings: Dict[str, int] = {}
+        rows = []
+        for key, key_id in key_ids.items():
+            for gram in set(creator_grams[key]):
+                rows.append((gram, key_id))
+                postings[gram] = postings.get(gram, 0) + 1
+        cursor.executemany("INSERT OR IGNORE INTO creator_grams (gram, key_id) VALUES (?, ?)", rows)
+        cursor.executemany('''
+            INSERT INTO creator_gram_counts (gram, postings) VALUES (?, ?)
+            ON CONFLICT (gram) DO UPDATE SET postings = postings + excluded.postings
+        ''', list(postings.items()))
+    
+    @timed("sqlite_write")
+    def save_analysis_run(self, analyzer: str, watermark: int, records: int,
+                          field_statistics: Dict[str, Dict[str, Any]],
+                          creator_entities: List[Dict[str, Any]],
+                          reports: List[Dict[str, Any]],
+                          creator_grams: Optional[Dict[str, Iterable[str]]] = None):
+        """Simpan hasil satu run analyzer inkremental dalam satu transaksi
+        
+        Watermark hanya maju bersama statistik dan laporannya, sehingga run
+        yang gagal di tengah jalan akan diulang dari watermark sebelumnya.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.executemany('''
+                INSERT OR REPLACE INTO field_statistics
+                (analyzer, field, count, formats, top_values, distinct_sketch, frequency_sketch, frequency_total, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', [
+                (
+                    analyzer, field, state["count"], json.dumps(state["formats"]), json.dumps(state["top_values"]),
+                    state["distinct_sketch"], state["frequency_sketch"], state["frequency_total"]
+                )
+                for field, state in field_statistics.items()
+            ])
+            
+            cursor.executemany('''
+                INSERT OR REPLACE INTO creator_entities
+                (variant, normalized, entity_id, occurrences, first_metadata_id, updated_at)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', [
+                (entity["variant"], entity["normalized"], entity["entity_id"], entity["occurrences"], entity["first_metadata_id"])
+                for entity in creator_entities
+            ])
+            self._insert_creator_grams(cursor, creator_grams or {})
+            
+            cursor.executemany('''
+                INSERT INTO inconsistency_reports (report_type, issues, metadata_ids)
+                VALUES (?, ?, ?)
+            ''', [
+                (report["report_type"], json.dumps(report["issues"]), json.dumps(report["metadata_ids"]))
+                for report in reports
+            ])
+            
+            cursor.execute('''
+                INSERT OR REPLACE INTO analysis_state (analyzer, watermark, records, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (analyzer, watermark, records))
+            
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    def get_inconsistency_reports(self, limit: int = 50, report_type: str = None) -> List[Dict[str, Any]]:
+        """Ambil laporan inkonsistensi terbaru"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        if report_type:
+            cursor.execute('''
+                SELECT * FROM inconsistency_reports WHERE report_type = ? ORDER BY id DESC LIMIT ?
+            ''', (report_type, limit))
+        else:
+            cursor.execute("SELECT * FROM inconsistency_reports ORDER BY id DESC LIMIT ?", (limit,))
+        
+        results = []
+        for row in cursor.fetchall():
+            report = dict(row)
+            report["issues"] = json.loads(report["issues"])
+            report["metadata_ids"] = json.loads(report["metadata_ids"])
+            results.append(report)
+        
+        conn.close()
+        return results
+    
+    @cached_query("metadata_records", "validation_results", "human_feedback")
     def get_statistics(self) -> Dict[str, Any]:
         """Ambil statistik database"""
         conn = sqlite3.connect(self.db_path)
@@ -1,9 +1,9 @@
 import streamlit as st
-import google.generativeai as genai
 import pandas as pd
 import json
 import re
 from datetime import datetime
+from itertools import islice
 from typing import Dict, List, Any, Optional
 import io
 import zipfile
@@ -11,221 +11,31 @@ import mimetypes
 from pathlib import Path
 
 # Import our custom modules
-from database import MetadataDatabase
-from utils import DocumentProcessor, MetadataValidator, QualityMetrics
+from curator_agent import EnhancedMetadataCuratorAgent
+from database import HISTORY_SORT_COLUMNS
+from incremental_analysis import get_analyzer
+import instrumentation
+from job_queue import get_job_queue
+from linked_data import DUBLIN_CORE_PROPERTIES, EXPORT_FORMATS, LINKED_DATA_CONTEXT, LinkedDataExporter, record_to_jsonld
+from review_queue import get_review_queue
+from triple_store import GRAPH_FIELDS, get_triple_store
+from usage_ledger import USAGE_GROUPS
 
-# Konfigurasi halaman Streamlit
-st.set_page_config(
-    page_title="Metadata Curator Agent",
-    page_icon="📚",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Jumlah worker thread antrian job batch
+BATCH_WORKERS = 2
 
-class EnhancedMetadataCuratorAgent:
-    def __init__(self, api_key: str):
-        """Initialize Enhanced Metadata Curator Agent dengan Gemini AI"""
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-        self.db = MetadataDatabase()
-        self.doc_processor = DocumentProcessor()
-        self.validator = MetadataValidator()
-        self.quality_metrics = QualityMetrics()
-        
-        # Skema metadata standar
-        self.dublin_core_schema = {
-            "title": "Judul dokumen",
-            "creator": "Pembuat/Penulis",
-            "subject": "Subjek/Topik",
-            "description": "Deskripsi konten",
-            "publisher": "Penerbit",
-            "contributor": "Kontributor",
-            "date": "Tanggal pembuatan/publikasi",
-            "type": "Jenis dokumen",
-            "format": "Format file",
-            "identifier": "Identifikator unik",
-            "source": "Sumber asal",
-            "language": "Bahasa",
-            "relation": "Relasi dengan dokumen lain",
-            "coverage": "Cakupan geografis/temporal",
-            "rights": "Hak cipta/akses"
-        }
-        
-        self.isad_g_schema = {
-            "reference_code": "Kode referensi",
-            "title": "Judul",
-            "date": "Tanggal",
-            "level_of_description": "Tingkat deskripsi",
-            "extent_and_medium": "Jumlah dan media",
-            "name_of_creator": "Nama pembuat",
-            "scope_and_content": "Ruang lingkup dan isi",
-            "conditions_of_access": "Kondisi akses",
-            "conditions_of_reproduction": "Kondisi reproduksi",
-            "language_of_material": "Bahasa materi",
-            "physical_characteristics": "Karakteristik fisik",
-            "finding_aids": "Alat bantu pencarian",
-            "location_of_originals": "Lokasi asli",
-            "availability_of_copies": "Ketersediaan salinan",
-            "related_units": "Unit terkait",
-            "publication_note": "Catatan publikasi",
-            "notes": "Catatan umum"
-        }
-
-    def extract_metadata_from_text(self, content: str, file_name: str = "") -> Dict[str, Any]:
-        """Ekstrak metadata dari konten teks menggunakan Gemini"""
-        prompt = f"""
-        Sebagai AI spesialis metadata arsip, analisis konten berikut dan ekstrak metadata yang relevan sesuai dengan standar Dublin Core dan ISAD(G).
-        
-        Nama file: {file_name}
-        Konten:
-        {content[:4000]}  # Increased limit
-        
-        Berikan output dalam format JSON dengan struktur berikut:
-        {{
-            "dublin_core": {{
-                "title": "judul yang diekstrak dari konten",
-                "creator": "pembuat/penulis yang teridentifikasi",
-                "subject": "subjek/topik utama",
-                "description": "ringkasan konten yang informatif",
-                "publisher": "penerbit jika ada",
-                "date": "tanggal dalam format YYYY-MM-DD jika ditemukan",
-                "type": "jenis dokumen (laporan/surat/memo/dll)",
-                "format": "format file berdasarkan nama file",
-                "language": "kode bahasa (id/en/dll)",
-                "rights": "informasi hak akses jika ada"
-            }},
-            "isad_g": {{
-                "reference_code": "kode referensi jika ada",
-                "title": "judul untuk arsip",
-                "date": "tanggal pembuatan",
-                "level_of_description": "tingkat deskripsi (file/series/fonds)",
-                "name_of_creator": "nama pembuat arsip",
-                "scope_and_content": "ruang lingkup dan isi dokumen",
-                "language_of_material": "bahasa materi"
-            }},
-            "confidence_score": 0.85,
-            "extraction_notes": ["catatan tentang kualitas ekstraksi"],
-            "suggestions": ["saran perbaikan metadata"]
-        }}
-        
-        Berikan confidence score 0-1 berdasarkan kejelasan konten dan kualitas ekstraksi.
-        Sertakan notes tentang kesulitan ekstraksi dan saran untuk perbaikan.
-        """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            # Clean response text to ensure valid JSON
-            response_text = response.text.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3].strip()
-            elif response_text.startswith('```'):
-                response_text = response_text[3:-3].strip()
-            
-            metadata = json.loads(response_text)
-            
-            # Calculate additional quality metrics
-            dc_metadata = metadata.get("dublin_core", {})
-            metadata["quality_metrics"] = {
-                "completeness_score": self.quality_metrics.calculate_completeness_score(
-                    dc_metadata, self.dublin_core_schema
-                ),
-                "richness_score": self.quality_metrics.calculate_richness_score(dc_metadata)
-            }
-            
-            return metadata
-        except Exception as e:
-            st.error(f"Error dalam ekstraksi metadata: {str(e)}")
-            return self._get_empty_metadata()
-
-    def advanced_validation(self, metadata: Dict[str, Any], schema_type: str = "dublin_core") -> Dict[str, Any]:
-        """Validasi metadata yang lebih canggih"""
-        schema = self.dublin_core_schema if schema_type == "dublin_core" else self.isad_g_schema
-        validation_results = {
-            "is_valid": True,
-            "missing_fields": [],
-            "invalid_fields": [],
-            "warnings": [],
-            "field_validations": {},
-            "completeness_score": 0.0,
-            "recommendations": []
-        }
-        
-        metadata_section = metadata.get(schema_type, {})
-        
-        # Enhanced field validation
-        for field, description in schema.items():
-            field_value = metadata_section.get(field, "")
-            
-            if not field_value or not str(field_value).strip():
-                validation_results["missing_fields"].append(field)
-                validation_results["field_validations"][field] = {
-                    "status": "missing",
-                    "message": f"Field {field} is required but empty"
-                }
-            else:
-                # Specific field validations
-                if field == "date":
-                    date_validation = self.validator.validate_date_format(str(field_value))
-                    validation_results["field_validations"][field] = date_validation
-                    if not date_validation["is_valid"]:
-                        validation_results["invalid_fields"].extend(date_validation["errors"])
-                
-                elif field == "language":
-                    lang_validation = self.validator.validate_language_code(str(field_value))
-                    validation_results["field_validations"][field] = lang_validation
-                    if not lang_validation["is_valid"]:
-                        validation_results["warnings"].append(
-                            f"Language code '{field_value}' may not be standard. {lang_validation['suggestion']}"
-                        )
-                
-                elif field == "creator":
-                    creator_validation = self.validator.validate_creator_format(str(field_value))
-                    validation_results["field_validations"][field] = creator_validation
-                    validation_results["warnings"].extend(creator_validation["suggestions"])
-                
-                else:
-                    validation_results["field_validations"][field] = {
-                        "status": "valid",
-                        "value": field_value
-                    }
-        
-        # Calculate completeness score
-        filled_fields = sum(1 for field in schema.keys() if metadata_section.get(field))
-        validation_results["completeness_score"] = filled_fields / len(schema)
-        
-        # Generate recommendations
-        if validation_results["completeness_score"] < 0.7:
-            validation_results["recommendations"].append(
-                "Consider filling more metadata fields to improve discoverability"
-            )
-        
-        if validation_results["invalid_fields"]:
-            validation_results["recommendations"].append(
-                "Fix invalid field formats for better data quality"
-            )
-        
-        # Set overall validity
-        validation_results["is_valid"] = (
-            len(validation_results["missing_fields"]) == 0 and 
-            len(validation_results["invalid_fields"]) == 0
-        )
-        
-        return validation_results
-
-    def _get_empty_metadata(self) -> Dict[str, Any]:
-        """Return empty metadata structure"""
-        return {
-            "dublin_core": {field: "" for field in self.dublin_core_schema.keys()},
-            "isad_g": {field: "" for field in self.isad_g_schema.keys()},
-            "confidence_score": 0.0,
-            "suggestions": [],
-            "quality_metrics": {
-                "completeness_score": 0.0,
-                "richness_score": 0.0
-            }
-        }
+# Status validasi manual yang disimpan di human_feedback
+HUMAN_VALIDATION_STATUSES = ["Setuju", "Perlu perbaikan", "Tolak"]
 
 def main():
+    # Konfigurasi halaman Streamlit (harus menjadi perintah Streamlit pertama)
+    st.set_page_config(
+        page_title="Metadata Curator Agent",
+        page_icon="📚",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
     st.title("🏛️ Enhanced Metadata Curator Agent")
     st.markdown("**AI Agent untuk Manajemen Metadata Arsip dengan Human-in-the-Loop**")
     
@@ -251,12 +61,19 @@ def main():
         st.markdown("### 📊 Statistik Database")
         
         # Initialize agent to get stats
-        agent = EnhancedMetadataCuratorAgent(api_key)
+        agent = EnhancedMetadataCuratorAgent(api_key, on_error=st.error)
         stats = agent.db.get_statistics()
         
         st.metric("Total Records", stats["total_records"])
         st.metric("Avg Confidence", f"{stats['average_confidence']:.3f}")
         st.metric("Avg Completeness", f"{stats['average_completeness']:.3f}")
+        
+        st.markdown("---")
+        if st.toggle("⏱️ Instrumentasi per tahap", value=instrumentation.is_enabled(),
+                     help="Ukur latensi ekstraksi teks, panggilan model, validasi dan penulisan SQLite"):
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
 
     # Main interface tabs
     tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
@@ -284,8 +101,8 @@ def main():
             if input_method == "Upload File":
                 uploaded_file = st.file_uploader(
                     "Upload dokumen arsip",
-                    type=['txt', 'pdf', 'doc', 'docx', 'json'],
-                    help="Format yang didukung: TXT, PDF, DOC, DOCX, JSON"
+                    type=['txt', 'pdf', 'doc', 'docx', 'json', 'jsonl', 'csv', 'xml', 'html', 'htm'],
+                    help="Format yang didukung: TXT, PDF, DOC, DOCX, JSON, CSV, XML (EAD), HTML"
                 )
                 
                 if uploaded_file is not None:
@@ -301,7 +118,7 @@ def main():
                     
                     if st.button("🤖 Ekstrak Metadata", type="primary"):
                         with st.spinner("Menganalisis dokumen dengan AI..."):
-                            metadata = agent.extract_metadata_from_text(content, uploaded_file.name)
+                            metadata = agent.extract_metadata_from_text(content, uploaded_file.name, schema_type=schema_type)
                             
                             # Save to database
                             metadata_id = agent.db.save_metadata(uploaded_file.name, metadata, schema_type)
@@ -322,7 +139,7 @@ def main():
                 
                 if manual_text and st.button("🤖 Ekstrak Metadata", type="primary"):
                     with st.spinner("Menganalisis teks dengan AI..."):
-                        metadata = agent.extract_metadata_from_text(manual_text, file_name)
+                        metadata = agent.extract_metadata_from_text(manual_text, file_name, schema_type=schema_type)
                         
                         # Save to database
                         metadata_id = agent.db.save_metadata(file_name or "manual_input", metadata, schema_type)
@@ -392,6 +209,31 @@ def main():
                 st.subheader("💡 Saran AI untuk Perbaikan")
                 for i, suggestion in enumerate(metadata["suggestions"][:5], 1):
                     st.info(f"{i}. {suggestion}")
+            
+            # Record serupa dari arsip dan usulan pengisian field kosong
+            similar_records = agent.find_similar_records(metadata, exclude_id=st.session_state.get("current_metadata_id"))
+            if similar_records:
+                st.subheader("🔎 Record Serupa")
+                df_similar = pd.DataFrame([
+                    {
+                        "ID": record["id"],
+                        "Judul": record["dublin_core"].get("title", ""),
+                        "Creator": record["dublin_core"].get("creator", ""),
+                        "Skor": record["similarity"]
+                    }
+                    for record in similar_records
+                ])
+                st.dataframe(df_similar, use_container_width=True)
+                
+                prefill = agent.suggest_prefill(metadata, similar_records)
+                if prefill:
+                    for field, consensus in prefill.items():
+                        st.info(f"**{field}**: '{consensus['value']}' ({consensus['support']:.0%} record serupa)")
+                    if st.button("✍️ Isi Field Kosong dari Record Serupa"):
+                        for field, consensus in prefill.items():
+                            metadata.setdefault("dublin_core", {})[field] = consensus["value"]
+                            st.session_state.pop(f"dc_{field}", None)
+                        st.rerun()
 
     with tab2:
         st.header("Validasi Metadata Lanjutan")
@@ -457,7 +299,7 @@ def main():
             with col1:
                 human_validation = st.radio(
                     "Status validasi Anda:",
-                    ["Belum ditentukan", "Setuju", "Perlu perbaikan", "Tolak"],
+                    ["Belum ditentukan"] + HUMAN_VALIDATION_STATUSES,
                     help="Berikan penilaian manual terhadap hasil AI"
                 )
             
@@ -477,26 +319,241 @@ def main():
                             human_validation,
                             feedback
                         )
+                        get_review_queue(agent.db).mark_reviewed(st.session_state.current_metadata_id)
                     
                     st.success(f"✅ Validasi disimpan: {human_validation}")
                     if feedback:
                         st.info(f"💬 Feedback: {feedback}")
         else:
             st.info("Silakan ekstrak metadata terlebih dahulu di tab 'Ekstraksi Metadata'")
+        
+        st.markdown("---")
+        st.subheader("🗂️ Antrian Review")
+        
+        # Record paling mendesak (confidence/kelengkapan rendah, ada inkonsistensi) diklaim per reviewer
+        review_queue = get_review_queue(agent.db)
+        review_queue.sync()
+        queue_stats = review_queue.stats()
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Menunggu Review", queue_stats["pending"])
+        with col2:
+            st.metric("Sedang Direview", queue_stats["claimed"])
+        with col3:
+            st.metric("Selesai", queue_stats["done"])
+        
+        reviewer = st.text_input("Nama reviewer", key="reviewer_name")
+        if reviewer:
+            if st.button("📥 Ambil Record Berikutnya"):
+                st.session_state.review_item = review_queue.claim(reviewer)
+                if st.session_state.review_item is None:
+                    st.info("Antrian review kosong.")
+            
+            review_item = st.session_state.get("review_item")
+            if review_item is not None:
+                record = agent.db.get_metadata_detail(review_item)
+                st.markdown(f"**#{record['id']} · {record['file_name']}** — confidence {record['confidence_score'] or 0:.3f}")
+                with st.expander("Metadata", expanded=True):
+                    st.json(record["dublin_core"] if record["schema_type"] == "dublin_core" else record["isad_g"])
+                if record["validations"]:
+                    last_validation = record["validations"][0]
+                    st.caption(
+                        f"Kelengkapan {last_validation['completeness_score'] or 0:.3f} · "
+                        f"field hilang: {last_validation['missing_fields'] or '-'}"
+                    )
+                
+                review_status = st.selectbox("Penilaian", HUMAN_VALIDATION_STATUSES, key="review_status")
+                review_feedback = st.text_area("Feedback", key="review_feedback")
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("💾 Simpan Review", type="primary"):
+                        if review_queue.complete(review_item, reviewer, review_status, review_feedback):
+                            st.success(f"✅ Review record #{review_item} disimpan")
+                        else:
+                            st.warning("Klaim sudah kedaluwarsa dan record diambil reviewer lain.")
+                        st.session_state.review_item = None
+                with col2:
+                    if st.button("↩️ Kembalikan ke Antrian"):
+                        review_queue.release(review_item, reviewer)
+                        st.session_state.review_item = None
 
     # Continue with other tabs...
     with tab3:
         st.header("📊 Analisis Batch Metadata")
-        st.info("Tab ini akan dikembangkan untuk analisis batch multiple dokumen")
+        
+        # Ekstraksi + validasi banyak file lewat antrian job persisten
+        job_queue = get_job_queue(agent.db)
+        job_queue.register("extract_validate", agent.process_batch_item)
+        job_queue.start_workers(BATCH_WORKERS)
+        
+        # Batas token untuk seluruh antrian; worker berhenti mengklaim item saat batas tercapai
+        token_ceiling = st.number_input(
+            "Batas token batch (0 = tanpa batas)", min_value=0, step=100000,
+            value=job_queue.token_budget.ceiling if job_queue.token_budget else 0, key="batch_token_ceiling"
+        )
+        job_queue.set_token_budget(int(token_ceiling))
+        if job_queue.token_budget is not None:
+            budget = job_queue.token_budget
+            st.caption(f"Token terpakai: {budget.used:,} / {budget.ceiling:,}")
+            if budget.exhausted:
+                st.warning("⛔ Batas token tercapai; job dihentikan sementara. Naikkan batas untuk melanjutkan.")
+        
+        st.subheader("📥 Batch Ekstraksi & Validasi")
+        batch_files = st.file_uploader(
+            "Upload beberapa dokumen arsip",
+            type=['txt', 'pdf', 'doc', 'docx', 'json', 'jsonl', 'csv', 'xml', 'html', 'htm'],
+            accept_multiple_files=True,
+            key="batch_files"
+        )
+        if batch_files and st.button("➕ Antrikan Job", type="primary"):
+            job_id = job_queue.enqueue("extract_validate", [
+                {
+                    "key": batch_file.name,
+                    "payload": {"file_name": batch_file.name, "mime_type": batch_file.type, "schema_type": schema_type},
+                    "content": batch_file.getvalue()
+                }
+                for batch_file in batch_files
+            ], params={"schema_type": schema_type})
+            st.success(f"✅ Job #{job_id} dengan {len(batch_files)} file masuk antrian")
+        
+        jobs = job_queue.list_jobs(limit=10)
+        if jobs:
+            st.button("🔄 Refresh Progres")
+            for job in jobs:
+                progress = job["progress"]
+                finished = progress["done"] + progress["failed"]
+                st.markdown(
+                    f"**Job #{job['id']}** — {job['status']} · {finished}/{job['total_items']} selesai"
+                    f" · {progress['failed']} gagal"
+                )
+                st.progress(finished / job["total_items"] if job["total_items"] else 1.0)
+                if job["status"] in ("queued", "running") and st.button("⛔ Batalkan", key=f"cancel_job_{job['id']}"):
+                    job_queue.cancel(job["id"])
+                if progress["failed"]:
+                    with st.expander(f"Item gagal pada job #{job['id']}", expanded=False):
+                        for item in job_queue.get_job_items(job["id"], status="failed", limit=20):
+                            st.error(f"{item['item_key']}: {(item['error'] or '').splitlines()[0]}")
+        
+        st.markdown("---")
+        st.subheader("🔍 Analisis Inkonsistensi Inkremental")
+        
+        # Analyzer inkremental: hanya record baru sejak watermark yang diproses
+        analyzer = get_analyzer(agent.db)
+        analysis_state = agent.db.get_analysis_state(analyzer.name)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Record Teranalisis", analysis_state["records"])
+        with col2:
+            st.metric("Record Baru", max(stats["total_records"] - analysis_state["records"], 0))
+        with col3:
+            st.metric("Watermark (ID)", analysis_state["watermark"])
+        
+        if analyzer.is_running:
+            st.info("⏳ Analisis sedang berjalan di background...")
+        elif st.button("🔍 Analisis Record Baru", type="primary"):
+            analyzer.start()
+            st.info("⏳ Analisis dimulai di background. Buka kembali tab ini untuk melihat hasilnya.")
+        
+        if analyzer.last_error:
+            st.error(f"Analisis gagal: {analyzer.last_error}")
+        elif analyzer.last_result:
+            st.success(
+                f"Run terakhir memproses {analyzer.last_result['processed']} record baru "
+                f"dan menemukan {len(analyzer.last_result['reports'])} temuan baru"
+            )
+        
+        st.subheader("🚩 Laporan Inkonsistensi")
+        reports = agent.db.get_inconsistency_reports(limit=50)
+        if reports:
+            df_reports = pd.DataFrame([
+                {
+                    "Waktu": report["created_at"],
+                    "Jenis": report["report_type"],
+                    "Temuan": report["issues"].get("message", ""),
+                    "Contoh Record": ", ".join(str(record_id) for record_id in report["metadata_ids"][:10])
+                }
+                for report in reports
+            ])
+            st.dataframe(df_reports, use_container_width=True)
+        else:
+            st.info("Belum ada laporan inkonsistensi.")
 
     with tab4:
         st.header("🔗 Linked Data Generation")
         if "current_metadata" in st.session_state:
             if st.button("Generate Linked Data"):
-                # Implement linked data generation
-                st.json({"@context": "Work in progress"})
+                linked_data = {"@context": dict(LINKED_DATA_CONTEXT)}
+                linked_data.update(record_to_jsonld(
+                    st.session_state.get("current_metadata_id", 0),
+                    st.session_state.current_metadata.get("dublin_core", {})
+                ))
+                st.json(linked_data)
         else:
             st.info("Silakan ekstrak metadata terlebih dahulu")
+        
+        # Ekspor seluruh arsip secara streaming
+        st.subheader("📦 Ekspor Seluruh Arsip")
+        col1, col2 = st.columns(2)
+        with col1:
+            export_format = st.selectbox(
+                "Format",
+                list(EXPORT_FORMATS),
+                format_func=lambda x: {"jsonld": "JSON-LD", "nt": "N-Triples", "nq": "N-Quads"}[x]
+            )
+            compress = st.checkbox("Kompres (gzip)", value=True)
+        with col2:
+            chunk_records = st.number_input("Record per file (0 = satu file)", min_value=0, value=100000, step=10000)
+            output_dir = st.text_input("Direktori output", value="exports")
+        
+        if st.button("📤 Ekspor Linked Data", type="primary"):
+            exporter = LinkedDataExporter(agent.db)
+            extension = EXPORT_FORMATS[export_format] + (".gz" if compress else "")
+            output = (
+                Path(output_dir) / f"linked_data_{export_format}" if chunk_records
+                else Path(output_dir) / f"linked_data{extension}"
+            )
+            with st.spinner("Mengekspor seluruh record..."):
+                export_result = exporter.export(output, export_format, compress, int(chunk_records) or None)
+            st.success(f"✅ {export_result['records']} record diekspor ke {len(export_result['files'])} file")
+            st.write(export_result["files"])
+        
+        # Eksplorasi graf: pola triple atas creator, subject, coverage dan relation
+        st.subheader("🕸️ Eksplorasi Graf Metadata")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            graph_subject = st.text_input("Subjek (kosong = bebas)", placeholder="ID record, mis. 12")
+        with col2:
+            graph_predicate = st.selectbox(
+                "Predikat", ["(bebas)"] + [DUBLIN_CORE_PROPERTIES[field] for field in GRAPH_FIELDS]
+            )
+        with col3:
+            graph_object = st.text_input("Objek (kosong = bebas)", placeholder="mis. Departemen Keuangan")
+        
+        if st.button("🔎 Cari Triple"):
+            store = get_triple_store(agent.db)
+            subject = graph_subject.strip()
+            if subject.isdigit():
+                subject = store.record_iri(int(subject))
+            matches = list(islice(store.match(
+                subject or None,
+                None if graph_predicate == "(bebas)" else graph_predicate,
+                graph_object.strip() or None
+            ), 500))
+            st.caption(f"{len(store)} triple di indeks; menampilkan maksimal 500 hasil")
+            if matches:
+                st.dataframe(pd.DataFrame(matches, columns=["Subjek", "Predikat", "Objek"]), use_container_width=True)
+                if subject:
+                    chain = store.traverse(subject)
+                    if chain:
+                        st.markdown("**Rantai relasi (provenance)**")
+                        st.dataframe(
+                            pd.DataFrame(chain, columns=["Kedalaman", "Subjek", "Predikat", "Objek"]),
+                            use_container_width=True
+                        )
+            else:
+                st.info("Tidak ada triple yang cocok.")
 
     with tab5:
         st.header("📊 Dashboard Metadata")
@@ -517,24 +574,180 @@ def main():
             df_schema = pd.DataFrame(list(stats["schema_distribution"].items()), 
                                    columns=["Schema", "Count"])
             st.bar_chart(df_schema.set_index("Schema"))
+        
+        # Quality distribution over the full database
+        st.subheader("📊 Distribusi Kualitas Seluruh Arsip")
+        if st.button("Hitung Distribusi Kualitas"):
+            archive_quality = agent.calculate_archive_quality()
+            scores = archive_quality["scores"]
+            
+            if scores.empty:
+                st.info("Belum ada metadata di database.")
+            else:
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Median Completeness", f"{scores['completeness_score'].median():.3f}")
+                with col2:
+                    st.metric("Median Richness", f"{scores['richness_score'].median():.3f}")
+                with col3:
+                    st.metric("Consistency", f"{archive_quality['consistency']['overall']:.3f}")
+                
+                bins = [i / 10 for i in range(11)]
+                labels = [f"{low:.1f}-{high:.1f}" for low, high in zip(bins[:-1], bins[1:])]
+                df_distribution = pd.DataFrame({
+                    column: pd.cut(scores[column], bins=bins, labels=labels, include_lowest=True).value_counts().sort_index()
+                    for column in ["completeness_score", "richness_score"]
+                })
+                st.bar_chart(df_distribution)
+                
+                with st.expander("Statistik Format per Field", expanded=False):
+                    for field, statistics in archive_quality["field_statistics"].items():
+                        st.markdown(f"**{field}** — ±{statistics['distinct_estimate']} nilai unik")
+                        if statistics["formats"]:
+                            st.bar_chart(pd.Series(statistics["formats"], name="Count"))
+        
+        # Pemakaian token dan biaya model
+        st.subheader("💰 Pemakaian Token & Biaya Model")
+        usage_totals = agent.usage.totals()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Panggilan Model", usage_totals["calls"])
+        with col2:
+            st.metric("Total Token", f"{usage_totals['total_tokens']:,}")
+        with col3:
+            st.metric("Estimasi Biaya", f"${usage_totals['cost_usd']:.4f}")
+        if usage_totals["calls"]:
+            usage_group = st.selectbox(
+                "Kelompokkan per", list(USAGE_GROUPS),
+                format_func=lambda x: {"day": "Hari", "file_type": "Jenis File", "schema_type": "Skema",
+                                       "model_name": "Model", "prompt_version": "Versi Prompt"}[x],
+                key="usage_group"
+            )
+            df_usage = pd.DataFrame(agent.usage.usage_summary(usage_group, limit=60))
+            st.dataframe(df_usage, use_container_width=True)
+            if usage_group == "day":
+                st.bar_chart(df_usage.set_index("group")[["cost_usd"]].sort_index())
+        
+        # Latensi per tahap pipeline dari instrumentasi
+        st.subheader("⏱️ Latensi Pipeline")
+        metrics = instrumentation.snapshot()
+        if not metrics["enabled"] and not metrics["stages"]:
+            st.info("Aktifkan instrumentasi di sidebar untuk mengukur latensi per tahap.")
+        else:
+            if metrics["stages"]:
+                df_stages = pd.DataFrame.from_dict(metrics["stages"], orient="index").sort_values(
+                    "total_seconds", ascending=False
+                )
+                st.dataframe(df_stages, use_container_width=True)
+            
+            counters = metrics["counters"]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                hit_rate = metrics["cache_hit_rate"]
+                st.metric("Cache Hit Rate", f"{hit_rate:.1%}" if hit_rate is not None else "-")
+            with col2:
+                st.metric("Model Calls", int(sum(counters.get("model_calls_total", {}).values())),
+                          delta=f"{int(counters.get('model_calls_total', {}).get('status=error', 0))} error",
+                          delta_color="inverse")
+            with col3:
+                st.metric("Retries", int(sum(counters.get("retries_total", {}).values())))
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button(
+                    "📥 Export Prometheus", instrumentation.export_prometheus(),
+                    file_name="metrics.prom", mime="text/plain"
+                )
+            with col2:
+                if st.button("Reset Metrik"):
+                    instrumentation.REGISTRY.reset()
+                    st.rerun()
 
     with tab6:
         st.header("📋 Riwayat Metadata")
         
-        history = agent.db.get_metadata_history(limit=20)
+        # Filter dan urutan dijalankan di SQL; hanya satu halaman yang dibaca
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            history_schema = st.selectbox(
+                "Skema", ["", "dublin_core", "isad_g"],
+                format_func=lambda x: {"": "Semua", "dublin_core": "Dublin Core", "isad_g": "ISAD(G)"}[x],
+                key="history_schema"
+            )
+            history_status = st.selectbox(
+                "Status Validasi", ["", "unreviewed"] + HUMAN_VALIDATION_STATUSES,
+                format_func=lambda x: {"": "Semua", "unreviewed": "Belum direview"}.get(x, x),
+                key="history_status"
+            )
+        with col2:
+            confidence_range = st.slider("Rentang Confidence", 0.0, 1.0, (0.0, 1.0), step=0.05, key="history_confidence")
+            history_dates = st.date_input("Rentang Tanggal", value=(), key="history_dates")
+        with col3:
+            history_sort = st.selectbox(
+                "Urutkan", list(HISTORY_SORT_COLUMNS),
+                format_func=lambda x: {"created_at": "Tanggal", "confidence_score": "Confidence", "id": "ID"}[x],
+                key="history_sort"
+            )
+            history_descending = st.checkbox("Menurun", value=True, key="history_descending")
+            page_size = st.selectbox("Baris per halaman", [25, 50, 100, 200], index=1, key="history_page_size")
+        
+        history_filters = {
+            "schema_type": history_schema or None,
+            "validation_status": history_status or None,
+            "min_confidence": confidence_range[0] if confidence_range[0] > 0 else None,
+            "max_confidence": confidence_range[1] if confidence_range[1] < 1 else None,
+            "date_from": history_dates[0] if len(history_dates) > 0 else None,
+            "date_to": history_dates[-1] if len(history_dates) > 0 else None
+        }
         
-        if history:
-            # Convert to DataFrame
-            df = pd.DataFrame(history)
-            
-            # Display table
+        # Stack cursor halaman; direset bila filter/urutan berubah
+        query_signature = json.dumps([history_filters, history_sort, history_descending, page_size], default=str)
+        if st.session_state.get("history_signature") != query_signature:
+            st.session_state.history_signature = query_signature
+            st.session_state.history_cursors = [None]
+        cursors = st.session_state.history_cursors
+        
+        page = agent.db.get_metadata_page(
+            history_filters, history_sort, history_descending, cursors[-1], page_size
+        )
+        total = agent.db.count_metadata(history_filters)
+        
+        if page["rows"]:
+            df = pd.DataFrame(page["rows"])
+            st.caption(f"Halaman {len(cursors)} · {total} record cocok")
             st.dataframe(
-                df[["file_name", "confidence_score", "completeness_score", 
-                   "validation_status", "created_at"]],
+                df[["id", "file_name", "schema_type", "confidence_score", "completeness_score",
+                    "validation_status", "created_at"]],
                 use_container_width=True
             )
             
-            # Export options
+            col1, col2, _ = st.columns([1, 1, 4])
+            with col1:
+                if len(cursors) > 1 and st.button("⬅️ Sebelumnya"):
+                    cursors.pop()
+                    st.rerun()
+            with col2:
+                if page["next_cursor"] is not None and st.button("Berikutnya ➡️"):
+                    cursors.append(page["next_cursor"])
+                    st.rerun()
+            
+            # Detail dimuat hanya untuk record yang dipilih
+            detail_id = st.selectbox(
+                "Lihat detail record", [None] + df["id"].tolist(),
+                format_func=lambda x: "—" if x is None else f"#{x}",
+                key="history_detail"
+            )
+            if detail_id is not None:
+                detail = agent.db.get_metadata_detail(detail_id)
+                with st.expander(f"Detail record #{detail_id}", expanded=True):
+                    st.json({
+                        "dublin_core": detail.get("dublin_core", {}),
+                        "isad_g": detail.get("isad_g", {}),
+                        "validations": detail.get("validations", []),
+                        "feedback": detail.get("feedback", [])
+                    })
+            
+            # Export halaman yang sedang ditampilkan
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("📥 Export CSV"):
@@ -555,6 +768,8 @@ def main():
                         file_name="metadata_history.json",
                         mime="application/json"
                     )
+        elif len(cursors) > 1 or any(value is not None for value in history_filters.values()):
+            st.info("Tidak ada record yang cocok dengan filter.")
         else:
             st.info("Belum ada riwayat metadata. Mulai dengan mengekstrak metadata pada tab pertama.")
 
@@ -0,0 +1,415 @@
+"""
+Entity resolution untuk nama creator
+
+Tahapan:
+1. Normalisasi: lowercase, hapus diakritik dan tanda baca, ekspansi singkatan
+   ("Dept. Keuangan" -> "departemen keuangan").
+2. Blocking: indeks n-gram karakter dengan prefix filtering - hanya n-gram
+   paling jarang dari setiap nama yang diindeks, sehingga kandidat pasangan
+   dibatasi pada nama yang mungkin memenuhi ambang Jaccard.
+3. Scoring: Jaccard n-gram hanya untuk kandidat dalam blok yang sama.
+4. Clustering: nama diproses dari yang paling sering; nama bergabung ke
+   cluster hanya jika mirip (>= ambang) dengan kunci kanonik cluster dan
+   tidak bertentangan dengan anggota mana pun (tingkat wilayah, arah atau
+   nama tempat berbeda). Tidak ada penggabungan transitif lewat rantai
+   nama yang masing-masing hanya mirip dengan tetangganya.
+
+Kompleksitas mendekati linear terhadap jumlah nama unik, bukan O(n^2).
+"""
+
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from math import ceil
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+import re
+import unicodedata
+
+# Singkatan umum pada nama instansi (kunci tanpa titik, lowercase)
+CREATOR_ABBREVIATIONS = MappingProxyType({
+    "dept": "departemen",
+    "dep": "departemen",
+    "depart": "departemen",
+    "department": "departemen",
+    "kemen": "kementerian",
+    "kem": "kementerian",
+    "kementrian": "kementerian",
+    "ministry": "kementerian",
+    "ditjen": "direktorat jenderal",
+    "dirjen": "direktur jenderal",
+    "dit": "direktorat",
+    "setjen": "sekretariat jenderal",
+    "sekjen": "sekretaris jenderal",
+    "setda": "sekretariat daerah",
+    "bag": "bagian",
+    "subbag": "sub bagian",
+    "bid": "bidang",
+    "prov": "provinsi",
+    "propinsi": "provinsi",
+    "kab": "kabupaten",
+    "kec": "kecamatan",
+    "kel": "kelurahan",
+    "pemprov": "pemerintah provinsi",
+    "pemkab": "pemerintah kabupaten",
+    "pemkot": "pemerintah kota",
+    "univ": "universitas",
+    "ri": "republik indonesia",
+    "nas": "nasional",
+    "jend": "jenderal",
+    "sekr": "sekretariat",
+    "sek": "sekretariat",
+    "bdn": "badan",
+    "yay": "yayasan",
+})
+
+# Gelar/sapaan yang diabaikan saat membandingkan nama orang
+CREATOR_TITLES = frozenset({"ir", "dr", "drs", "dra", "prof", "h", "hj", "mr", "mrs", "bpk", "ibu", "sdr"})
+
+# Ejaan lama (van Ophuijsen/Soewandi) -> EYD: "Soekarno" ~ "Sukarno"
+_OLD_SPELLING = (("oe", "u"), ("dj", "j"), ("tj", "c"), ("nj", "ny"), ("sj", "sy"), ("ch", "kh"))
+
+# Kualifikasi nasional yang sering ditambahkan/dihilangkan ("Arsip Nasional RI")
+_NATIONAL_SUFFIX = " republik indonesia"
+
+# Ambang Jaccard n-gram default untuk menggabungkan varian nama
+CREATOR_SIMILARITY_THRESHOLD = 0.75
+
+# Ukuran n-gram karakter untuk blocking dan scoring
+CREATOR_NGRAM_SIZE = 3
+
+# N-gram yang dimiliki lebih banyak kunci dari ini tidak dipakai sebagai blok kandidat
+CREATOR_MAX_POSTINGS = 1000
+
+# Tingkat wilayah administratif: tingkat berbeda berarti instansi berbeda
+ADMINISTRATIVE_LEVELS = frozenset({"provinsi", "kabupaten", "kota", "kecamatan", "kelurahan", "desa"})
+
+# Penunjuk arah pada nama wilayah ("Jawa Barat" vs "Jawa Timur")
+DIRECTION_TOKENS = frozenset({"utara", "selatan", "barat", "timur", "tengah", "tenggara", "daya", "laut"})
+
+# Kemiripan minimal dua token nama tempat agar dianggap salah ketik, bukan tempat lain
+PLACE_TYPO_RATIO = 0.8
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_creator(name: str, abbreviations: Optional[Mapping[str, str]] = None) -> str:
+    """Normalisasi nama creator untuk pencocokan entitas"""
+    abbreviations = CREATOR_ABBREVIATIONS if abbreviations is None else abbreviations
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    text = _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text)).strip()
+    for old, new in _OLD_SPELLING:
+        text = text.replace(old, new)
+    tokens = [abbreviations.get(token, token) for token in text.split() if token not in CREATOR_TITLES]
+    normalized = " ".join(tokens)
+    if normalized.endswith(_NATIONAL_SUFFIX) and normalized != _NATIONAL_SUFFIX.strip():
+        normalized = normalized[:-len(_NATIONAL_SUFFIX)]
+    return normalized
+
+
+def _ngrams(text: str, size: int = CREATOR_NGRAM_SIZE) -> frozenset:
+    padded = f" {text} "
+    if len(padded) <= size:
+        return frozenset([padded])
+    return frozenset(padded[i:i + size] for i in range(len(padded) - size + 1))
+
+
+def _jaccard(first: frozenset, second: frozenset) -> float:
+    shared = len(first & second)
+    return shared / (len(first) + len(second) - shared)
+
+
+def _place_tokens(tokens: List[str]) -> List[str]:
+    """Token nama tempat setelah token tingkat wilayah pertama"""
+    for position, token in enumerate(tokens):
+        if token in ADMINISTRATIVE_LEVELS:
+            return [token for token in tokens[position + 1:] if token not in ADMINISTRATIVE_LEVELS]
+    return []
+
+
+def creators_conflict(first: str, second: str) -> bool:
+    """True jika dua kunci ternormalisasi merujuk instansi berbeda walau mirip
+
+    Tingkat wilayah (kota/kabupaten/provinsi ...) dan penunjuk arah harus
+    sama, dan nama tempat setelah tingkat wilayah hanya boleh berbeda karena
+    salah ketik ("Kota Bandng" ~ "Kota Bandung", bukan "Kota Bogor").
+    """
+    first_tokens, second_tokens = first.split(), second.split()
+    for tokens in (ADMINISTRATIVE_LEVELS, DIRECTION_TOKENS):
+        if tokens.intersection(first_tokens) != tokens.intersection(second_tokens):
+            return True
+    first_place, second_place = _place_tokens(first_tokens), _place_tokens(second_tokens)
+    if len(first_place) != len(second_place):
+        return True
+    return any(
+        first_token != second_token and SequenceMatcher(None, first_token, second_token).ratio() < PLACE_TYPO_RATIO
+        for first_token, second_token in zip(first_place, second_place)
+    )
+
+
+class CreatorCluster(NamedTuple):
+    """Cluster nama creator yang kemungkinan merujuk entitas sama"""
+    canonical: str               # varian paling sering
+    variants: Tuple[str, ...]    # semua varian mentah, terurut frekuensi
+    occurrences: int             # total kemunculan semua varian
+    min_similarity: float        # skor Jaccard terendah anggota terhadap kunci kanonik
+
+
+class KnownCreators:
+    """Kunci creator yang sudah di-cluster, untuk CreatorResolver.assign_entities
+
+    Dibangun dari baris creator_entities (variant, normalized, entity_id,
+    occurrences). candidates() memakai posting list n-gram: kunci dengan
+    Jaccard >= t pasti berbagi salah satu dari |x| - ceil(t*|x|) + 1 n-gram
+    terjarang kunci probe.
+    """
+
+    def __init__(self, rows: Iterable[Mapping[str, Any]], ngram_size: int = CREATOR_NGRAM_SIZE):
+        self.entities: Dict[str, int] = {}
+        self.occurrences: Counter = Counter()
+        for row in rows:
+            self.entities[row["normalized"]] = row["entity_id"]
+            self.occurrences[row["normalized"]] += row["occurrences"]
+        self.entity_members: Dict[int, Dict[str, int]] = defaultdict(dict)
+        self.postings: Dict[str, List[str]] = defaultdict(list)
+        for key, entity_id in self.entities.items():
+            self.entity_members[entity_id][key] = self.occurrences[key]
+            for gram in _ngrams(key, ngram_size):
+                self.postings[gram].append(key)
+
+    def entity_of(self, key: str) -> Optional[int]:
+        return self.entities.get(key)
+
+    def members(self, entity_id: int) -> Dict[str, int]:
+        """Kunci anggota entity beserta jumlah kemunculannya"""
+        return dict(self.entity_members.get(entity_id, {}))
+
+    def max_entity_id(self) -> int:
+        return max(self.entities.values(), default=0)
+
+    def candidates(self, grams: frozenset, threshold: float, max_postings: int = CREATOR_MAX_POSTINGS) -> Set[str]:
+        """Kunci tersimpan yang mungkin memiliki Jaccard >= threshold dengan grams"""
+        ranked = sorted(grams, key=lambda gram: (len(self.postings.get(gram, ())), gram))
+        result: Set[str] = set()
+        for gram in ranked[:len(ranked) - ceil(threshold * len(ranked)) + 1]:
+            block = self.postings.get(gram, ())
+            if len(block) <= max_postings:
+                result.update(block)
+        return result
+
+
+class CreatorResolver:
+    """Resolver entitas creator dengan blocking n-gram dan similarity Jaccard"""
+
+    def __init__(self, threshold: float = CREATOR_SIMILARITY_THRESHOLD, ngram_size: int = CREATOR_NGRAM_SIZE,
+                 max_block_size: int = 100, abbreviations: Optional[Mapping[str, str]] = None):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.ngram_size = ngram_size
+        self.max_block_size = max_block_size
+        self.abbreviations = CREATOR_ABBREVIATIONS if abbreviations is None else abbreviations
+        self.counts: Counter = Counter()
+        self._grams: Dict[str, frozenset] = {}
+
+    def add(self, name: str, count: int = 1):
+        """Tambahkan satu nama creator mentah"""
+        name = str(name).strip()
+        if name:
+            self.counts[name] += count
+
+    def add_many(self, names: Iterable[str]) -> "CreatorResolver":
+        """Tambahkan banyak nama creator"""
+        for name in names:
+            self.add(name)
+        return self
+
+    def grams(self, key: str) -> frozenset:
+        """Set n-gram kunci ternormalisasi (di-cache)"""
+        grams = self._grams.get(key)
+        if grams is None:
+            grams = self._grams[key] = _ngrams(key, self.ngram_size)
+        return grams
+
+    def similarity(self, first: str, second: str) -> float:
+        """Jaccard n-gram dua kunci ternormalisasi"""
+        return _jaccard(self.grams(first), self.grams(second))
+
+    def normalized_counts(self) -> Counter:
+        """Jumlah kemunculan per kunci ternormalisasi"""
+        counts: Counter = Counter()
+        for name, count in self.counts.items():
+            counts[normalize_creator(name, self.abbreviations)] += count
+        return counts
+
+    def _best_cluster(self, key: str, clusters: Iterable[Tuple[Any, Mapping[str, int]]]) -> Tuple[Any, float]:
+        """Cluster dengan kunci kanonik paling mirip yang boleh menerima key
+
+        Kunci kanonik adalah anggota dengan kemunculan terbanyak. key harus
+        mirip (>= threshold) dengan kunci kanonik dan tidak bertentangan
+        dengan anggota mana pun.
+        """
+        best, best_score = None, 0.0
+        for cluster, members in clusters:
+            canonical = min(members, key=lambda member: (-members[member], member))
+            score = self.similarity(key, canonical)
+            if score < self.threshold or score <= best_score:
+                continue
+            if any(creators_conflict(key, member) for member in members):
+                continue
+            best, best_score = cluster, score
+        return best, best_score
+
+    def resolve(self) -> List[CreatorCluster]:
+        """Bentuk cluster varian nama; hanya cluster dengan >1 varian yang dikembalikan"""
+        raw_names = list(self.counts)
+
+        # Tahap 1: varian yang identik setelah normalisasi digabung langsung
+        key_index: Dict[str, int] = {}
+        raw_to_key: List[int] = []
+        key_counts: Counter = Counter()
+        for name in raw_names:
+            key = normalize_creator(name, self.abbreviations)
+            key_id = key_index.setdefault(key, len(key_index))
+            raw_to_key.append(key_id)
+            key_counts[key_id] += self.counts[name]
+        keys = list(key_index)
+
+        # Tahap 2: similarity join n-gram antar kunci ternormalisasi
+        neighbors: Dict[int, Set[int]] = defaultdict(set)
+        for first, second, _ in self.similar_pairs(keys):
+            neighbors[first].add(second)
+            neighbors[second].add(first)
+
+        # Tahap 3: cluster dibentuk dari kunci paling sering (kunci kanonik tetap)
+        cluster_of: Dict[int, int] = {}
+        members: Dict[int, Dict[str, int]] = {}
+        min_scores: Dict[int, float] = {}
+        for key_id in sorted(range(len(keys)), key=lambda item: (-key_counts[item], keys[item])):
+            candidates = {cluster_of[neighbor] for neighbor in neighbors[key_id] if neighbor in cluster_of}
+            cluster, score = self._best_cluster(
+                keys[key_id], ((candidate, members[candidate]) for candidate in sorted(candidates))
+            )
+            if cluster is None:
+                cluster, score = key_id, 1.0
+                members[cluster] = {}
+            members[cluster][keys[key_id]] = key_counts[key_id]
+            min_scores[cluster] = min(min_scores.get(cluster, 1.0), score)
+            cluster_of[key_id] = cluster
+
+        groups: Dict[int, List[str]] = defaultdict(list)
+        for name, key_id in zip(raw_names, raw_to_key):
+            groups[cluster_of[key_id]].append(name)
+
+        clusters = []
+        for root, variants in groups.items():
+            if len(variants) < 2:
+                continue
+            variants.sort(key=lambda variant: (-self.counts[variant], variant))
+            clusters.append(CreatorCluster(
+                canonical=variants[0],
+                variants=tuple(variants),
+                occurrences=sum(self.counts[variant] for variant in variants),
+                min_similarity=round(min_scores[root], 3)
+            ))
+        clusters.sort(key=lambda cluster: -cluster.occurrences)
+        return clusters
+
+    def assign_entities(self, known: KnownCreators) -> Dict[str, int]:
+        """Petakan kunci ternormalisasi nama yang ditambahkan lewat add() ke entity id
+
+        Kunci yang sudah dikenal mempertahankan entity-nya. Kunci baru
+        (dari yang paling sering) bergabung ke entity tersimpan atau entity
+        baru run ini dengan aturan cluster yang sama seperti resolve();
+        entity lama tidak pernah digabung satu sama lain. Kandidat entity
+        tersimpan diambil lewat known.candidates, sehingga biaya sebanding
+        dengan jumlah nama baru.
+        """
+        counts = self.normalized_counts()
+        entities: Dict[str, int] = {}
+        new_keys = []
+        for key in counts:
+            entity_id = known.entity_of(key)
+            if entity_id is None:
+                new_keys.append(key)
+            else:
+                entities[key] = entity_id
+        new_keys.sort(key=lambda key: (-counts[key], key))
+
+        neighbors: Dict[int, Set[int]] = defaultdict(set)
+        for first, second, _ in self.similar_pairs(new_keys):
+            neighbors[first].add(second)
+            neighbors[second].add(first)
+
+        members: Dict[int, Dict[str, int]] = {}
+        next_entity = known.max_entity_id() + 1
+        for position, key in enumerate(new_keys):
+            candidates = {known.entity_of(candidate) for candidate in known.candidates(self.grams(key), self.threshold)}
+            candidates.update(entities[new_keys[neighbor]] for neighbor in neighbors[position]
+                              if new_keys[neighbor] in entities)
+            for entity_id in candidates:
+                if entity_id not in members:
+                    members[entity_id] = known.members(entity_id)
+            entity_id, _ = self._best_cluster(key, ((entity_id, members[entity_id]) for entity_id in sorted(candidates)))
+            if entity_id is None:
+                entity_id = next_entity
+                next_entity += 1
+                members[entity_id] = {}
+            members[entity_id][key] = counts[key]
+            entities[key] = entity_id
+        return entities
+
+    def similar_pairs(self, keys: List[str], start: int = 0) -> Iterable[Tuple[int, int, float]]:
+        """Yield pasangan (i, j, skor) dengan Jaccard n-gram >= threshold
+
+        Prefix filtering: n-gram diberi id menurut frekuensi (paling jarang
+        dulu) dan kunci diproses dari yang terpendek. Dua set dengan
+        Jaccard >= t pasti berbagi n-gram di prefix probe |x| - ceil(t*|x|) + 1
+        dan prefix indeks |y| - ceil(2t/(1+t)*|y|) + 1, sehingga hanya
+        n-gram jarang yang masuk indeks. Blok yang lebih besar dari
+        max_block_size dilewati agar biaya per kunci tetap terbatas.
+
+        Jika start > 0, pasangan yang kedua kuncinya berada sebelum start
+        (sudah dibandingkan pada run sebelumnya) tidak diverifikasi ulang.
+        """
+        grams = [self.grams(key) for key in keys]
+        frequency = Counter(gram for gram_set in grams for gram in gram_set)
+        gram_ids = {gram: rank for rank, (gram, _) in enumerate(sorted(frequency.items(), key=lambda item: (item[1], item[0])))}
+        ranked = [sorted(gram_ids[gram] for gram in gram_set) for gram_set in grams]
+        sets = [frozenset(ids) for ids in ranked]
+        sizes = [len(ids) for ids in ranked]
+        del grams, frequency, gram_ids
+
+        threshold = self.threshold
+        index_ratio = 2 * threshold / (1 + threshold)
+        max_block_size = self.max_block_size
+        index: Dict[int, List[int]] = defaultdict(list)
+        for current in sorted(range(len(keys)), key=lambda item: len(ranked[item])):
+            ids = ranked[current]
+            size = len(ids)
+            probe_length = size - ceil(threshold * size) + 1
+            index_length = size - ceil(index_ratio * size) + 1
+
+            candidates = set()
+            for position, gram in enumerate(ids[:probe_length]):
+                block = index[gram]
+                if len(block) >= max_block_size:
+                    continue
+                candidates.update(block)
+                if position < index_length:
+                    block.append(current)
+
+            gram_set = sets[current]
+            minimum_size = threshold * size
+            for candidate in candidates:
+                if current < start and candidate < start:
+                    continue
+                other_size = sizes[candidate]
+                # Length filter: kandidat yang terlalu kecil tidak mungkin lolos
+                if other_size < minimum_size:
+                    continue
+                shared = len(gram_set & sets[candidate])
+                score = shared / (size + other_size - shared)
+                if score >= threshold:
+                    yield candidate, current, score
@@ -0,0 +1,284 @@
+"""
+Layanan HTTP lokal untuk ekstraksi, validasi dan pencarian metadata
+
+Server asyncio (tanpa dependensi tambahan) di atas EnhancedMetadataCuratorAgent.
+Pekerjaan blocking (panggilan model, ekstraksi teks, SQLite) dijalankan di
+worker pool bersama. Request identik yang sedang diproses digabung ke satu
+eksekusi (coalescing), dan request baru ditolak dengan 503 + Retry-After bila
+antrian worker penuh (backpressure), sehingga latensi tetap terkendali saat
+beban melebihi kapasitas model.
+
+Endpoint (JSON):
+    POST /extract   {"text", "file_name"} atau {"content_base64", "file_name", "mime_type"}
+    POST /validate  {"metadata", "schema_type"}
+    POST /search    {"query": teks atau {"dublin_core": {...}}, "k"}
+    GET  /health    status worker pool dan antrian
+    GET  /metrics   metrik per tahap dalam format teks Prometheus
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+import asyncio
+import base64
+import hashlib
+import json
+
+from curator_agent import EnhancedMetadataCuratorAgent
+from instrumentation import export_prometheus
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# Jumlah worker dan maksimal pekerjaan yang menunggu worker
+SERVICE_WORKERS = 4
+SERVICE_QUEUE_SIZE = 64
+
+# Batas ukuran header dan body request
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 20 * 1024 * 1024
+
+# Saran jeda (detik) untuk klien saat layanan penuh
+RETRY_AFTER_SECONDS = 1
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class ServiceOverloaded(Exception):
+    """Antrian worker penuh; request harus dicoba lagi nanti"""
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def request_key(operation: str, payload: Any) -> str:
+    """Kunci coalescing: hash operasi dan payload kanonik"""
+    canonical = json.dumps([operation, payload], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ExtractionService:
+    """Worker pool bersama dengan coalescing request dan backpressure"""
+
+    def __init__(self, agent: EnhancedMetadataCuratorAgent, workers: int = SERVICE_WORKERS,
+                 queue_size: int = SERVICE_QUEUE_SIZE):
+        self.agent = agent
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="service")
+        self.pending = 0
+        self.stats = {"requests": 0, "executed": 0, "coalesced": 0, "rejected": 0, "errors": 0}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.routes: Dict[Tuple[str, str], Callable[[Dict[str, Any]], Awaitable[Union[Dict[str, Any], str]]]] = {
+            ("POST", "/extract"): self.extract,
+            ("POST", "/validate"): self.validate,
+            ("POST", "/search"): self.search,
+            ("GET", "/health"): self.health,
+            ("GET", "/metrics"): self.metrics
+        }
+
+    async def submit(self, operation: str, payload: Any, function: Callable[..., Any], *args: Any) -> Any:
+        """Jalankan function di worker pool; request identik yang sedang berjalan berbagi hasil"""
+        key = request_key(operation, payload)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        if self.pending >= self.workers + self.queue_size:
+            self.stats["rejected"] += 1
+            raise ServiceOverloaded(f"{self.pending} jobs pending")
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, function, *args)
+        self._inflight[key] = future
+        self.pending += 1
+        self.stats["executed"] += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            # Future dilepas saat selesai, bukan saat klien pertama terputus
+            if future.done():
+                self._release(key, future)
+            else:
+                future.add_done_callback(lambda done: self._release(key, done))
+
+    def _release(self, key: str, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+            self.pending -= 1
+
+    async def extract(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        file_name = str(body.get("file_name", ""))
+        if "content_base64" in body:
+            try:
+                content = base64.b64decode(body["content_base64"], validate=True)
+            except (ValueError, TypeError):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "'content_base64' is not valid base64")
+            mime_type = str(body.get("mime_type", ""))
+            payload = {"sha256": hashlib.sha256(content).hexdigest(), "file_name": file_name, "mime_type": mime_type}
+            return await self.submit("extract_file", payload, self._extract_file, content, file_name, mime_type)
+        if "text" not in body:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body requires 'text' or 'content_base64'")
+        text = str(body["text"])
+        return await self.submit("extract", {"text": text, "file_name": file_name},
+                                 self.agent.extract_metadata_from_text, text, file_name, True)
+
+    def _extract_file(self, content: bytes, file_name: str, mime_type: str) -> Dict[str, Any]:
+        text = self.agent.doc_processor.process_file(content, file_name, mime_type)
+        return self.agent.extract_metadata_from_text(text, file_name, raise_errors=True)
+
+    async def validate(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        metadata = body.get("metadata")
+        if not isinstance(metadata, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body requires 'metadata' object")
+        schema_type = str(body.get("schema_type", "dublin_core"))
+        return await self.submit("validate", {"metadata": metadata, "schema_type": schema_type},
+                                 self.agent.advanced_validation, metadata, schema_type)
+
+    async def search(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        query = body.get("query")
+        if not isinstance(query, (str, dict)) or not query:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body requires 'query' text or metadata object")
+        try:
+            k = int(body.get("k", 5))
+        except (ValueError, TypeError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'k' must be an integer")
+        records = await self.submit("search", {"query": query, "k": k}, self.agent.find_similar_records, query, k)
+        return {"results": records}
+
+    async def health(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "pending": self.pending,
+            "inflight": len(self._inflight),
+            **self.stats
+        }
+
+    async def metrics(self, body: Dict[str, Any]) -> str:
+        gauges = {"pending": self.pending, "inflight": len(self._inflight)}
+        lines = []
+        for name, value in gauges.items():
+            lines.append(f"# TYPE metadata_curator_service_{name} gauge")
+            lines.append(f"metadata_curator_service_{name} {value}")
+        for name, value in self.stats.items():
+            lines.append(f"# TYPE metadata_curator_service_{name}_total counter")
+            lines.append(f"metadata_curator_service_{name}_total {value}")
+        return export_prometheus() + "\n".join(lines) + "\n"
+
+    async def dispatch(self, method: str, path: str,
+                       body: bytes) -> Tuple[HTTPStatus, Union[Dict[str, Any], str], Dict[str, str]]:
+        """Proses satu request; kembalikan (status, body JSON atau teks, header tambahan)"""
+        self.stats["requests"] += 1
+        handler = self.routes.get((method, path.split("?", 1)[0]))
+        try:
+            if handler is None:
+                known_path = any(route_path == path.split("?", 1)[0] for _, route_path in self.routes)
+                status = HTTPStatus.METHOD_NOT_ALLOWED if known_path else HTTPStatus.NOT_FOUND
+                raise HTTPError(status, status.phrase)
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON")
+            if not isinstance(payload, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+            return HTTPStatus.OK, await handler(payload), {}
+        except HTTPError as e:
+            return e.status, {"error": str(e)}, {}
+        except ServiceOverloaded as e:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": f"Service overloaded: {e}"}, {
+                "Retry-After": str(RETRY_AFTER_SECONDS)
+            }
+        except Exception as e:
+            # Error di worker (model, parsing jawaban, SQLite) adalah kesalahan server, bukan request
+            self.stats["errors"] += 1
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}, {}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Layani request HTTP/1.1 (keep-alive) pada satu koneksi"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._write_response(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                               {"error": "Header too large"}, {}, keep_alive=False)
+                    break
+
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                parts = request_line.split(" ")
+                if len(parts) != 3:
+                    await self._write_response(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"},
+                                               {}, keep_alive=False)
+                    break
+                method, path, version = parts
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # Batas body tidak diketahui: koneksi tidak bisa dipakai ulang
+                    await self._write_response(writer, HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"},
+                                               {}, keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._write_response(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                               {"error": "Body too large"}, {}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                status, response, extra_headers = await self.dispatch(method, path, body)
+                await self._write_response(writer, status, response, extra_headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write_response(writer: asyncio.StreamWriter, status: HTTPStatus, body: Union[Dict[str, Any], str],
+                              extra_headers: Dict[str, str], keep_alive: bool):
+        if isinstance(body, str):
+            data, content_type = body.encode("utf-8"), PROMETHEUS_CONTENT_TYPE
+        else:
+            data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        headers = {
+            "Content-Type": content_type,
+            "Content-Length": str(len(data)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **extra_headers
+        }
+        head = f"HTTP/1.1 {status.value} {status.phrase}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        writer.write(head.encode("latin-1") + b"\r\n" + data)
+        await writer.drain()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        """Mulai server; port 0 memilih port bebas (lihat server.sockets)"""
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+
+    async def serve_forever(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                            ready: Optional[Callable[[asyncio.AbstractServer], Any]] = None):
+        server = await self.start(host, port)
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=False)
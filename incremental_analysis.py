@@ -0,0 +1,252 @@
+"""
+Analisis inkonsistensi inkremental
+
+Analyzer hanya membaca record dengan id di atas watermark run sebelumnya.
+Statistik per field (ConsistencyAccumulator) dan cluster entitas creator
+dipulihkan dari database, diperbarui dengan record baru, lalu disimpan
+kembali bersama temuan baru di inconsistency_reports dalam satu transaksi.
+Nama creator baru dicocokkan lewat posting n-gram tersimpan (creator_grams),
+sehingga hanya kunci kandidat dan anggota entity-nya yang dibaca.
+Biaya satu run sebanding dengan jumlah record baru, bukan ukuran arsip.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set
+import threading
+
+from database import MetadataDatabase
+from entity_resolution import CREATOR_MAX_POSTINGS, CreatorResolver, normalize_creator
+from streaming_metrics import ConsistencyAccumulator
+
+ANALYZER_NAME = "consistency"
+ANALYSIS_BATCH_SIZE = 10000
+
+# Field yang format barunya dilaporkan (creator ditangani lewat cluster entitas)
+FORMAT_REPORT_FIELDS = ("date", "language")
+
+# Maksimal id record contoh yang disimpan per temuan
+REPORT_SAMPLE_SIZE = 50
+
+
+class StoredCreators:
+    """Kunci creator tersimpan yang dibaca sesuai kebutuhan dari database
+
+    Antarmuka sama dengan entity_resolution.KnownCreators, tetapi kandidat
+    diambil dari posting n-gram tersimpan dan entity/anggota di-cache per run.
+    """
+
+    def __init__(self, db: MetadataDatabase, keys: List[str], max_postings: int = CREATOR_MAX_POSTINGS):
+        self.db = db
+        self.max_postings = max_postings
+        self.entities: Dict[str, Optional[int]] = dict.fromkeys(keys)
+        self.entities.update(db.get_creator_key_entities(keys))
+
+    def entity_of(self, key: str) -> Optional[int]:
+        if key not in self.entities:
+            self.entities[key] = self.db.get_creator_key_entities([key]).get(key)
+        return self.entities[key]
+
+    def members(self, entity_id: int) -> Dict[str, int]:
+        members: Dict[str, int] = defaultdict(int)
+        for row in self.db.get_creator_entities(entity_ids=[entity_id]).values():
+            members[row["normalized"]] += row["occurrences"]
+        return dict(members)
+
+    def max_entity_id(self) -> int:
+        return self.db.get_max_creator_entity_id()
+
+    def candidates(self, grams: frozenset, threshold: float) -> Set[str]:
+        keys = self.db.find_creator_candidates(sorted(grams), threshold, self.max_postings)
+        unknown = [key for key in keys if key not in self.entities]
+        if unknown:
+            self.entities.update(self.db.get_creator_key_entities(unknown))
+        return set(keys)
+
+
+class IncrementalAnalyzer:
+    """Analyzer inkonsistensi yang hanya memproses record baru sejak watermark"""
+
+    def __init__(self, db: MetadataDatabase, batch_size: int = ANALYSIS_BATCH_SIZE, name: str = ANALYZER_NAME):
+        self.db = db
+        self.batch_size = batch_size
+        self.name = name
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        """True jika run background masih berjalan"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Jalankan run() di thread background; False jika masih ada run berjalan"""
+        if self.is_running:
+            return False
+        self._thread = threading.Thread(target=self._run_background, name=f"analyzer-{self.name}", daemon=True)
+        self._thread.start()
+        return True
+
+    def _run_background(self):
+        try:
+            self.run()
+        except Exception as e:
+            self.last_error = str(e)
+
+    def run(self) -> Dict[str, Any]:
+        """Proses record baru, perbarui statistik/cluster dan simpan temuan baru"""
+        with self._lock:
+            state = self.db.get_analysis_state(self.name)
+            accumulator = ConsistencyAccumulator().load_state(state["records"], state["field_statistics"])
+            known_formats = {field: set(accumulator.fields[field].formats) for field in FORMAT_REPORT_FIELDS}
+            format_samples: Dict[str, Dict[str, List[int]]] = {field: defaultdict(list) for field in FORMAT_REPORT_FIELDS}
+            resolver = CreatorResolver()
+            first_ids: Dict[str, int] = {}
+            watermark = state["watermark"]
+            processed = 0
+
+            for batch in self.db.iter_metadata_sections("dublin_core", self.batch_size, after_id=watermark):
+                formats_before = {field: set(accumulator.fields[field].formats) for field in FORMAT_REPORT_FIELDS}
+                accumulator.update_many(batch)
+                for field in FORMAT_REPORT_FIELDS:
+                    added = set(accumulator.fields[field].formats) - formats_before[field]
+                    if added:
+                        self._collect_samples(accumulator, field, batch, added, format_samples[field])
+
+                for record in batch:
+                    creator = record.get("creator")
+                    creator = str(creator).strip() if creator else ""
+                    if creator:
+                        resolver.add(creator)
+                        first_ids.setdefault(creator, record["id"])
+
+                processed += len(batch)
+                watermark = batch[-1]["id"]
+
+            reports: List[Dict[str, Any]] = []
+            if processed:
+                reports.extend(self._format_reports(accumulator, known_formats, format_samples))
+                entities, creator_reports, creator_grams = self._resolve_creators(resolver, first_ids)
+                reports.extend(creator_reports)
+                self.db.save_analysis_run(
+                    self.name, watermark, accumulator.records, accumulator.to_state(), entities, reports, creator_grams
+                )
+
+            result = {
+                "processed": processed,
+                "watermark": watermark,
+                "records": accumulator.records,
+                "reports": reports,
+                "consistency": accumulator.consistency_scores()
+            }
+            self.last_result = result
+            self.last_error = None
+            return result
+
+    @staticmethod
+    def _collect_samples(accumulator: ConsistencyAccumulator, field: str, batch: List[Dict[str, Any]],
+                         formats: Set[str], samples: Dict[str, List[int]]):
+        """Catat contoh id record untuk format yang baru muncul di batch ini"""
+        rows = [(record["id"], str(record[field])) for record in batch if record.get(field)]
+        values = [value for _, value in rows]
+        for (record_id, _), value_format in zip(rows, accumulator.value_formats(field, values)):
+            if value_format in formats and len(samples[value_format]) < REPORT_SAMPLE_SIZE:
+                samples[value_format].append(record_id)
+
+    @staticmethod
+    def _format_reports(accumulator: ConsistencyAccumulator, known_formats: Dict[str, Set[str]],
+                        format_samples: Dict[str, Dict[str, List[int]]]) -> List[Dict[str, Any]]:
+        """Laporan untuk format baru pada field yang kini memiliki lebih dari satu format"""
+        reports = []
+        for field in FORMAT_REPORT_FIELDS:
+            formats = accumulator.fields[field].formats
+            new_formats = sorted(set(formats) - known_formats[field])
+            if not new_formats or len(formats) < 2:
+                continue
+            reports.append({
+                "report_type": f"{field}_format",
+                "issues": {
+                    "field": field,
+                    "new_formats": new_formats,
+                    "formats": dict(formats),
+                    "message": f"Format {field} baru: {', '.join(new_formats)} (total {len(formats)} format berbeda)"
+                },
+                "metadata_ids": [
+                    record_id for value_format in new_formats for record_id in format_samples[field][value_format]
+                ]
+            })
+        return reports
+
+    def _resolve_creators(self, resolver: CreatorResolver, first_ids: Dict[str, int]):
+        """Gabungkan nama creator baru ke cluster tersimpan
+
+        Mengembalikan baris creator_entities yang berubah, laporan, dan
+        n-gram kunci yang perlu didaftarkan ke posting tersimpan.
+        """
+        if not resolver.counts:
+            return [], [], {}
+
+        if self.db.needs_creator_gram_backfill():
+            # Database dari versi sebelum posting n-gram: bangun sekali
+            self.db.backfill_creator_grams(resolver.grams)
+        counts = resolver.normalized_counts()
+        entity_ids = resolver.assign_entities(StoredCreators(self.db, list(counts)))
+        variants = self.db.get_creator_entities(variants=list(resolver.counts))
+
+        changed: Dict[str, Dict[str, Any]] = {}
+        touched = set()
+        for name, count in resolver.counts.items():
+            row = variants.get(name)
+            if row is None:
+                normalized = normalize_creator(name, resolver.abbreviations)
+                row = {
+                    "variant": name,
+                    "normalized": normalized,
+                    "entity_id": entity_ids[normalized],
+                    "occurrences": 0,
+                    "first_metadata_id": first_ids[name]
+                }
+                touched.add(row["entity_id"])
+            variants[name] = changed[name] = {**row, "occurrences": row["occurrences"] + count}
+
+        # Laporan hanya untuk entity yang mendapat varian baru; anggota lainnya dibaca per entity
+        stored = self.db.get_creator_entities(entity_ids=sorted(touched))
+        stored.update(variants)
+        members: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for row in stored.values():
+            if row["entity_id"] in touched:
+                members[row["entity_id"]].append(row)
+
+        reports = []
+        for entity_id, rows in members.items():
+            if len(rows) < 2:
+                continue
+            rows.sort(key=lambda row: (-row["occurrences"], row["variant"]))
+            names = [row["variant"] for row in rows]
+            reports.append({
+                "report_type": "creator_variants",
+                "issues": {
+                    "entity_id": entity_id,
+                    "canonical": names[0],
+                    "variants": names,
+                    "occurrences": sum(row["occurrences"] for row in rows),
+                    "message": f"Variasi nama creator untuk entitas yang sama: {', '.join(names)} (disarankan: {names[0]})"
+                },
+                "metadata_ids": [row["first_metadata_id"] for row in rows][:REPORT_SAMPLE_SIZE]
+            })
+        grams = {row["normalized"]: resolver.grams(row["normalized"]) for row in changed.values()}
+        return list(changed.values()), reports, grams
+
+
+_ANALYZERS: Dict[str, IncrementalAnalyzer] = {}
+_ANALYZERS_LOCK = threading.Lock()
+
+
+def get_analyzer(db: MetadataDatabase) -> IncrementalAnalyzer:
+    """Analyzer bersama per file database sehingga run background bertahan antar rerun Streamlit"""
+    with _ANALYZERS_LOCK:
+        analyzer = _ANALYZERS.get(db.db_path)
+        if analyzer is None:
+            analyzer = _ANALYZERS[db.db_path] = IncrementalAnalyzer(db)
+        return analyzer
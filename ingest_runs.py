@@ -0,0 +1,250 @@
+"""
+Manifest run ingest batch yang dapat dilanjutkan
+
+Setiap run menyimpan daftar file beserta state per item
+(pending -> extracted -> validated -> saved, atau failed). Perubahan state
+dikumpulkan di memori dan ditulis ke SQLite secara periodik (checkpoint)
+dalam satu transaksi, sehingga overhead per item kecil. Metadata hasil
+ekstraksi ikut disimpan, jadi resume tidak memanggil model lagi untuk item
+yang sudah diekstraksi. Penulisan akhir idempoten berdasarkan hash file
+(MetadataDatabase.save_file_metadata), sehingga item yang sempat tersimpan
+sebelum checkpoint terakhir tidak tergandakan.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+import json
+import sqlite3
+import threading
+import time
+
+from database import MetadataDatabase
+
+# State item; saved adalah state akhir
+ITEM_STATES = ("pending", "extracted", "validated", "saved", "failed")
+UNFINISHED_STATES = ("pending", "extracted", "validated", "failed")
+
+# Checkpoint ditulis setiap N perubahan item atau setiap N detik
+CHECKPOINT_INTERVAL_ITEMS = 100
+CHECKPOINT_INTERVAL_SECONDS = 10.0
+
+ITEM_PAGE_SIZE = 1000
+
+# Kolom item yang diserialisasi sebagai JSON
+_JSON_COLUMNS = ("metadata", "validation")
+_UPDATE_COLUMNS = ("state", "file_hash", "metadata", "validation", "metadata_id", "attempts", "error")
+
+
+def _now() -> str:
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
+
+
+class RunManifest:
+    """State per item untuk satu run ingest dengan checkpoint periodik"""
+
+    def __init__(self, db: MetadataDatabase, run_id: int, checkpoint_items: int = CHECKPOINT_INTERVAL_ITEMS,
+                 checkpoint_seconds: float = CHECKPOINT_INTERVAL_SECONDS):
+        self.db_path = db.db_path
+        self.run_id = run_id
+        self.checkpoint_items = checkpoint_items
+        self.checkpoint_seconds = checkpoint_seconds
+        self._dirty: Dict[int, Dict[str, Any]] = {}
+        self._last_checkpoint = time.monotonic()
+        self._lock = threading.Lock()
+        self.init_tables(self.db_path)
+
+    @staticmethod
+    def init_tables(db_path: str):
+        """Buat tabel ingest_runs dan ingest_run_items"""
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ingest_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                status TEXT DEFAULT 'running',
+                params TEXT,
+                total_items INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ingest_run_items (
+                run_id INTEGER,
+                seq INTEGER,
+                path TEXT,
+                state TEXT DEFAULT 'pending',
+                file_hash TEXT,
+                metadata TEXT,
+                validation TEXT,
+                metadata_id INTEGER,
+                attempts INTEGER DEFAULT 0,
+                error TEXT,
+                updated_at TIMESTAMP,
+                PRIMARY KEY (run_id, seq),
+                FOREIGN KEY (run_id) REFERENCES ingest_runs (id)
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ingest_items_state ON ingest_run_items (run_id, state, seq)")
+        conn.commit()
+        conn.close()
+
+    @classmethod
+    def create(cls, db: MetadataDatabase, paths: Iterable[str], params: Optional[Dict[str, Any]] = None,
+               **kwargs: Any) -> "RunManifest":
+        """Buat run baru dengan semua path sebagai item pending"""
+        cls.init_tables(db.db_path)
+        conn = sqlite3.connect(db.db_path)
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO ingest_runs (params) VALUES (?)", (json.dumps(params or {}),))
+        run_id = cursor.lastrowid
+        total = 0
+        batch: List[tuple] = []
+        for path in paths:
+            batch.append((run_id, total, str(path)))
+            total += 1
+            if len(batch) >= ITEM_PAGE_SIZE:
+                cursor.executemany("INSERT INTO ingest_run_items (run_id, seq, path) VALUES (?, ?, ?)", batch)
+                batch = []
+        if batch:
+            cursor.executemany("INSERT INTO ingest_run_items (run_id, seq, path) VALUES (?, ?, ?)", batch)
+        cursor.execute("UPDATE ingest_runs SET total_items = ? WHERE id = ?", (total, run_id))
+        conn.commit()
+        conn.close()
+        return cls(db, run_id, **kwargs)
+
+    def get_run(self) -> Dict[str, Any]:
+        """Informasi run beserta jumlah item per state"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM ingest_runs WHERE id = ?", (self.run_id,))
+        row = cursor.fetchone()
+        conn.close()
+        if row is None:
+            raise KeyError(f"Unknown ingest run: {self.run_id}")
+        run = dict(row)
+        run["params"] = json.loads(run["params"] or "{}")
+        run["progress"] = self.progress()
+        return run
+
+    def progress(self) -> Dict[str, int]:
+        """Jumlah item per state (termasuk perubahan yang belum di-checkpoint)"""
+        self.checkpoint()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT state, COUNT(*) FROM ingest_run_items WHERE run_id = ? GROUP BY state", (self.run_id,))
+        progress = {state: 0 for state in ITEM_STATES}
+        progress.update(dict(cursor.fetchall()))
+        conn.close()
+        return progress
+
+    def iter_items(self, states: Sequence[str] = UNFINISHED_STATES) -> Iterator[Dict[str, Any]]:
+        """Item dengan state tertentu, dibaca per halaman (keyset pada seq)"""
+        placeholders = ", ".join("?" for _ in states)
+        last_seq = -1
+        while True:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT seq, path, state, file_hash, metadata, validation, metadata_id, attempts, error
+                FROM ingest_run_items
+                WHERE run_id = ? AND state IN ({placeholders}) AND seq > ?
+                ORDER BY seq LIMIT ?
+            ''', [self.run_id, *states, last_seq, ITEM_PAGE_SIZE])
+            rows = cursor.fetchall()
+            conn.close()
+            if not rows:
+                return
+            for row in rows:
+                item = dict(row)
+                for column in _JSON_COLUMNS:
+                    item[column] = json.loads(item[column]) if item[column] else None
+                yield item
+            last_seq = rows[-1]["seq"]
+
+    def update(self, item: Dict[str, Any], **changes: Any):
+        """Catat perubahan state item; ditulis ke database saat checkpoint"""
+        item.update(changes)
+        with self._lock:
+            self._dirty[item["seq"]] = {column: item.get(column) for column in _UPDATE_COLUMNS}
+
+    def maybe_checkpoint(self) -> bool:
+        """Checkpoint jika batas jumlah perubahan atau waktu terlampaui"""
+        with self._lock:
+            due = len(self._dirty) >= self.checkpoint_items or (
+                self._dirty and time.monotonic() - self._last_checkpoint >= self.checkpoint_seconds
+            )
+        if due:
+            self.checkpoint()
+        return bool(due)
+
+    def checkpoint(self):
+        """Tulis semua perubahan item yang tertunda dalam satu transaksi"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            self._last_checkpoint = time.monotonic()
+            if not dirty:
+                return
+            now = _now()
+            rows = [
+                (
+                    changes["state"], changes["file_hash"],
+                    json.dumps(changes["metadata"]) if changes["metadata"] is not None else None,
+                    json.dumps(changes["validation"]) if changes["validation"] is not None else None,
+                    changes["metadata_id"], changes["attempts"], changes["error"], now, self.run_id, seq
+                )
+                for seq, changes in dirty.items()
+            ]
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                conn.executemany('''
+                    UPDATE ingest_run_items
+                    SET state = ?, file_hash = ?, metadata = ?, validation = ?, metadata_id = ?, attempts = ?,
+                        error = ?, updated_at = ?
+                    WHERE run_id = ? AND seq = ?
+                ''', rows)
+                conn.execute("UPDATE ingest_runs SET updated_at = ? WHERE id = ?", (now, self.run_id))
+                conn.commit()
+            except Exception:
+                # Perubahan dikembalikan agar tidak hilang pada checkpoint berikutnya
+                dirty.update(self._dirty)
+                self._dirty = dirty
+                raise
+            finally:
+                conn.close()
+
+    def finish(self) -> Dict[str, int]:
+        """Checkpoint terakhir; status run menjadi completed bila semua item saved"""
+        progress = self.progress()
+        status = "completed" if progress["saved"] == sum(progress.values()) else "incomplete"
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE ingest_runs SET status = ?, updated_at = ? WHERE id = ?", (status, _now(), self.run_id))
+        conn.commit()
+        conn.close()
+        return progress
+
+
+def list_runs(db: MetadataDatabase, limit: int = 20) -> List[Dict[str, Any]]:
+    """Run ingest terbaru beserta jumlah item per state"""
+    RunManifest.init_tables(db.db_path)
+    conn = sqlite3.connect(db.db_path)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM ingest_runs ORDER BY id DESC LIMIT ?", (limit,))
+    runs = [dict(row) for row in cursor.fetchall()]
+    if runs:
+        placeholders = ", ".join("?" for _ in runs)
+        cursor.execute(f'''
+            SELECT run_id, state, COUNT(*) FROM ingest_run_items
+            WHERE run_id IN ({placeholders}) GROUP BY run_id, state
+        ''', [run["id"] for run in runs])
+        counts: Dict[int, Dict[str, int]] = {}
+        for run_id, state, count in cursor.fetchall():
+            counts.setdefault(run_id, {})[state] = count
+        for run in runs:
+            run["params"] = json.loads(run["params"] or "{}")
+            run["progress"] = {state: counts.get(run["id"], {}).get(state, 0) for state in ITEM_STATES}
+    conn.close()
+    return runs
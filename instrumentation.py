@@ -0,0 +1,236 @@
+"""
+Instrumentasi ringan per tahap pipeline
+
+Span (context manager) mengukur latensi tahap seperti ekstraksi teks,
+pembuatan prompt, panggilan model, parse JSON, validasi dan penulisan
+SQLite ke dalam histogram; counter mencatat cache hit/miss, retry dan hasil
+panggilan model. Metrik dapat diekspor dalam format teks Prometheus atau
+sebagai snapshot untuk panel dashboard.
+
+Instrumentasi nonaktif secara default (aktifkan dengan enable() atau
+METADATA_CURATOR_METRICS=1). Saat nonaktif, span() mengembalikan context
+manager no-op bersama dan counter langsung kembali, sehingga biaya per
+panggilan hanya satu pengecekan flag.
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+import functools
+import os
+import threading
+import time
+
+METRIC_PREFIX = "metadata_curator"
+
+# Batas bucket histogram latensi (detik)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Deskripsi metrik untuk baris # HELP
+METRIC_HELP = {
+    "stage_seconds": "Latency of pipeline stages in seconds",
+    "model_calls_total": "Model generate_content calls by outcome",
+    "cache_requests_total": "Query cache lookups by result",
+    "retries_total": "Retried work items by component",
+    "stale_claims_total": "Work item results dropped because the claim was taken over",
+    "stage_errors_total": "Pipeline stages that raised an exception"
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.buckets[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, fraction: float) -> float:
+        """Perkiraan kuantil dari bucket (batas atas bucket)"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        cumulative = 0
+        for index, count in enumerate(self.buckets):
+            cumulative += count
+            if cumulative >= rank:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else float("inf")
+        return float("inf")
+
+
+class MetricsRegistry:
+    """Counter dan histogram berlabel yang aman antar thread"""
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, labels: Labels = (), value: float = 1):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, labels: Labels, value: float):
+        key = (name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = _Histogram()
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+_state = {"enabled": os.environ.get("METADATA_CURATOR_METRICS", "").lower() in ("1", "true", "yes")}
+
+
+def enable():
+    _state["enabled"] = True
+
+
+def disable():
+    _state["enabled"] = False
+
+
+def is_enabled() -> bool:
+    return _state["enabled"]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("labels", "started")
+
+    def __init__(self, labels: Labels):
+        self.labels = labels
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        REGISTRY.observe("stage_seconds", self.labels, time.perf_counter() - self.started)
+        if exc_type is not None:
+            REGISTRY.increment("stage_errors_total", self.labels)
+        return False
+
+
+def span(stage: str):
+    """Ukur latensi satu tahap: with span("model_call"): ..."""
+    if not _state["enabled"]:
+        return _NOOP_SPAN
+    return _Span((("stage", stage),))
+
+
+def timed(stage: str):
+    """Dekorator: ukur setiap panggilan fungsi sebagai satu span"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def increment(name: str, value: float = 1, **labels: Any):
+    """Tambah counter berlabel (no-op bila instrumentasi nonaktif)"""
+    if _state["enabled"]:
+        REGISTRY.increment(name, _labels(labels), value)
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def export_prometheus(registry: MetricsRegistry = REGISTRY) -> str:
+    """Semua metrik dalam format teks Prometheus (version 0.0.4)"""
+    with registry._lock:
+        counters = dict(registry.counters)
+        histograms = {key: (list(h.buckets), h.count, h.total) for key, h in registry.histograms.items()}
+
+    lines: List[str] = []
+    for name in sorted({name for name, _ in histograms}):
+        metric = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {metric} {METRIC_HELP.get(name, name)}")
+        lines.append(f"# TYPE {metric} histogram")
+        for (key_name, labels), (buckets, count, total) in sorted(histograms.items()):
+            if key_name != name:
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(list(LATENCY_BUCKETS) + ["+Inf"], buckets):
+                cumulative += bucket_count
+                lines.append(f"{metric}_bucket{_format_labels(labels, ('le', str(bound)))} {cumulative}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {total!r}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+
+    for name in sorted({name for name, _ in counters}):
+        metric = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {metric} {METRIC_HELP.get(name, name)}")
+        lines.append(f"# TYPE {metric} counter")
+        for (key_name, labels), value in sorted(counters.items()):
+            if key_name == name:
+                lines.append(f"{metric}{_format_labels(labels)} {_format_number(value)}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def snapshot(registry: MetricsRegistry = REGISTRY) -> Dict[str, Any]:
+    """Ringkasan untuk dashboard: latensi per tahap, cache hit rate, retry dan panggilan model"""
+    with registry._lock:
+        stages = {
+            dict(labels).get("stage", ""): {
+                "count": histogram.count,
+                "mean_ms": round(histogram.total / histogram.count * 1000, 3) if histogram.count else 0.0,
+                "p50_ms": round(histogram.quantile(0.50) * 1000, 3),
+                "p95_ms": round(histogram.quantile(0.95) * 1000, 3),
+                "total_seconds": round(histogram.total, 3)
+            }
+            for (name, labels), histogram in registry.histograms.items() if name == "stage_seconds"
+        }
+        counters: Dict[str, Dict[str, float]] = {}
+        for (name, labels), value in registry.counters.items():
+            counters.setdefault(name, {})[",".join(f"{k}={v}" for k, v in labels) or "total"] = value
+
+    cache = counters.get("cache_requests_total", {})
+    hits, misses = cache.get("result=hit", 0), cache.get("result=miss", 0)
+    return {
+        "enabled": is_enabled(),
+        "stages": stages,
+        "cache_hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        "counters": counters
+    }
@@ -0,0 +1,385 @@
+"""
+Antrian job persisten berbasis SQLite
+
+Job (mis. ekstraksi + validasi banyak file) dipecah menjadi item yang
+disimpan di tabel job_items beserta status dan hasilnya. Worker thread
+mengklaim item satu per satu secara atomik (BEGIN IMMEDIATE + lease),
+sehingga pekerjaan berjalan di luar siklus rerun Streamlit dan tidak hilang
+saat halaman dimuat ulang. Item yang lease-nya habis (worker mati) diklaim
+ulang selama percobaannya belum habis, dan setiap klaim membawa token baru
+sehingga worker lama yang lease-nya sudah diambil alih tidak dapat lagi
+menyimpan hasil. UI cukup membaca ringkasan progres per status. Dengan token budget,
+worker berhenti mengklaim item baru setelah batas token tercapai.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import json
+import sqlite3
+import threading
+import traceback
+import uuid
+
+from database import MetadataDatabase
+from instrumentation import increment
+from usage_ledger import TokenBudget, TokenBudgetExceeded
+
+# Status job dan item
+JOB_STATUSES = ("queued", "running", "completed", "cancelled")
+ITEM_STATUSES = ("pending", "running", "done", "failed")
+
+# Lama lease item sebelum dianggap ditinggalkan worker
+ITEM_LEASE_SECONDS = 600
+MAX_ITEM_ATTEMPTS = 2
+POLL_INTERVAL_SECONDS = 2.0
+
+JobHandler = Callable[[Dict[str, Any], Optional[bytes]], Dict[str, Any]]
+
+
+def _now() -> str:
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
+
+
+class JobQueue:
+    """Antrian job dengan tabel jobs/job_items dan worker thread"""
+
+    def __init__(self, db: MetadataDatabase, lease_seconds: int = ITEM_LEASE_SECONDS,
+                 max_attempts: int = MAX_ITEM_ATTEMPTS):
+        self.db_path = db.db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.handlers: Dict[str, JobHandler] = {}
+        self.token_budget: Optional[TokenBudget] = None
+        self._workers: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.init_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_tables(self):
+        """Buat tabel jobs dan job_items"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        # WAL agar UI tetap bisa membaca progres saat worker menulis
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_type TEXT,
+                status TEXT DEFAULT 'queued',
+                params TEXT,
+                total_items INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS job_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id INTEGER,
+                item_key TEXT,
+                payload TEXT,
+                content BLOB,
+                status TEXT DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0,
+                lease_expires TIMESTAMP,
+                claim_token TEXT,
+                result TEXT,
+                error TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (job_id) REFERENCES jobs (id)
+            )
+        ''')
+        # Tabel dari versi sebelum fencing token
+        cursor.execute("PRAGMA table_info(job_items)")
+        if "claim_token" not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE job_items ADD COLUMN claim_token TEXT")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_items_status ON job_items (status, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_items_job ON job_items (job_id, status)")
+
+        conn.commit()
+        conn.close()
+
+    def register(self, job_type: str, handler: JobHandler):
+        """Daftarkan handler untuk satu jenis job: handler(payload, content) -> result"""
+        self.handlers[job_type] = handler
+
+    def set_token_budget(self, ceiling: Optional[int]):
+        """Batas token untuk semua job di antrian (None/0 = tanpa batas); pemakaian tetap dihitung"""
+        if not ceiling:
+            self.token_budget = None
+        elif self.token_budget is None:
+            self.token_budget = TokenBudget(ceiling)
+        else:
+            self.token_budget.ceiling = ceiling
+        self._wake.set()
+
+    def enqueue(self, job_type: str, items: List[Dict[str, Any]], params: Optional[Dict[str, Any]] = None) -> int:
+        """Buat job baru; setiap item berisi key, payload (dict) dan content (bytes, opsional)"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            INSERT INTO jobs (job_type, params, total_items) VALUES (?, ?, ?)
+        ''', (job_type, json.dumps(params or {}), len(items)))
+        job_id = cursor.lastrowid
+        cursor.executemany('''
+            INSERT INTO job_items (job_id, item_key, payload, content) VALUES (?, ?, ?, ?)
+        ''', [
+            (job_id, item.get("key", ""), json.dumps(item.get("payload", {})), item.get("content"))
+            for item in items
+        ])
+
+        conn.commit()
+        conn.close()
+        self._wake.set()
+        return job_id
+
+    def cancel(self, job_id: int):
+        """Batalkan job: item pending tidak akan diproses"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status IN ('queued', 'running')
+        ''', (_now(), job_id))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _finish_jobs(cursor: sqlite3.Cursor, job_ids: List[int], now: str):
+        """Tandai job selesai bila tidak ada lagi item pending/running"""
+        cursor.executemany('''
+            UPDATE jobs SET status = 'completed', finished_at = ?
+            WHERE id = ? AND status = 'running' AND NOT EXISTS (
+                SELECT 1 FROM job_items WHERE job_id = ? AND status IN ('pending', 'running')
+            )
+        ''', [(now, job_id, job_id) for job_id in job_ids])
+
+    def claim(self, job_types: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Klaim satu item pending (atau lease kedaluwarsa) secara atomik"""
+        job_types = list(job_types if job_types is not None else self.handlers)
+        if not job_types:
+            return None
+        placeholders = ", ".join("?" for _ in job_types)
+        now = _now()
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+
+            # Lease kedaluwarsa tanpa sisa percobaan: item gagal, bukan diklaim ulang
+            cursor.execute('''
+                SELECT DISTINCT job_id FROM job_items WHERE status = 'running' AND lease_expires < ? AND attempts >= ?
+            ''', (now, self.max_attempts))
+            exhausted_jobs = [row[0] for row in cursor.fetchall()]
+            if exhausted_jobs:
+                cursor.execute('''
+                    UPDATE job_items SET status = 'failed', error = COALESCE(error, ?), lease_expires = NULL,
+                        claim_token = NULL, updated_at = ?
+                    WHERE status = 'running' AND lease_expires < ? AND attempts >= ?
+                ''', (f"Lease expired after {self.max_attempts} attempts", now, now, self.max_attempts))
+                self._finish_jobs(cursor, exhausted_jobs, now)
+
+            cursor.execute(f'''
+                SELECT ji.id, ji.job_id, ji.item_key, ji.payload, ji.content, ji.attempts, j.job_type
+                FROM job_items ji JOIN jobs j ON j.id = ji.job_id
+                WHERE (ji.status = 'pending' OR (ji.status = 'running' AND ji.lease_expires < ? AND ji.attempts < ?))
+                  AND j.status IN ('queued', 'running') AND j.job_type IN ({placeholders})
+                ORDER BY ji.id
+                LIMIT 1
+            ''', [now, self.max_attempts] + job_types)
+            row = cursor.fetchone()
+            if row is None:
+                conn.commit()
+                return None
+
+            lease = (datetime.now() + timedelta(seconds=self.lease_seconds)).isoformat(sep=" ", timespec="seconds")
+            token = uuid.uuid4().hex
+            cursor.execute('''
+                UPDATE job_items SET status = 'running', attempts = attempts + 1, lease_expires = ?, claim_token = ?,
+                    updated_at = ?
+                WHERE id = ?
+            ''', (lease, token, now, row["id"]))
+            cursor.execute('''
+                UPDATE jobs SET status = 'running', started_at = COALESCE(started_at, ?) WHERE id = ? AND status = 'queued'
+            ''', (now, row["job_id"]))
+            conn.commit()
+        finally:
+            conn.close()
+
+        item = dict(row)
+        item["payload"] = json.loads(item["payload"] or "{}")
+        item["attempts"] += 1
+        item["claim_token"] = token
+        return item
+
+    def complete(self, item: Dict[str, Any], result: Optional[Dict[str, Any]] = None,
+                 error: Optional[str] = None) -> bool:
+        """Simpan hasil item; item gagal dikembalikan ke pending selama attempts < max_attempts
+
+        False jika klaim sudah tidak berlaku (lease diambil alih worker lain);
+        hasil dari klaim lama dibuang.
+        """
+        if error is None:
+            status = "done"
+        else:
+            status = "pending" if item["attempts"] < self.max_attempts else "failed"
+        now = _now()
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            UPDATE job_items SET status = ?, result = ?, error = ?, lease_expires = NULL, claim_token = NULL,
+                updated_at = ?
+            WHERE id = ? AND status = 'running' AND claim_token = ?
+        ''', (status, json.dumps(result) if result is not None else None, error, now, item["id"],
+              item["claim_token"]))
+        claimed = cursor.rowcount > 0
+        if claimed:
+            self._finish_jobs(cursor, [item["job_id"]], now)
+
+        conn.commit()
+        conn.close()
+        if not claimed:
+            increment("stale_claims_total", component="job_queue")
+        elif status == "pending":
+            increment("retries_total", component="job_queue")
+        return claimed
+
+    def release(self, item: Dict[str, Any]) -> bool:
+        """Kembalikan item yang diklaim ke pending tanpa menghitung percobaan"""
+        conn = self._connect()
+        cursor = conn.execute('''
+            UPDATE job_items SET status = 'pending', attempts = attempts - 1, lease_expires = NULL, claim_token = NULL,
+                updated_at = ?
+            WHERE id = ? AND status = 'running' AND claim_token = ?
+        ''', (_now(), item["id"], item["claim_token"]))
+        released = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return released
+
+    def process_next(self) -> bool:
+        """Klaim dan proses satu item; False jika tidak ada item yang bisa dikerjakan"""
+        if self.token_budget is not None and self.token_budget.exhausted:
+            return False
+        item = self.claim()
+        if item is None:
+            return False
+        handler = self.handlers[item["job_type"]]
+        try:
+            result = handler(item["payload"], item["content"])
+        except TokenBudgetExceeded:
+            self.release(item)
+            return False
+        except Exception as e:
+            self.complete(item, error=f"{e}\n{traceback.format_exc(limit=3)}")
+        else:
+            # Handler yang memakai budget yang sama (mis. agent.token_budget) sudah membebankan tokennya
+            handler_budget = getattr(getattr(handler, "__self__", None), "token_budget", None)
+            if self.token_budget is not None and handler_budget is not self.token_budget:
+                self.token_budget.charge((result or {}).get("total_tokens", 0))
+            self.complete(item, result=result)
+        return True
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            try:
+                if self.process_next():
+                    continue
+            except sqlite3.OperationalError:
+                # Database terkunci terlalu lama; coba lagi pada putaran berikutnya
+                pass
+            self._wake.wait(POLL_INTERVAL_SECONDS)
+            self._wake.clear()
+
+    def start_workers(self, count: int = 2):
+        """Jalankan worker thread (daemon) hingga jumlahnya mencapai count"""
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        self._stop.clear()
+        while len(self._workers) < count:
+            worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{len(self._workers)}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop_workers(self, timeout: Optional[float] = None):
+        """Hentikan worker setelah item yang sedang diproses selesai"""
+        self._stop.set()
+        self._wake.set()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def get_job_progress(self, job_id: int) -> Dict[str, int]:
+        """Jumlah item per status untuk satu job"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status", (job_id,))
+        progress = {status: 0 for status in ITEM_STATUSES}
+        progress.update(dict(cursor.fetchall()))
+        conn.close()
+        return progress
+
+    def list_jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Job terbaru beserta ringkasan progres per status"""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+        jobs = [dict(row) for row in cursor.fetchall()]
+        if jobs:
+            placeholders = ", ".join("?" for _ in jobs)
+            cursor.execute(f'''
+                SELECT job_id, status, COUNT(*) FROM job_items
+                WHERE job_id IN ({placeholders}) GROUP BY job_id, status
+            ''', [job["id"] for job in jobs])
+            counts: Dict[int, Dict[str, int]] = {}
+            for job_id, status, count in cursor.fetchall():
+                counts.setdefault(job_id, {})[status] = count
+            for job in jobs:
+                job["params"] = json.loads(job["params"] or "{}")
+                job["progress"] = {status: counts.get(job["id"], {}).get(status, 0) for status in ITEM_STATUSES}
+
+        conn.close()
+        return jobs
+
+    def get_job_items(self, job_id: int, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Item suatu job (tanpa content) beserta hasil/errornya"""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+
+        query = "SELECT id, item_key, status, attempts, result, error, updated_at FROM job_items WHERE job_id = ?"
+        params: List[Any] = [job_id]
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        cursor.execute(query + " ORDER BY id LIMIT ?", params + [limit])
+        items = []
+        for row in cursor.fetchall():
+            item = dict(row)
+            item["result"] = json.loads(item["result"]) if item["result"] else None
+            items.append(item)
+
+        conn.close()
+        return items
+
+
+_QUEUES: Dict[str, JobQueue] = {}
+_QUEUES_LOCK = threading.Lock()
+
+
+def get_job_queue(db: MetadataDatabase) -> JobQueue:
+    """Antrian bersama per file database sehingga worker bertahan antar rerun Streamlit"""
+    with _QUEUES_LOCK:
+        queue = _QUEUES.get(db.db_path)
+        if queue is None:
+            queue = _QUEUES[db.db_path] = JobQueue(db)
+        return queue
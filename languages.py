@@ -0,0 +1,106 @@
+"""
+Tabel bahasa ISO 639-1/2/3 dan normalisasi kode/nama bahasa
+
+Data berasal dari tabel kode ISO 639-3 (SIL) beserta kode ISO 639-1 dan
+ISO 639-2/B, ditambah nama bahasa Indonesia. Tabel dimuat sekali saat modul
+diimpor dan disimpan sebagai mapping immutable sehingga setiap pengecekan
+hanya berupa lookup dict tanpa alokasi per panggilan.
+"""
+
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, NamedTuple, Optional
+import re
+
+ISO639_TABLE_PATH = Path(__file__).with_name("iso639.tsv")
+
+
+class LanguageInfo(NamedTuple):
+    """Satu entri bahasa ISO 639"""
+    code: str            # kode kanonik: ISO 639-1 jika ada, selain itu ISO 639-3
+    alpha_3: str         # ISO 639-3 / ISO 639-2/T
+    alpha_2: str         # ISO 639-1 ('' jika tidak ada)
+    bibliographic: str   # ISO 639-2/B ('' jika sama dengan alpha_3)
+    scope: str           # I (individual), M (macrolanguage), S (special)
+    name: str
+    name_id: str         # nama dalam bahasa Indonesia ('' jika tidak ada)
+
+
+# Alias tambahan yang umum muncul di arsip (nama lokal dan kode usang)
+LANGUAGE_ALIASES = MappingProxyType({
+    "indonesia": "ind",
+    "bahasa": "ind",
+    "in": "ind",          # kode ISO 639-1 lama untuk bahasa Indonesia
+    "iw": "heb",
+    "ji": "yid",
+    "jw": "jav",
+    "melayu": "msa",
+    "mandarin": "cmn",
+    "tionghoa": "zho",
+    "china": "zho",
+    "perancis": "fra",
+    "minang": "min",
+})
+
+# Prefiks yang diabaikan saat normalisasi nama ("Bahasa Jawa" -> "jawa")
+_NAME_PREFIX = re.compile(r"^(bahasa|bhs\.?|language:?)\s+")
+# Subtag wilayah/skrip BCP 47 atau locale ("id-ID", "en_US", "zh-Hant")
+_REGION_SUBTAG = re.compile(r"^([a-z]{2,3})[-_][a-z0-9]{2,8}([-_][a-z0-9]{1,8})*$")
+_PARENTHETICAL = re.compile(r"\s*\(.*\)$")
+
+
+def _load_table():
+    """Muat tabel ISO 639 dan bangun indeks lookup"""
+    languages: Dict[str, LanguageInfo] = {}
+    lookup: Dict[str, str] = {}
+    with open(ISO639_TABLE_PATH, encoding="utf-8") as table:
+        next(table)
+        for line in table:
+            alpha_3, alpha_2, bibliographic, scope, name, name_id = line.rstrip("\n").split("\t")
+            info = LanguageInfo(alpha_2 or alpha_3, alpha_3, alpha_2, bibliographic, scope, name, name_id)
+            languages[alpha_3] = info
+            for key in (alpha_3, alpha_2, bibliographic):
+                if key:
+                    lookup[key] = alpha_3
+            # Nama tidak boleh menimpa kode; entri pertama yang menang
+            for label in (name, name_id):
+                if not label:
+                    continue
+                label = label.lower()
+                for key in (label, _PARENTHETICAL.sub("", label), _NAME_PREFIX.sub("", label)):
+                    lookup.setdefault(key, alpha_3)
+    for alias, alpha_3 in LANGUAGE_ALIASES.items():
+        if alpha_3 in languages:
+            lookup.setdefault(alias, alpha_3)
+    return MappingProxyType(languages), MappingProxyType(lookup)
+
+
+# alpha_3 -> LanguageInfo, dan kunci ternormalisasi (kode/nama/alias) -> alpha_3
+LANGUAGES, _LANGUAGE_LOOKUP = _load_table()
+
+
+def _lookup_key(value: str) -> Optional[str]:
+    """Cari alpha_3 untuk satu nilai yang sudah di-lowercase dan di-strip"""
+    alpha_3 = _LANGUAGE_LOOKUP.get(value)
+    if alpha_3 is not None:
+        return alpha_3
+    match = _REGION_SUBTAG.match(value)
+    if match:
+        return _LANGUAGE_LOOKUP.get(match.group(1))
+    stripped = _NAME_PREFIX.sub("", value)
+    if stripped != value:
+        return _LANGUAGE_LOOKUP.get(stripped)
+    return None
+
+
+def normalize_language(value: Any) -> Optional[LanguageInfo]:
+    """Normalisasi kode atau nama bahasa ke entri ISO 639 (None jika tidak dikenal)
+
+    Menerima kode ISO 639-1/2/3, kode locale (id-ID, en_US), nama bahasa
+    Inggris atau Indonesia, dengan/tanpa prefiks "Bahasa".
+    """
+    if value is None:
+        return None
+    alpha_3 = _lookup_key(" ".join(str(value).lower().split()))
+    return LANGUAGES[alpha_3] if alpha_3 is not None else None
+
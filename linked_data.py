@@ -0,0 +1,237 @@
+"""
+Ekspor linked data (JSON-LD, N-Triples, N-Quads) untuk seluruh arsip
+
+Record dibaca per batch dari MetadataDatabase dan ditulis langsung ke file
+sehingga memori tetap konstan berapapun ukuran arsip. JSON-LD memakai satu
+@context bersama dan satu @graph; N-Triples/N-Quads ditulis per baris.
+Ekspor dapat dipecah menjadi beberapa file (chunk) dengan manifest sehingga
+ekspor yang terputus bisa dilanjutkan dari chunk terakhir yang selesai.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import gzip
+import json
+import os
+
+from database import MetadataDatabase
+
+NAMESPACES = {
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "dcterms": "http://purl.org/dc/terms/",
+    "foaf": "http://xmlns.com/foaf/0.1/",
+    "schema": "http://schema.org/"
+}
+
+# @context bersama untuk semua dokumen JSON-LD
+LINKED_DATA_CONTEXT = dict(NAMESPACES)
+
+ARCHIVAL_RESOURCE_TYPE = "schema:ArchivalResource"
+
+# Field Dublin Core -> properti (compact IRI)
+DUBLIN_CORE_PROPERTIES = {
+    "title": "dc:title",
+    "creator": "dc:creator",
+    "subject": "dc:subject",
+    "description": "dc:description",
+    "publisher": "dc:publisher",
+    "contributor": "dc:contributor",
+    "date": "dc:date",
+    "type": "dc:type",
+    "format": "dc:format",
+    "identifier": "dc:identifier",
+    "source": "dc:source",
+    "language": "dc:language",
+    "relation": "dc:relation",
+    "coverage": "dc:coverage",
+    "rights": "dc:rights"
+}
+
+# IRI dasar untuk record arsip; id record ditambahkan di belakang
+DEFAULT_BASE_IRI = "urn:metadata-curator:record:"
+
+# Named graph untuk ekspor N-Quads
+DEFAULT_GRAPH_IRI = "urn:metadata-curator:graph"
+
+EXPORT_BATCH_SIZE = 5000
+
+# Format ekspor -> ekstensi file
+EXPORT_FORMATS = {
+    "jsonld": ".jsonld",
+    "nt": ".nt",
+    "nq": ".nq"
+}
+
+_RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+
+
+def expand_iri(compact: str) -> str:
+    """Ubah compact IRI (dc:title) menjadi IRI penuh"""
+    prefix, _, local = compact.partition(":")
+    return NAMESPACES[prefix] + local if prefix in NAMESPACES else compact
+
+
+_ARCHIVAL_RESOURCE_IRI = expand_iri(ARCHIVAL_RESOURCE_TYPE)
+_PROPERTY_IRIS = {field: expand_iri(prop) for field, prop in DUBLIN_CORE_PROPERTIES.items()}
+
+
+def jsonld_properties(section: Dict[str, Any]) -> Dict[str, Any]:
+    """Properti JSON-LD untuk field Dublin Core yang terisi"""
+    return {prop: section[field] for field, prop in DUBLIN_CORE_PROPERTIES.items() if section.get(field)}
+
+
+def record_to_jsonld(record_id: int, section: Dict[str, Any], base_iri: str = DEFAULT_BASE_IRI) -> Dict[str, Any]:
+    """Node JSON-LD (tanpa @context) untuk satu record"""
+    node = {"@id": f"{base_iri}{record_id}", "@type": ARCHIVAL_RESOURCE_TYPE}
+    node.update(jsonld_properties(section))
+    return node
+
+
+def _escape_literal(value: str) -> str:
+    """Escape literal string sesuai grammar N-Triples"""
+    return (
+        value.replace("\\", "\\\\").replace('"', '\\"')
+        .replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+    )
+
+
+def record_to_triples(record_id: int, section: Dict[str, Any], base_iri: str = DEFAULT_BASE_IRI) -> List[Tuple[str, str, str]]:
+    """Triple (subjek, predikat, objek) dalam sintaks N-Triples untuk satu record"""
+    subject = f"<{base_iri}{record_id}>"
+    triples = [(subject, f"<{_RDF_TYPE}>", f"<{_ARCHIVAL_RESOURCE_IRI}>")]
+    for field, prop in _PROPERTY_IRIS.items():
+        value = section.get(field)
+        if value:
+            triples.append((subject, f"<{prop}>", f'"{_escape_literal(str(value))}"'))
+    return triples
+
+
+class LinkedDataExporter:
+    """Eksportir linked data streaming untuk seluruh record di database"""
+
+    def __init__(self, db: MetadataDatabase, base_iri: str = DEFAULT_BASE_IRI, graph_iri: str = DEFAULT_GRAPH_IRI,
+                 batch_size: int = EXPORT_BATCH_SIZE):
+        self.db = db
+        self.base_iri = base_iri
+        self.graph_iri = graph_iri
+        self.batch_size = batch_size
+        # Posisi serialisasi terakhir: id record terakhir dan jumlah record
+        self.last_id = 0
+        self.last_written = 0
+
+    def iter_batches(self, after_id: int = 0) -> Iterator[List[Dict[str, Any]]]:
+        """Batch section Dublin Core (dengan id) di atas after_id"""
+        return self.db.iter_metadata_sections("dublin_core", self.batch_size, after_id=after_id)
+
+    def _lines(self, batch: List[Dict[str, Any]], export_format: str) -> List[str]:
+        """Baris N-Triples/N-Quads untuk satu batch"""
+        graph = f" <{self.graph_iri}>" if export_format == "nq" else ""
+        return [
+            f"{subject} {predicate} {obj}{graph} .\n"
+            for section in batch
+            for subject, predicate, obj in record_to_triples(section["id"], section, self.base_iri)
+        ]
+
+    def iter_serialized(self, export_format: str = "jsonld", after_id: int = 0,
+                        max_records: Optional[int] = None) -> Iterator[str]:
+        """Potongan teks serialisasi secara streaming
+
+        Untuk JSON-LD dokumen dibuka dengan @context bersama, node ditulis
+        satu per satu ke @graph, lalu ditutup. Iterasi berhenti setelah
+        max_records record (jika diberikan); id record terakhir yang
+        ditulis tersedia di atribut last_id.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format}")
+
+        self.last_id = after_id
+        written = 0
+        if export_format == "jsonld":
+            yield '{"@context": ' + json.dumps(LINKED_DATA_CONTEXT) + ', "@graph": [\n'
+
+        for batch in self.iter_batches(after_id):
+            if max_records is not None:
+                batch = batch[:max_records - written]
+            if export_format == "jsonld":
+                separator = ",\n" if written else ""
+                yield separator + ",\n".join(
+                    json.dumps(record_to_jsonld(section["id"], section, self.base_iri), ensure_ascii=False)
+                    for section in batch
+                )
+            else:
+                yield "".join(self._lines(batch, export_format))
+            written += len(batch)
+            self.last_id = batch[-1]["id"] if batch else self.last_id
+            if max_records is not None and written >= max_records:
+                break
+
+        if export_format == "jsonld":
+            yield "\n]}\n"
+        self.last_written = written
+
+    def export(self, output: Union[str, Path], export_format: str = "jsonld", compress: bool = False,
+               chunk_records: Optional[int] = None) -> Dict[str, Any]:
+        """Ekspor seluruh arsip ke file
+
+        Tanpa chunk_records, output adalah path satu file. Dengan
+        chunk_records, output adalah direktori berisi part-NNNNN.<ext>[.gz]
+        dan manifest.json; setiap part ditulis ke file sementara lalu
+        di-rename, sehingga menjalankan ulang ekspor melanjutkan dari part
+        terakhir yang lengkap.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format}")
+        if not chunk_records:
+            path = Path(output)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            records = self._write_part(path, export_format, compress, after_id=0, max_records=None, keep_empty=True)
+            return {"format": export_format, "records": records, "files": [str(path)]}
+        return self._export_chunked(Path(output), export_format, compress, chunk_records)
+
+    def _write_part(self, path: Path, export_format: str, compress: bool, after_id: int,
+                    max_records: Optional[int], keep_empty: bool = False) -> int:
+        """Tulis satu file secara atomik; kembalikan jumlah record yang ditulis"""
+        temporary = path.with_name(path.name + ".tmp")
+        opener = gzip.open if compress else open
+        with opener(temporary, "wt", encoding="utf-8", newline="\n") as handle:
+            for piece in self.iter_serialized(export_format, after_id, max_records):
+                handle.write(piece)
+        if self.last_written or keep_empty:
+            os.replace(temporary, path)
+        else:
+            temporary.unlink()
+        return self.last_written
+
+    def _export_chunked(self, directory: Path, export_format: str, compress: bool, chunk_records: int) -> Dict[str, Any]:
+        directory.mkdir(parents=True, exist_ok=True)
+        manifest_path = directory / "manifest.json"
+        extension = EXPORT_FORMATS[export_format] + (".gz" if compress else "")
+
+        manifest = {"format": export_format, "compress": compress, "chunk_records": chunk_records, "parts": []}
+        if manifest_path.exists():
+            stored = json.loads(manifest_path.read_text(encoding="utf-8"))
+            if (stored["format"], stored["compress"], stored["chunk_records"]) != (export_format, compress, chunk_records):
+                raise ValueError("Existing manifest was written with different export settings")
+            manifest = stored
+
+        after_id = manifest["parts"][-1]["last_id"] if manifest["parts"] else 0
+        while True:
+            path = directory / f"part-{len(manifest['parts']):05d}{extension}"
+            records = self._write_part(path, export_format, compress, after_id, chunk_records)
+            if not records:
+                break
+            after_id = self.last_id
+            manifest["parts"].append({"file": path.name, "records": records, "last_id": after_id})
+            # Manifest diperbarui setelah setiap part agar ekspor dapat dilanjutkan
+            temporary = manifest_path.with_name("manifest.json.tmp")
+            temporary.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+            os.replace(temporary, manifest_path)
+            if records < chunk_records:
+                break
+
+        return {
+            "format": export_format,
+            "records": sum(part["records"] for part in manifest["parts"]),
+            "files": [str(directory / part["file"]) for part in manifest["parts"]],
+            "manifest": str(manifest_path)
+        }
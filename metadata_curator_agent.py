@@ -1,5 +1,4 @@
 import streamlit as st
-import google.generativeai as genai
 import pandas as pd
 import json
 import re
@@ -10,58 +9,24 @@ import zipfile
 import mimetypes
 from pathlib import Path
 
-# Konfigurasi halaman Streamlit
-st.set_page_config(
-    page_title="Metadata Curator Agent",
-    page_icon="📚",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+from entity_resolution import CreatorResolver
+from linked_data import ARCHIVAL_RESOURCE_TYPE, LINKED_DATA_CONTEXT, jsonld_properties
+from schemas import DUBLIN_CORE_SCHEMA, ISAD_G_SCHEMA
+from similarity_index import field_consensus
+from utils import MetadataValidator
 
 class MetadataCuratorAgent:
     def __init__(self, api_key: str):
         """Initialize Metadata Curator Agent dengan Gemini AI"""
+        # Gemini dimuat saat agent dibuat, bukan saat modul diimpor
+        import google.generativeai as genai
+
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel('gemini-1.5-flash')
         
         # Skema metadata standar
-        self.dublin_core_schema = {
-            "title": "Judul dokumen",
-            "creator": "Pembuat/Penulis",
-            "subject": "Subjek/Topik",
-            "description": "Deskripsi konten",
-            "publisher": "Penerbit",
-            "contributor": "Kontributor",
-            "date": "Tanggal pembuatan/publikasi",
-            "type": "Jenis dokumen",
-            "format": "Format file",
-            "identifier": "Identifikator unik",
-            "source": "Sumber asal",
-            "language": "Bahasa",
-            "relation": "Relasi dengan dokumen lain",
-            "coverage": "Cakupan geografis/temporal",
-            "rights": "Hak cipta/akses"
-        }
-        
-        self.isad_g_schema = {
-            "reference_code": "Kode referensi",
-            "title": "Judul",
-            "date": "Tanggal",
-            "level_of_description": "Tingkat deskripsi",
-            "extent_and_medium": "Jumlah dan media",
-            "name_of_creator": "Nama pembuat",
-            "scope_and_content": "Ruang lingkup dan isi",
-            "conditions_of_access": "Kondisi akses",
-            "conditions_of_reproduction": "Kondisi reproduksi",
-            "language_of_material": "Bahasa materi",
-            "physical_characteristics": "Karakteristik fisik",
-            "finding_aids": "Alat bantu pencarian",
-            "location_of_originals": "Lokasi asli",
-            "availability_of_copies": "Ketersediaan salinan",
-            "related_units": "Unit terkait",
-            "publication_note": "Catatan publikasi",
-            "notes": "Catatan umum"
-        }
+        self.dublin_core_schema = dict(DUBLIN_CORE_SCHEMA)
+        self.isad_g_schema = dict(ISAD_G_SCHEMA)
 
     def extract_metadata_from_text(self, content: str, file_name: str = "") -> Dict[str, Any]:
         """Ekstrak metadata dari konten teks menggunakan Gemini"""
@@ -150,13 +115,28 @@ class MetadataCuratorAgent:
         """Berikan saran perbaikan metadata berdasarkan konteks dan arsip sejenis"""
         suggestions = []
         
+        # Saran dari record serupa yang sudah dikurasi: nilai mayoritas untuk field kosong
+        dc_metadata = metadata.get("dublin_core", {})
+        neighbours = [record.get("dublin_core", record) for record in (similar_records or [])]
+        for field, consensus in field_consensus(dc_metadata, neighbours, self.dublin_core_schema).items():
+            suggestions.append(
+                f"Field '{field}' kosong; {consensus['support']:.0%} record serupa menggunakan '{consensus['value']}'"
+            )
+        
+        reference = ""
+        if neighbours:
+            reference = f"""
+        Record serupa yang sudah dikurasi (gunakan sebagai acuan konsistensi):
+        {json.dumps(neighbours[:3], indent=2, ensure_ascii=False)[:3000]}
+        """
+        
         # Analisis menggunakan Gemini
         prompt = f"""
         Analisis metadata berikut dan berikan saran perbaikan berdasarkan best practices untuk metadata arsip:
         
         Metadata saat ini:
         {json.dumps(metadata, indent=2)}
-        
+        {reference}
         Berikan saran dalam format list untuk:
         1. Field yang hilang atau tidak lengkap
         2. Perbaikan format atau standarisasi
@@ -170,7 +150,7 @@ class MetadataCuratorAgent:
             response = self.model.generate_content(prompt)
             # Parse suggestions from response
             suggestions_text = response.text
-            suggestions = [s.strip() for s in suggestions_text.split('\n') if s.strip() and not s.strip().startswith('#')]
+            suggestions.extend(s.strip() for s in suggestions_text.split('\n') if s.strip() and not s.strip().startswith('#'))
         except Exception as e:
             suggestions.append(f"Error dalam analisis: {str(e)}")
         
@@ -185,58 +165,38 @@ class MetadataCuratorAgent:
             "missing_patterns": []
         }
         
-        # Analisis format tanggal
-        date_formats = set()
-        for metadata in metadata_list:
-            date_val = metadata.get("dublin_core", {}).get("date", "")
-            if date_val:
-                date_formats.add(self._detect_date_format(date_val))
+        # Analisis format tanggal (satu kolom divalidasi sekaligus)
+        dates = [metadata.get("dublin_core", {}).get("date", "") for metadata in metadata_list]
+        dates = [date_val for date_val in dates if date_val]
+        date_formats = set(MetadataValidator.validate_dates_batch(dates)["format"]) if dates else set()
         
         if len(date_formats) > 1:
             inconsistencies["date_format_issues"].append(f"Ditemukan {len(date_formats)} format tanggal berbeda")
         
-        # Analisis creator naming
-        creators = []
+        # Analisis creator naming: cluster varian nama yang merujuk entitas sama
+        resolver = CreatorResolver()
         for metadata in metadata_list:
             creator = metadata.get("dublin_core", {}).get("creator", "")
             if creator:
-                creators.append(creator)
+                resolver.add(creator)
         
-        # Deteksi variasi nama yang mungkin sama
-        unique_creators = set(creators)
-        if len(unique_creators) != len(creators):
-            inconsistencies["naming_inconsistencies"].append("Ditemukan variasi nama creator yang mungkin merujuk entitas sama")
+        for cluster in resolver.resolve():
+            variants = ", ".join(f"'{variant}'" for variant in cluster.variants)
+            inconsistencies["naming_inconsistencies"].append(
+                f"Variasi nama creator yang mungkin merujuk entitas sama: {variants} (disarankan: '{cluster.canonical}')"
+            )
         
         return inconsistencies
 
     def create_linked_data(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Buat linked data dari metadata"""
         linked_data = {
-            "@context": {
-                "dc": "http://purl.org/dc/elements/1.1/",
-                "dcterms": "http://purl.org/dc/terms/",
-                "foaf": "http://xmlns.com/foaf/0.1/",
-                "schema": "http://schema.org/"
-            },
-            "@type": "schema:ArchivalResource"
+            "@context": dict(LINKED_DATA_CONTEXT),
+            "@type": ARCHIVAL_RESOURCE_TYPE
         }
         
         # Map Dublin Core ke linked data
-        dc_metadata = metadata.get("dublin_core", {})
-        mapping = {
-            "title": "dc:title",
-            "creator": "dc:creator",
-            "subject": "dc:subject",
-            "description": "dc:description",
-            "date": "dc:date",
-            "type": "dc:type",
-            "format": "dc:format",
-            "language": "dc:language"
-        }
-        
-        for field, property_name in mapping.items():
-            if dc_metadata.get(field):
-                linked_data[property_name] = dc_metadata[field]
+        linked_data.update(jsonld_properties(metadata.get("dublin_core", {})))
         
         return linked_data
 
@@ -251,26 +211,21 @@ class MetadataCuratorAgent:
 
     def _is_valid_date(self, date_string: str) -> bool:
         """Validasi format tanggal"""
-        date_patterns = [
-            r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-            r'\d{2}/\d{2}/\d{4}',  # DD/MM/YYYY
-            r'\d{4}',              # YYYY
-            r'\d{2}-\d{2}-\d{4}'   # DD-MM-YYYY
-        ]
-        return any(re.match(pattern, date_string.strip()) for pattern in date_patterns)
+        return MetadataValidator.validate_date_format(date_string)["is_valid"]
 
     def _detect_date_format(self, date_string: str) -> str:
         """Deteksi format tanggal"""
-        if re.match(r'\d{4}-\d{2}-\d{2}', date_string):
-            return "ISO (YYYY-MM-DD)"
-        elif re.match(r'\d{2}/\d{2}/\d{4}', date_string):
-            return "DD/MM/YYYY"
-        elif re.match(r'\d{4}', date_string):
-            return "Year only"
-        else:
-            return "Unknown format"
+        return MetadataValidator.detect_date_format(date_string)
 
 def main():
+    # Konfigurasi halaman Streamlit (harus menjadi perintah Streamlit pertama)
+    st.set_page_config(
+        page_title="Metadata Curator Agent",
+        page_icon="📚",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
     st.title("🏛️ Metadata Curator Agent")
     st.markdown("**AI Agent untuk Manajemen Metadata Arsip dengan Human-in-the-Loop**")
     
@@ -3,21 +3,62 @@ Metadata Curator Agent Package
 
 AI Agent untuk Manajemen Metadata Arsip dengan Human-in-the-Loop
 menggunakan Google Gemini AI dan Streamlit.
+
+Atribut paket dimuat saat pertama kali diakses, sehingga worker yang hanya
+membutuhkan MetadataDatabase atau DocumentProcessor tidak ikut memuat
+Streamlit, Gemini maupun pandas.
 """
 
+from pathlib import Path
+import importlib
+import importlib.util
+import sys
+
 __version__ = "1.0.0"
 __author__ = "Data Governance Team"
 __email__ = "dg-team@domain.com"
 __description__ = "AI Agent untuk Manajemen Metadata Arsip"
 
-from .metadata_curator_agent import MetadataCuratorAgent
-from .database import MetadataDatabase
-from .utils import DocumentProcessor, MetadataValidator, QualityMetrics
-
-__all__ = [
-    "MetadataCuratorAgent",
-    "MetadataDatabase", 
-    "DocumentProcessor",
-    "MetadataValidator",
-    "QualityMetrics"
-]
+# Nama atribut -> modul top-level yang menyediakannya
+_LAZY_ATTRIBUTES = {
+    "MetadataCuratorAgent": "metadata_curator_app",
+    "MetadataDatabase": "database",
+    "DocumentProcessor": "utils",
+    "MetadataValidator": "utils",
+    "QualityMetrics": "utils"
+}
+
+# Aplikasi Streamlit dasar (metadata_curator_agent.py) tertutup nama paket ini,
+# sehingga dimuat langsung dari path file-nya
+_APP_MODULE_PATH = Path(__file__).resolve().parent.parent / "metadata_curator_agent.py"
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def _import_module(name: str):
+    if name != "metadata_curator_app":
+        return importlib.import_module(name)
+    module = sys.modules.get(name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(name, _APP_MODULE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+    return module
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(_import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,635 @@
+"""
+CLI headless untuk ingest batch metadata arsip
+
+Memproses direktori atau manifest berisi daftar file tanpa Streamlit:
+ekstraksi teks, ekstraksi metadata (Gemini atau model offline), validasi,
+lalu simpan langsung ke MetadataDatabase. Setiap file menghasilkan satu
+baris JSONL dan ringkasan throughput/latensi ditulis ke stderr di akhir run.
+State setiap file dicatat di manifest run (ingest_runs) sehingga run yang
+terputus dapat dilanjutkan dengan perintah resume. Perintah serve menjalankan
+layanan HTTP (extraction_service) untuk sistem lain.
+
+Dengan --shards N, file dibagi ke N proses worker yang masing-masing menulis
+ke shard SQLite sendiri (shards.py); setelah semua selesai shard di-merge ke
+database utama. Shard yang tertinggal (mis. setelah crash) di-merge dengan
+perintah merge-shards.
+
+Contoh (dari root repositori):
+    python -m metadata_curator_agent.main ingest arsip/ --concurrency 8 --rate-limit 120 --output hasil.jsonl
+    metadata-curator ingest --manifest daftar.txt --offline --max-documents 1000
+    metadata-curator resume 12 --concurrency 8 --max-tokens 2000000
+    metadata-curator ingest arsip/ --shards 4 --concurrency 4 --output hasil.jsonl
+    metadata-curator merge-shards --db metadata.db
+    metadata-curator usage --by file_type
+    metadata-curator serve --port 8080 --workers 8 --queue-size 128
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence
+import argparse
+import asyncio
+import json
+import math
+import mimetypes
+import os
+import sys
+import threading
+import time
+
+from curator_agent import EnhancedMetadataCuratorAgent
+from database import MetadataDatabase
+from extraction_service import DEFAULT_HOST, DEFAULT_PORT, SERVICE_QUEUE_SIZE, SERVICE_WORKERS, ExtractionService
+from ingest_runs import CHECKPOINT_INTERVAL_ITEMS, CHECKPOINT_INTERVAL_SECONDS, RunManifest, list_runs
+import instrumentation
+from offline_model import OfflineModel
+from shards import ShardedReader, find_shards, init_shard, merge_shards, shard_path
+from usage_ledger import USAGE_GROUPS, TokenBudget, TokenBudgetExceeded, UsageLedger
+from utils import file_sha256
+
+# Ekstensi file yang dapat diproses DocumentProcessor
+SUPPORTED_EXTENSIONS = (
+    ".pdf", ".docx", ".doc", ".txt", ".json", ".jsonl", ".ndjson", ".csv",
+    ".html", ".htm", ".xhtml", ".xml", ".ead"
+)
+
+# Variabel lingkungan untuk API key Gemini
+API_KEY_ENV_VARS = ("GEMINI_API_KEY", "GOOGLE_API_KEY")
+
+# Tahap pipeline per file yang diukur latensinya
+PIPELINE_STAGES = ("read", "text", "model", "validate", "save")
+
+
+def iter_input_files(paths: Iterable[str], manifest: Optional[str] = None,
+                     extensions: Sequence[str] = SUPPORTED_EXTENSIONS) -> Iterator[Path]:
+    """File input dari path (file/direktori, rekursif) dan manifest
+
+    Manifest berisi satu path per baris atau baris JSON dengan key "path";
+    baris kosong dan komentar (#) diabaikan. Path relatif di manifest
+    dihitung dari direktori manifest.
+    """
+    extensions = tuple(extension.lower() for extension in extensions)
+    sources: List[Path] = [Path(path) for path in paths]
+    if manifest:
+        manifest_path = Path(manifest)
+        with open(manifest_path, encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                entry = json.loads(line)["path"] if line.startswith("{") else line
+                path = Path(entry)
+                sources.append(path if path.is_absolute() else manifest_path.parent / path)
+
+    seen = set()
+    for source in sources:
+        if source.is_dir():
+            candidates = sorted(path for path in source.rglob("*") if path.is_file())
+        else:
+            candidates = [source]
+        for path in candidates:
+            if source.is_dir() and path.suffix.lower() not in extensions:
+                continue
+            key = str(path.resolve())
+            if key not in seen:
+                seen.add(key)
+                yield path
+
+
+class RateLimiter:
+    """Pembatas laju panggilan model (panggilan per menit) yang aman antar thread"""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Tunggu hingga slot panggilan berikutnya tersedia"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Persentil nearest-rank dari nilai yang sudah diurutkan"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+
+class BatchIngestor:
+    """Runner ingest batch dengan thread pool, rate limit dan budget
+
+    Dengan manifest (RunManifest), setiap transisi state item dicatat dan
+    di-checkpoint secara periodik sehingga run dapat dilanjutkan; item yang
+    sudah memiliki metadata/validasi tersimpan tidak diproses ulang.
+    """
+
+    def __init__(self, agent: EnhancedMetadataCuratorAgent, schema_type: str = "dublin_core", concurrency: int = 4,
+                 rate_limit: float = 0.0, max_documents: Optional[int] = None, max_seconds: Optional[float] = None,
+                 save: bool = True, include_metadata: bool = False, manifest: Optional[RunManifest] = None,
+                 dedupe_db: Optional[MetadataDatabase] = None):
+        self.agent = agent
+        self.schema_type = schema_type
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.max_documents = max_documents
+        self.max_seconds = max_seconds
+        self.save = save
+        self.include_metadata = include_metadata
+        self.manifest = manifest
+        # Database utama untuk cek hash saat agent menulis ke shard
+        self.dedupe_db = dedupe_db
+        # Satu penulis SQLite; worker lain tetap mengekstraksi selama penulisan
+        self._write_lock = threading.Lock()
+
+    def _advance(self, item: Dict[str, Any], **changes: Any):
+        if self.manifest is not None:
+            self.manifest.update(item, **changes)
+        else:
+            item.update(changes)
+
+    def process_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Proses satu item mulai dari state terakhirnya; error dicatat di hasil, tidak dilempar"""
+        path = Path(item["path"])
+        timings: Dict[str, float] = {}
+        result: Dict[str, Any] = {"path": str(path), "status": "ok"}
+        started = stage_started = time.perf_counter()
+
+        def finish_stage(stage: str):
+            nonlocal stage_started
+            now = time.perf_counter()
+            timings[stage] = round((now - stage_started) * 1000, 2)
+            stage_started = now
+
+        if item.get("attempts"):
+            instrumentation.increment("retries_total", component="ingest")
+        try:
+            metadata = item.get("metadata")
+            if metadata is None:
+                # File di-hash per chunk lalu dibaca ulang sebagai stream; tidak dimuat utuh ke memori
+                with path.open("rb") as handle:
+                    file_hash = file_sha256(handle)
+                    finish_stage("read")
+                    existing_id = self.agent.db.get_ingested_file(file_hash) if self.save else None
+                    if existing_id is None and self.save and self.dedupe_db is not None:
+                        existing_id = self.dedupe_db.get_ingested_file(file_hash)
+                    if existing_id is not None:
+                        # Konten identik sudah tersimpan (run lain atau file duplikat)
+                        self._advance(item, state="saved", file_hash=file_hash, metadata_id=existing_id, error=None)
+                        result.update({"status": "duplicate", "metadata_id": existing_id})
+                        return result
+
+                    handle.seek(0)
+                    mime_type = mimetypes.guess_type(path.name)[0] or ""
+                    text = self.agent.doc_processor.process_file(handle, path.name, mime_type)
+                finish_stage("text")
+                self.rate_limiter.acquire()
+                stage_started = time.perf_counter()
+                metadata = self.agent.extract_metadata_from_text(text, path.name, raise_errors=True,
+                                                                 schema_type=self.schema_type)
+                finish_stage("model")
+                result["tokens"] = self.agent.last_call_usage()["total_tokens"]
+                self._advance(item, state="extracted", file_hash=file_hash, metadata=metadata, error=None)
+
+            validation_results = item.get("validation")
+            if validation_results is None:
+                validation_results = self.agent.advanced_validation(metadata, self.schema_type)
+                finish_stage("validate")
+                self._advance(item, state="validated", validation=validation_results, error=None)
+
+            if self.save:
+                with self._write_lock:
+                    metadata_id, created = self.agent.db.save_file_metadata(
+                        item["file_hash"], path.name, metadata, self.schema_type, validation_results
+                    )
+                finish_stage("save")
+                self._advance(item, state="saved", metadata_id=metadata_id, error=None)
+                result["metadata_id"] = metadata_id
+                if not created:
+                    result["status"] = "duplicate"
+
+            result.update({
+                "is_valid": validation_results["is_valid"],
+                "completeness_score": validation_results["completeness_score"],
+                "confidence_score": metadata.get("confidence_score", 0.0)
+            })
+            if self.include_metadata:
+                result["metadata"] = metadata
+        except TokenBudgetExceeded as e:
+            # Item tidak gagal; state dipertahankan agar diproses pada resume
+            result.update({"status": "skipped", "error": str(e)})
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            self._advance(item, state="failed", attempts=(item.get("attempts") or 0) + 1, error=error)
+            result.update({"status": "failed", "error": error})
+        finally:
+            result["state"] = item["state"]
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            result["stages_ms"] = timings
+        return result
+
+    def run(self, items: Iterable[Dict[str, Any]], output: IO[str]) -> Dict[str, Any]:
+        """Proses semua item dan tulis hasil JSONL; kembalikan ringkasan run"""
+        started = time.perf_counter()
+        stats = RunStats()
+        stopped_reason = None
+        submitted = 0
+
+        def collect(future: Future):
+            result = future.result()
+            output.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+            stats.add(result)
+            if self.manifest is not None:
+                self.manifest.maybe_checkpoint()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ingest") as executor:
+                pending = set()
+                for item in items:
+                    if self.max_documents is not None and submitted >= self.max_documents:
+                        stopped_reason = "max_documents"
+                        break
+                    if self.max_seconds is not None and time.perf_counter() - started >= self.max_seconds:
+                        stopped_reason = "max_seconds"
+                        break
+                    if self.agent.token_budget is not None and self.agent.token_budget.exhausted:
+                        stopped_reason = "max_tokens"
+                        break
+                    # Batasi jumlah future agar manifest besar tidak dimuat sekaligus
+                    if len(pending) >= self.concurrency * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            collect(future)
+                    pending.add(executor.submit(self.process_item, item))
+                    submitted += 1
+                for future in wait(pending).done:
+                    collect(future)
+        finally:
+            if self.manifest is not None:
+                self.manifest.checkpoint()
+
+        return stats.summary(time.perf_counter() - started, stopped_reason)
+
+
+class RunStats:
+    """Akumulasi hasil per item (baris JSONL) menjadi ringkasan run"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.stage_totals = {stage: 0.0 for stage in PIPELINE_STAGES}
+        self.counts = {"ok": 0, "duplicate": 0, "failed": 0, "skipped": 0}
+        self.total_tokens = 0
+
+    def add(self, result: Dict[str, Any]):
+        self.total_tokens += result.get("tokens", 0)
+        self.counts[result["status"]] += 1
+        self.latencies.append(result["latency_ms"])
+        for stage, elapsed in result["stages_ms"].items():
+            self.stage_totals[stage] += elapsed
+
+    def summary(self, elapsed: float, stopped_reason: Optional[str] = None) -> Dict[str, Any]:
+        processed = sum(self.counts.values())
+        latencies = sorted(self.latencies)
+        return {
+            "processed": processed,
+            "succeeded": self.counts["ok"],
+            "duplicates": self.counts["duplicate"],
+            "failed": self.counts["failed"],
+            "skipped": self.counts["skipped"],
+            "stopped_reason": stopped_reason,
+            "total_tokens": self.total_tokens,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_per_second": round(processed / elapsed, 3) if elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(sum(latencies) / processed, 2) if processed else 0.0,
+                "p50": percentile(latencies, 0.50),
+                "p95": percentile(latencies, 0.95),
+                "p99": percentile(latencies, 0.99),
+                "max": latencies[-1] if latencies else 0.0
+            },
+            "stage_mean_ms": {
+                stage: round(total / processed, 2) if processed else 0.0 for stage, total in self.stage_totals.items()
+            }
+        }
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Ringkasan run dalam bentuk teks untuk stderr"""
+    latency = summary["latency_ms"]
+    lines = [
+        f"Processed: {summary['processed']} (ok {summary['succeeded']}, duplicate {summary['duplicates']}, "
+        f"failed {summary['failed']}, skipped {summary['skipped']})"
+        + (f", stopped by {summary['stopped_reason']}" if summary["stopped_reason"] else ""),
+        f"Model tokens: {summary['total_tokens']}",
+        f"Elapsed: {summary['elapsed_seconds']:.2f} s, throughput {summary['throughput_per_second']:.2f} docs/s",
+        f"Latency ms: mean {latency['mean']:.1f}, p50 {latency['p50']:.1f}, p95 {latency['p95']:.1f}, "
+        f"p99 {latency['p99']:.1f}, max {latency['max']:.1f}",
+        "Stage mean ms: " + ", ".join(f"{stage} {value:.1f}" for stage, value in summary["stage_mean_ms"].items())
+    ]
+    return "\n".join(lines)
+
+
+def resolve_api_key(args: argparse.Namespace) -> str:
+    """API key Gemini dari --api-key atau variabel lingkungan; keluar bila tidak ada"""
+    api_key = args.api_key or next((os.environ[name] for name in API_KEY_ENV_VARS if os.environ.get(name)), None)
+    if not api_key:
+        raise SystemExit(f"Gemini API key is required: pass --api-key, set {' or '.join(API_KEY_ENV_VARS)}, or use --offline")
+    return api_key
+
+
+def build_agent(args: argparse.Namespace, db: Optional[MetadataDatabase] = None) -> EnhancedMetadataCuratorAgent:
+    db = db or MetadataDatabase(args.db)
+    if args.offline:
+        return EnhancedMetadataCuratorAgent(model=OfflineModel(latency=args.offline_latency), db=db)
+    return EnhancedMetadataCuratorAgent(resolve_api_key(args), db=db)
+
+
+def add_model_arguments(parser: argparse.ArgumentParser):
+    """Opsi database dan model untuk perintah yang membuat agent"""
+    parser.add_argument("--db", default="metadata.db", help="Path database SQLite (default: metadata.db)")
+    parser.add_argument("--api-key", help="Gemini API key (default: dari " + "/".join(API_KEY_ENV_VARS) + ")")
+    parser.add_argument("--offline", action="store_true", help="Pakai model offline heuristik, tanpa Gemini")
+    parser.add_argument("--offline-latency", type=float, default=0.0, help="Simulasi latensi model offline (detik)")
+
+
+def add_run_arguments(parser: argparse.ArgumentParser):
+    """Opsi bersama untuk perintah yang menjalankan pipeline"""
+    add_model_arguments(parser)
+    parser.add_argument("--concurrency", type=int, default=4, help="Jumlah worker thread (default: 4)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Maksimal panggilan model per menit (0 = tanpa batas)")
+    parser.add_argument("--max-documents", type=int, help="Budget: berhenti setelah N dokumen")
+    parser.add_argument("--max-seconds", type=float, help="Budget: berhenti mengambil dokumen baru setelah N detik")
+    parser.add_argument("--max-tokens", type=int, help="Budget: berhenti setelah total token model mencapai N")
+    parser.add_argument("--output", default="-", help="File JSONL hasil per dokumen (default: stdout)")
+    parser.add_argument("--summary", help="Simpan ringkasan run sebagai JSON")
+    parser.add_argument("--include-metadata", action="store_true", help="Sertakan metadata lengkap di JSONL")
+    parser.add_argument("--checkpoint-items", type=int, default=CHECKPOINT_INTERVAL_ITEMS,
+                        help="Checkpoint state run setiap N item")
+    parser.add_argument("--checkpoint-seconds", type=float, default=CHECKPOINT_INTERVAL_SECONDS,
+                        help="Checkpoint state run setiap N detik")
+    parser.add_argument("--metrics", help="Aktifkan instrumentasi dan tulis metrik Prometheus ke file ini")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="metadata-curator", description="Metadata Curator Agent (headless)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Ekstraksi, validasi dan simpan metadata untuk banyak file")
+    ingest.add_argument("paths", nargs="*", help="File atau direktori input")
+    ingest.add_argument("--manifest", help="File berisi daftar path (satu per baris atau JSONL dengan key path)")
+    ingest.add_argument("--extensions", default=",".join(SUPPORTED_EXTENSIONS),
+                        help="Ekstensi yang diproses saat memindai direktori")
+    ingest.add_argument("--schema", dest="schema_type", choices=["dublin_core", "isad_g"], default="dublin_core")
+    ingest.add_argument("--dry-run", action="store_true", help="Jangan tulis ke database (tanpa manifest run)")
+    ingest.add_argument("--shards", type=int, default=0,
+                        help="Jumlah proses worker, masing-masing menulis ke shard SQLite sendiri (0 = satu proses)")
+    ingest.add_argument("--keep-shards", action="store_true", help="Jangan hapus file shard setelah di-merge")
+    add_run_arguments(ingest)
+
+    resume = commands.add_parser("resume", help="Lanjutkan run ingest: lewati item tersimpan, ulangi yang gagal")
+    resume.add_argument("run_id", type=int)
+    add_run_arguments(resume)
+
+    runs = commands.add_parser("runs", help="Daftar run ingest beserta progres per state")
+    runs.add_argument("--db", default="metadata.db", help="Path database SQLite (default: metadata.db)")
+    runs.add_argument("--limit", type=int, default=20)
+
+    usage = commands.add_parser("usage", help="Pemakaian token dan biaya model per hari/jenis file/skema")
+    usage.add_argument("--db", default="metadata.db", help="Path database SQLite (default: metadata.db)")
+    usage.add_argument("--by", dest="group_by", choices=list(USAGE_GROUPS), default="day")
+    usage.add_argument("--since", help="Hanya panggilan sejak tanggal ini (YYYY-MM-DD)")
+    usage.add_argument("--limit", type=int, default=100)
+
+    merge = commands.add_parser("merge-shards", help="Merge shard SQLite ke database utama")
+    merge.add_argument("shards", nargs="*", help="File shard (default: <db>.shard-*.db di samping database)")
+    merge.add_argument("--db", default="metadata.db", help="Path database SQLite (default: metadata.db)")
+    merge.add_argument("--keep-shards", action="store_true", help="Jangan hapus file shard setelah di-merge")
+    merge.add_argument("--dry-run", action="store_true", help="Hanya tampilkan jumlah record per database")
+
+    serve = commands.add_parser("serve", help="Jalankan layanan HTTP ekstraksi/validasi/pencarian")
+    serve.add_argument("--host", default=DEFAULT_HOST)
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="Jumlah worker pool")
+    serve.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE,
+                       help="Maksimal pekerjaan menunggu sebelum request ditolak (503)")
+    serve.add_argument("--metrics", action="store_true", help="Aktifkan instrumentasi (GET /metrics)")
+    add_model_arguments(serve)
+    return parser
+
+
+def execute_run(args: argparse.Namespace, agent: EnhancedMetadataCuratorAgent, schema_type: str,
+                items: Iterable[Dict[str, Any]], manifest: Optional[RunManifest] = None) -> int:
+    """Jalankan BatchIngestor atas items, tulis JSONL dan ringkasan"""
+    if args.metrics:
+        instrumentation.enable()
+    if args.max_tokens:
+        agent.token_budget = TokenBudget(args.max_tokens)
+    ingestor = BatchIngestor(
+        agent, schema_type, args.concurrency, args.rate_limit, args.max_documents, args.max_seconds,
+        save=manifest is not None, include_metadata=args.include_metadata, manifest=manifest
+    )
+    if args.output == "-":
+        summary = ingestor.run(items, sys.stdout)
+    else:
+        with open(args.output, "w", encoding="utf-8") as output:
+            summary = ingestor.run(items, output)
+
+    print(format_summary(summary), file=sys.stderr)
+    if manifest is not None:
+        progress = manifest.finish()
+        summary["run_id"] = manifest.run_id
+        summary["run_progress"] = progress
+        total = sum(progress.values())
+        print(f"Run {manifest.run_id}: saved {progress['saved']}/{total}, failed {progress['failed']}", file=sys.stderr)
+        if progress["saved"] < total:
+            print(f"Resume with: metadata-curator resume {manifest.run_id} --db {args.db}", file=sys.stderr)
+    if args.summary:
+        Path(args.summary).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    if args.metrics:
+        Path(args.metrics).write_text(instrumentation.export_prometheus(), encoding="utf-8")
+    return 1 if summary["failed"] else 0
+
+
+def run_ingest(args: argparse.Namespace) -> int:
+    if not args.paths and not args.manifest:
+        raise SystemExit("No input: pass paths and/or --manifest")
+    extensions = [extension if extension.startswith(".") else f".{extension}"
+                  for extension in args.extensions.split(",") if extension]
+    files = iter_input_files(args.paths, args.manifest, extensions)
+    if args.shards:
+        # Setiap proses shard membuat agent sendiri
+        return run_sharded_ingest(args, [str(path) for path in files])
+    agent = build_agent(args)
+    if args.dry_run:
+        items = ({"seq": seq, "path": str(path), "state": "pending"} for seq, path in enumerate(files))
+        return execute_run(args, agent, args.schema_type, items)
+
+    manifest = RunManifest.create(
+        agent.db, (str(path) for path in files),
+        params={"schema_type": args.schema_type, "paths": args.paths, "manifest": args.manifest},
+        checkpoint_items=args.checkpoint_items, checkpoint_seconds=args.checkpoint_seconds
+    )
+    print(f"Run {manifest.run_id}: {manifest.get_run()['total_items']} files", file=sys.stderr)
+    return execute_run(args, agent, args.schema_type, manifest.iter_items(), manifest)
+
+
+def ingest_shard(args: argparse.Namespace, index: int, paths: List[str], output_path: str) -> Dict[str, Any]:
+    """Proses worker ingest sharded: agent sendiri yang menulis ke shard ke-index"""
+    agent = build_agent(args, init_shard(shard_path(args.db, index)))
+    if args.max_tokens:
+        agent.token_budget = TokenBudget(args.max_tokens)
+    ingestor = BatchIngestor(
+        agent, args.schema_type, args.concurrency, args.rate_limit, args.max_documents, args.max_seconds,
+        include_metadata=args.include_metadata, dedupe_db=MetadataDatabase(args.db)
+    )
+    items = ({"seq": seq, "path": path, "state": "pending"} for seq, path in enumerate(paths))
+    with open(output_path, "w", encoding="utf-8") as output:
+        return ingestor.run(items, output)
+
+
+def run_sharded_ingest(args: argparse.Namespace, paths: List[str]) -> int:
+    """Bagi file ke args.shards proses, lalu merge shard ke database utama
+
+    Budget run dibagi rata per shard. Tanpa manifest run: ingest ulang atas
+    input yang sama melewati file tersimpan berdasarkan hash.
+    """
+    if args.dry_run or args.metrics:
+        raise SystemExit("--shards cannot be combined with --dry-run or --metrics")
+    if not args.offline:
+        # Gagal di awal, bukan di setiap proses shard
+        resolve_api_key(args)
+    shards = max(1, min(args.shards, len(paths)))
+    MetadataDatabase(args.db)
+    worker_args = argparse.Namespace(**vars(args))
+    worker_args.rate_limit = args.rate_limit / shards
+    worker_args.max_documents = math.ceil(args.max_documents / shards) if args.max_documents else None
+    worker_args.max_tokens = args.max_tokens // shards if args.max_tokens else None
+    output_paths = [shard_path(args.db, index) + ".jsonl" for index in range(shards)]
+    print(f"Sharded ingest: {len(paths)} files over {shards} shards", file=sys.stderr)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=shards) as executor:
+        futures = [executor.submit(ingest_shard, worker_args, index, paths[index::shards], output_paths[index])
+                   for index in range(shards)]
+        reasons = [future.result()["stopped_reason"] for future in futures]
+
+    stats = RunStats()
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for index, output_path in enumerate(output_paths):
+            with open(output_path, encoding="utf-8") as handle:
+                for line in handle:
+                    result = json.loads(line)
+                    result["shard"] = index
+                    stats.add(result)
+                    output.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+            os.remove(output_path)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    summary = stats.summary(time.perf_counter() - started, next((reason for reason in reasons if reason), None))
+    print(format_summary(summary), file=sys.stderr)
+
+    merges = merge_shards(MetadataDatabase(args.db), [shard_path(args.db, index) for index in range(shards)],
+                          remove=not args.keep_shards)
+    summary["shards"] = merges
+    print(format_merges(merges), file=sys.stderr)
+    if args.summary:
+        Path(args.summary).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return 1 if summary["failed"] else 0
+
+
+def format_merges(merges: List[Dict[str, Any]]) -> str:
+    """Hasil merge per shard dalam bentuk teks untuk stderr"""
+    return "\n".join(
+        f"Merged {merge['shard']}: " + ("already merged" if merge["already_merged"] else
+                                        f"{merge['records']} records, {merge['skipped']} duplicates skipped")
+        for merge in merges
+    )
+
+
+def run_merge_shards(args: argparse.Namespace) -> int:
+    paths = args.shards or find_shards(args.db)
+    if not paths:
+        print("No shards found", file=sys.stderr)
+        return 0
+    if args.dry_run:
+        print(json.dumps(ShardedReader(args.db, paths).count_records()))
+        return 0
+    print(format_merges(merge_shards(MetadataDatabase(args.db), paths, remove=not args.keep_shards)), file=sys.stderr)
+    return 0
+
+
+def run_resume(args: argparse.Namespace) -> int:
+    agent = build_agent(args)
+    manifest = RunManifest(agent.db, args.run_id, args.checkpoint_items, args.checkpoint_seconds)
+    try:
+        run = manifest.get_run()
+    except KeyError as e:
+        raise SystemExit(str(e.args[0]))
+    progress = run["progress"]
+    print(f"Resuming run {run['id']}: {sum(progress.values()) - progress['saved']} unfinished "
+          f"({progress['failed']} failed)", file=sys.stderr)
+    return execute_run(args, agent, run["params"].get("schema_type", "dublin_core"), manifest.iter_items(), manifest)
+
+
+def run_list(args: argparse.Namespace) -> int:
+    for run in list_runs(MetadataDatabase(args.db), args.limit):
+        print(json.dumps(run, ensure_ascii=False, default=str))
+    return 0
+
+
+def run_usage(args: argparse.Namespace) -> int:
+    ledger = UsageLedger(MetadataDatabase(args.db))
+    for row in ledger.usage_summary(args.group_by, args.since, args.limit):
+        print(json.dumps(row, ensure_ascii=False))
+    totals = ledger.totals(args.since)
+    print(f"Total: {totals['calls']} calls, {totals['total_tokens']} tokens, ${totals['cost_usd']:.4f}, "
+          f"{totals['cache_hits']} cache hits", file=sys.stderr)
+    return 0
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    if args.metrics:
+        instrumentation.enable()
+    service = ExtractionService(build_agent(args), args.workers, args.queue_size)
+
+    def ready(server):
+        for sock in server.sockets:
+            host, port = sock.getsockname()[:2]
+            print(f"Serving on http://{host}:{port} ({args.workers} workers, queue {args.queue_size})", file=sys.stderr)
+
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "ingest":
+        return run_ingest(args)
+    if args.command == "resume":
+        return run_resume(args)
+    if args.command == "runs":
+        return run_list(args)
+    if args.command == "usage":
+        return run_usage(args)
+    if args.command == "merge-shards":
+        return run_merge_shards(args)
+    if args.command == "serve":
+        return run_serve(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
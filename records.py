@@ -0,0 +1,206 @@
+"""
+Record metadata ringkas (__slots__) untuk pipeline batch
+
+Metadata hasil ekstraksi dan hasil validasi biasanya berupa dict bersarang.
+Untuk batch besar (ratusan ribu record) overhead dict mendominasi memori:
+setiap record membawa hash table sendiri dan, bila di-decode dari JSON,
+salinan string key sendiri. Kelas di sini dibangkitkan dari definisi skema
+(schemas.py) dengan __slots__, sehingga key disimpan sekali per kelas.
+
+Konversi ke/dari dict dan JSON murah dan tanpa kehilangan data: field yang
+tidak ada di dict ditandai _ABSENT dan tidak ikut dikembalikan oleh
+to_dict(), key yang bernilai None tetap ada, dan key di luar skema disimpan
+di extra. get(), [] dan in mengikuti semantik dict (key bernilai None tetap
+dianggap ada) sehingga record dapat langsung diberikan ke ValidationEngine.
+"""
+
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+
+from schemas import DUBLIN_CORE_SCHEMA, ISAD_G_SCHEMA
+
+
+class _Absent:
+    """Penanda field yang tidak ada (berbeda dari field bernilai None)"""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<absent>"
+
+    def __reduce__(self) -> str:
+        # Pickle/copy mengembalikan singleton yang sama
+        return "_ABSENT"
+
+
+_ABSENT = _Absent()
+
+
+class SlottedRecord:
+    """Basis record dengan __slots__; field didefinisikan oleh subclass lewat record_class"""
+
+    __slots__ = ("extra",)
+    _fields: Tuple[str, ...] = ()
+    _field_set: frozenset = frozenset()
+    _nested: Dict[str, type] = {}
+    _defaults: Dict[str, Any] = {}
+    _getter = staticmethod(lambda record: ())
+
+    def __init__(self, **values: Any):
+        for field in self._fields:
+            setattr(self, field, values.pop(field, _ABSENT))
+        self.extra = values or None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SlottedRecord":
+        """Buat record dari dict; section bersarang ikut dikonversi"""
+        record = cls.__new__(cls)
+        nested = cls._nested
+        for field in cls._fields:
+            value = data.get(field, _ABSENT)
+            if field in nested and isinstance(value, dict):
+                value = nested[field].from_dict(value)
+            setattr(record, field, value)
+        record.extra = None
+        if not data.keys() <= cls._field_set:
+            record.extra = {key: value for key, value in data.items() if key not in cls._field_set}
+        return record
+
+    @classmethod
+    def from_json(cls, text: str) -> "SlottedRecord":
+        return cls.from_dict(json.loads(text))
+
+    @classmethod
+    def empty(cls) -> "SlottedRecord":
+        """Record dengan semua field terisi nilai kosong default"""
+        record = cls.__new__(cls)
+        for field in cls._fields:
+            default = cls._defaults.get(field, "")
+            if field in cls._nested:
+                default = cls._nested[field].empty()
+            elif isinstance(default, list):
+                default = []
+            setattr(record, field, default)
+        record.extra = None
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dict dengan bentuk yang sama seperti input from_dict"""
+        data = {
+            field: value.to_dict() if isinstance(value, SlottedRecord) else value
+            for field, value in zip(self._fields, self._getter(self)) if value is not _ABSENT
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key)
+        return default if value is _ABSENT else value
+
+    def _lookup(self, key: str) -> Any:
+        if key in self._field_set:
+            return getattr(self, key)
+        return self.extra.get(key, _ABSENT) if self.extra else _ABSENT
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._lookup(key)
+        if value is _ABSENT:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self._lookup(key) is not _ABSENT
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._getter(self) == self._getter(other) and self.extra == other.extra
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{field}={value!r}" for field, value in zip(self._fields, self._getter(self))
+                           if value is not _ABSENT)
+        return f"{type(self).__name__}({values})"
+
+
+def record_class(name: str, fields: Iterable[str], nested: Optional[Dict[str, type]] = None,
+                 defaults: Optional[Dict[str, Any]] = None, doc: str = "") -> type:
+    """Bangkitkan subclass SlottedRecord dengan satu slot per field"""
+    fields = tuple(fields)
+    getter = attrgetter(*fields)
+    return type(name, (SlottedRecord,), {
+        "__slots__": fields,
+        "__doc__": doc,
+        "_fields": fields,
+        "_field_set": frozenset(fields),
+        "_nested": dict(nested or {}),
+        "_defaults": dict(defaults or {}),
+        # attrgetter dengan satu field mengembalikan nilai, bukan tuple
+        "_getter": staticmethod(getter if len(fields) > 1 else lambda record: (getter(record),))
+    })
+
+
+DublinCoreRecord = record_class("DublinCoreRecord", DUBLIN_CORE_SCHEMA, doc="Section Dublin Core")
+
+IsadGRecord = record_class("IsadGRecord", ISAD_G_SCHEMA, doc="Section ISAD(G)")
+
+QualityMetricsRecord = record_class(
+    "QualityMetricsRecord", ("completeness_score", "richness_score"),
+    defaults={"completeness_score": 0.0, "richness_score": 0.0}, doc="Quality metrics hasil parse jawaban model"
+)
+
+MetadataRecord = record_class(
+    "MetadataRecord",
+    ("dublin_core", "isad_g", "confidence_score", "extraction_notes", "suggestions", "quality_metrics"),
+    nested={"dublin_core": DublinCoreRecord, "isad_g": IsadGRecord, "quality_metrics": QualityMetricsRecord},
+    # Struktur kosong agent tidak memuat extraction_notes
+    defaults={"confidence_score": 0.0, "extraction_notes": _ABSENT, "suggestions": []},
+    doc="Metadata satu dokumen (bentuk hasil extract_metadata_from_text)"
+)
+
+ValidationResultRecord = record_class(
+    "ValidationResultRecord",
+    ("is_valid", "completeness_score", "missing_fields", "invalid_fields", "warnings", "field_validations",
+     "recommendations"),
+    defaults={"is_valid": False, "completeness_score": 0.0, "missing_fields": [], "invalid_fields": [],
+              "warnings": [], "field_validations": _ABSENT, "recommendations": []},
+    doc="Hasil validasi satu record (ValidationEngine.validate / validate_many)"
+)
+
+SCHEMA_RECORDS = {
+    "dublin_core": DublinCoreRecord,
+    "isad_g": IsadGRecord
+}
+
+
+def metadata_records(items: Iterable[Dict[str, Any]]) -> List[SlottedRecord]:
+    """Konversi batch dict metadata menjadi MetadataRecord"""
+    from_dict = MetadataRecord.from_dict
+    return [from_dict(item) for item in items]
+
+
+def validation_records(columns: Dict[str, List[Any]]) -> Iterator[SlottedRecord]:
+    """Record per baris dari hasil kolumnar ValidationEngine.validate_many"""
+    names = [name for name in ValidationResultRecord._fields if name in columns]
+    for values in zip(*(columns[name] for name in names)):
+        record = ValidationResultRecord.__new__(ValidationResultRecord)
+        for field in ValidationResultRecord._fields:
+            setattr(record, field, _ABSENT)
+        for name, value in zip(names, values):
+            setattr(record, name, value)
+        record.extra = None
+        yield record
+
+
+def validation_columns(records: Iterable[SlottedRecord]) -> Dict[str, List[Any]]:
+    """Kebalikan validation_records: format kolumnar untuk save_validation_results"""
+    names = ("is_valid", "completeness_score", "missing_fields", "invalid_fields", "warnings")
+    columns: Dict[str, List[Any]] = {name: [] for name in names}
+    for record in records:
+        for name in names:
+            columns[name].append(record.get(name))
+    return columns
@@ -0,0 +1,361 @@
+"""
+Antrian review human-in-the-loop berprioritas
+
+Setiap record metadata yang belum direview masuk ke tabel review_queue dengan
+prioritas dari confidence rendah, kelengkapan rendah dan jumlah temuan
+inkonsistensi yang menyebut record tersebut. Index (status, priority,
+metadata_id) membuat pengambilan item berikutnya berupa satu seek index
+(O(log n)), bukan scan tabel. Reviewer mengklaim item secara atomik
+(BEGIN IMMEDIATE + lease), sehingga beberapa reviewer dapat bekerja paralel
+tanpa mengambil record yang sama; klaim yang lease-nya habis kembali ke
+antrian.
+
+sync() bersifat inkremental: hanya record, hasil validasi, feedback dan
+laporan inkonsistensi dengan id di atas watermark sebelumnya yang dibaca.
+Validasi yang datang setelah record masuk antrian memperbarui kelengkapan
+dan prioritasnya; feedback yang disimpan di luar antrian (mis. lewat
+MetadataDatabase.save_human_feedback) menandai item selesai.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import json
+import sqlite3
+import threading
+
+from database import MetadataDatabase
+
+# Status item antrian
+REVIEW_STATUSES = ("pending", "claimed", "done")
+
+# Lama klaim reviewer sebelum item dikembalikan ke antrian
+REVIEW_LEASE_SECONDS = 900
+
+# Bobot komponen prioritas (jumlah = 1)
+PRIORITY_WEIGHTS = {"confidence": 0.4, "completeness": 0.3, "inconsistencies": 0.3}
+
+# Jumlah temuan inkonsistensi yang dianggap maksimal untuk prioritas
+MAX_INCONSISTENCIES = 3
+
+SYNC_BATCH_SIZE = 5000
+
+
+def _now() -> str:
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
+
+
+def review_priority(confidence: Optional[float], completeness: Optional[float], inconsistencies: int = 0) -> float:
+    """Prioritas 0-1; nilai yang belum diketahui (None) dianggap 0 sehingga didahulukan"""
+    return round(
+        PRIORITY_WEIGHTS["confidence"] * (1 - (confidence or 0.0))
+        + PRIORITY_WEIGHTS["completeness"] * (1 - (completeness or 0.0))
+        + PRIORITY_WEIGHTS["inconsistencies"] * min(inconsistencies, MAX_INCONSISTENCIES) / MAX_INCONSISTENCIES,
+        6
+    )
+
+
+class ReviewQueue:
+    """Antrian review dengan prioritas terindeks dan klaim per reviewer"""
+
+    def __init__(self, db: MetadataDatabase, lease_seconds: int = REVIEW_LEASE_SECONDS):
+        self.db = db
+        self.db_path = db.db_path
+        self.lease_seconds = lease_seconds
+        self._sync_lock = threading.Lock()
+        self.init_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_tables(self):
+        """Buat tabel review_queue dan watermark sinkronisasinya"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS review_queue (
+                metadata_id INTEGER PRIMARY KEY,
+                priority REAL NOT NULL,
+                confidence_score REAL,
+                completeness_score REAL,
+                inconsistencies INTEGER DEFAULT 0,
+                status TEXT DEFAULT 'pending',
+                reviewer TEXT,
+                lease_expires TIMESTAMP,
+                updated_at TIMESTAMP,
+                FOREIGN KEY (metadata_id) REFERENCES metadata_records (id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS review_queue_state (
+                name TEXT PRIMARY KEY,
+                watermark INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        # Item berikutnya: seek ke status, lalu prioritas tertinggi
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_review_next ON review_queue (status, priority DESC, metadata_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_review_lease ON review_queue (status, lease_expires)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_review_reviewer ON review_queue (reviewer, status)")
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _watermark(cursor: sqlite3.Cursor, name: str) -> int:
+        cursor.execute("SELECT watermark FROM review_queue_state WHERE name = ?", (name,))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def sync(self) -> Dict[str, int]:
+        """Tambahkan record baru dan perbarui prioritas dari laporan inkonsistensi baru"""
+        with self._sync_lock:
+            conn = self._connect()
+            cursor = conn.cursor()
+            added = flagged = 0
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                watermark = self._watermark(cursor, "records")
+                while True:
+                    # Record tanpa feedback; kelengkapan dari hasil validasi terakhir
+                    cursor.execute('''
+                        SELECT mr.id, mr.confidence_score, mr.latest_completeness,
+                               EXISTS (SELECT 1 FROM human_feedback hf WHERE hf.metadata_id = mr.id)
+                        FROM metadata_records mr
+                        WHERE mr.id > ?
+                        ORDER BY mr.id
+                        LIMIT ?
+                    ''', (watermark, SYNC_BATCH_SIZE))
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+                    now = _now()
+                    cursor.executemany('''
+                        INSERT OR IGNORE INTO review_queue
+                        (metadata_id, priority, confidence_score, completeness_score, status, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', [
+                        (record_id, review_priority(confidence, completeness), confidence, completeness,
+                         "done" if reviewed else "pending", now)
+                        for record_id, confidence, completeness, reviewed in rows
+                    ])
+                    added += sum(1 for row in rows if not row[3])
+                    watermark = rows[-1][0]
+                cursor.execute("INSERT OR REPLACE INTO review_queue_state (name, watermark) VALUES ('records', ?)",
+                               (watermark,))
+                rescored = self._sync_validations(cursor)
+                reviewed = self._sync_feedback(cursor)
+
+                report_watermark = self._watermark(cursor, "reports")
+                cursor.execute("SELECT id, metadata_ids FROM inconsistency_reports WHERE id > ? ORDER BY id",
+                               (report_watermark,))
+                counts: Dict[int, int] = {}
+                for report_id, metadata_ids in cursor.fetchall():
+                    for metadata_id in json.loads(metadata_ids or "[]"):
+                        counts[metadata_id] = counts.get(metadata_id, 0) + 1
+                    report_watermark = report_id
+                if counts:
+                    flagged = self._add_inconsistencies(cursor, counts)
+                cursor.execute("INSERT OR REPLACE INTO review_queue_state (name, watermark) VALUES ('reports', ?)",
+                               (report_watermark,))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+            return {"added": added, "flagged": flagged, "rescored": rescored, "reviewed": reviewed}
+
+    def _sync_validations(self, cursor: sqlite3.Cursor) -> int:
+        """Perbarui kelengkapan dan prioritas dari hasil validasi baru"""
+        watermark = self._watermark(cursor, "validations")
+        rescored = 0
+        while True:
+            cursor.execute('''
+                SELECT id, metadata_id, completeness_score FROM validation_results WHERE id > ? ORDER BY id LIMIT ?
+            ''', (watermark, SYNC_BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            # Hasil terakhir per record menang
+            completeness = {metadata_id: score for _, metadata_id, score in rows}
+            ids = list(completeness)
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor.execute(f'''
+                    SELECT metadata_id, confidence_score, inconsistencies
+                    FROM review_queue WHERE metadata_id IN ({placeholders}) AND status != 'done'
+                ''', chunk)
+                updates = [
+                    (completeness[metadata_id],
+                     review_priority(confidence, completeness[metadata_id], inconsistencies), metadata_id)
+                    for metadata_id, confidence, inconsistencies in cursor.fetchall()
+                ]
+                cursor.executemany("UPDATE review_queue SET completeness_score = ?, priority = ? WHERE metadata_id = ?",
+                                   updates)
+                rescored += len(updates)
+            watermark = rows[-1][0]
+        cursor.execute("INSERT OR REPLACE INTO review_queue_state (name, watermark) VALUES ('validations', ?)",
+                       (watermark,))
+        return rescored
+
+    def _sync_feedback(self, cursor: sqlite3.Cursor) -> int:
+        """Tandai selesai item yang mendapat feedback di luar antrian"""
+        watermark = self._watermark(cursor, "feedback")
+        cursor.execute("SELECT COALESCE(MAX(id), ?) FROM human_feedback", (watermark,))
+        latest = cursor.fetchone()[0]
+        reviewed = 0
+        if latest > watermark:
+            cursor.execute('''
+                UPDATE review_queue SET status = 'done', lease_expires = NULL, updated_at = ?
+                WHERE status != 'done' AND metadata_id IN (
+                    SELECT metadata_id FROM human_feedback WHERE id > ? AND id <= ?
+                )
+            ''', (_now(), watermark, latest))
+            reviewed = cursor.rowcount
+        cursor.execute("INSERT OR REPLACE INTO review_queue_state (name, watermark) VALUES ('feedback', ?)", (latest,))
+        return reviewed
+
+    @staticmethod
+    def _add_inconsistencies(cursor: sqlite3.Cursor, counts: Dict[int, int]) -> int:
+        ids = list(counts)
+        flagged = 0
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor.execute(f'''
+                SELECT metadata_id, confidence_score, completeness_score, inconsistencies
+                FROM review_queue WHERE metadata_id IN ({placeholders}) AND status != 'done'
+            ''', chunk)
+            updates = []
+            for metadata_id, confidence, completeness, inconsistencies in cursor.fetchall():
+                total = inconsistencies + counts[metadata_id]
+                updates.append((total, review_priority(confidence, completeness, total), metadata_id))
+            cursor.executemany("UPDATE review_queue SET inconsistencies = ?, priority = ? WHERE metadata_id = ?",
+                               updates)
+            flagged += len(updates)
+        return flagged
+
+    def claim(self, reviewer: str) -> Optional[int]:
+        """Klaim record berprioritas tertinggi untuk reviewer; klaim aktif reviewer dipakai ulang"""
+        now = _now()
+        lease = (datetime.now() + timedelta(seconds=self.lease_seconds)).isoformat(sep=" ", timespec="seconds")
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute('''
+                SELECT metadata_id FROM review_queue
+                WHERE reviewer = ? AND status = 'claimed' AND lease_expires >= ?
+                ORDER BY priority DESC LIMIT 1
+            ''', (reviewer, now))
+            row = cursor.fetchone()
+            if row is None:
+                # Lease kedaluwarsa kembali ke antrian sebelum memilih item
+                cursor.execute('''
+                    UPDATE review_queue SET status = 'pending', reviewer = NULL, lease_expires = NULL
+                    WHERE status = 'claimed' AND lease_expires < ?
+                ''', (now,))
+                cursor.execute('''
+                    SELECT metadata_id FROM review_queue
+                    WHERE status = 'pending'
+                    ORDER BY priority DESC, metadata_id
+                    LIMIT 1
+                ''')
+                row = cursor.fetchone()
+            if row is None:
+                conn.rollback()
+                return None
+            cursor.execute('''
+                UPDATE review_queue SET status = 'claimed', reviewer = ?, lease_expires = ?, updated_at = ?
+                WHERE metadata_id = ?
+            ''', (reviewer, lease, now, row[0]))
+            conn.commit()
+            return row[0]
+        finally:
+            conn.close()
+
+    def release(self, metadata_id: int, reviewer: str) -> bool:
+        """Kembalikan klaim reviewer ke antrian"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE review_queue SET status = 'pending', reviewer = NULL, lease_expires = NULL, updated_at = ?
+            WHERE metadata_id = ? AND reviewer = ? AND status = 'claimed'
+        ''', (_now(), metadata_id, reviewer))
+        released = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return released
+
+    def complete(self, metadata_id: int, reviewer: str, validation_status: str, feedback: str = "") -> bool:
+        """Simpan feedback dan tandai item selesai; False jika klaim sudah tidak dimiliki reviewer"""
+        now = _now()
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute('''
+                UPDATE review_queue SET status = 'done', lease_expires = NULL, updated_at = ?
+                WHERE metadata_id = ? AND reviewer = ? AND status = 'claimed'
+            ''', (now, metadata_id, reviewer))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return False
+            cursor.execute('''
+                INSERT INTO human_feedback (metadata_id, validation_status, feedback, user_id)
+                VALUES (?, ?, ?, ?)
+            ''', (metadata_id, validation_status, feedback, reviewer))
+            conn.commit()
+        finally:
+            conn.close()
+        self.db.bump_data_version("human_feedback")
+        return True
+
+    def mark_reviewed(self, metadata_id: int):
+        """Keluarkan record dari antrian (feedback disimpan di luar antrian)"""
+        conn = self._connect()
+        conn.execute("UPDATE review_queue SET status = 'done', lease_expires = NULL, updated_at = ? WHERE metadata_id = ?",
+                     (_now(), metadata_id))
+        conn.commit()
+        conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Jumlah item per status dan klaim aktif per reviewer"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT status, COUNT(*) FROM review_queue GROUP BY status")
+        counts = {status: 0 for status in REVIEW_STATUSES}
+        counts.update(dict(cursor.fetchall()))
+        cursor.execute('''
+            SELECT reviewer, COUNT(*) FROM review_queue
+            WHERE status = 'claimed' AND lease_expires >= ? GROUP BY reviewer
+        ''', (_now(),))
+        counts["reviewers"] = dict(cursor.fetchall())
+        conn.close()
+        return counts
+
+    def peek(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Item pending dengan prioritas tertinggi (tanpa klaim)"""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT metadata_id, priority, confidence_score, completeness_score, inconsistencies
+            FROM review_queue WHERE status = 'pending'
+            ORDER BY priority DESC, metadata_id LIMIT ?
+        ''', (limit,))
+        items = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return items
+
+
+_QUEUES: Dict[str, ReviewQueue] = {}
+_QUEUES_LOCK = threading.Lock()
+
+
+def get_review_queue(db: MetadataDatabase) -> ReviewQueue:
+    """Antrian review bersama per file database"""
+    with _QUEUES_LOCK:
+        queue = _QUEUES.get(db.db_path)
+        if queue is None:
+            queue = _QUEUES[db.db_path] = ReviewQueue(db)
+        return queue
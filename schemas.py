@@ -0,0 +1,54 @@
+"""
+Definisi skema metadata standar (Dublin Core dan ISAD(G))
+
+Dipakai bersama oleh agent, validation engine dan quality metrics agar daftar
+field tidak diduplikasi di setiap modul.
+"""
+
+DUBLIN_CORE_SCHEMA = {
+    "title": "Judul dokumen",
+    "creator": "Pembuat/Penulis",
+    "subject": "Subjek/Topik",
+    "description": "Deskripsi konten",
+    "publisher": "Penerbit",
+    "contributor": "Kontributor",
+    "date": "Tanggal pembuatan/publikasi",
+    "type": "Jenis dokumen",
+    "format": "Format file",
+    "identifier": "Identifikator unik",
+    "source": "Sumber asal",
+    "language": "Bahasa",
+    "relation": "Relasi dengan dokumen lain",
+    "coverage": "Cakupan geografis/temporal",
+    "rights": "Hak cipta/akses"
+}
+
+ISAD_G_SCHEMA = {
+    "reference_code": "Kode referensi",
+    "title": "Judul",
+    "date": "Tanggal",
+    "level_of_description": "Tingkat deskripsi",
+    "extent_and_medium": "Jumlah dan media",
+    "name_of_creator": "Nama pembuat",
+    "scope_and_content": "Ruang lingkup dan isi",
+    "conditions_of_access": "Kondisi akses",
+    "conditions_of_reproduction": "Kondisi reproduksi",
+    "language_of_material": "Bahasa materi",
+    "physical_characteristics": "Karakteristik fisik",
+    "finding_aids": "Alat bantu pencarian",
+    "location_of_originals": "Lokasi asli",
+    "availability_of_copies": "Ketersediaan salinan",
+    "related_units": "Unit terkait",
+    "publication_note": "Catatan publikasi",
+    "notes": "Catatan umum"
+}
+
+SCHEMAS = {
+    "dublin_core": DUBLIN_CORE_SCHEMA,
+    "isad_g": ISAD_G_SCHEMA
+}
+
+
+def get_schema(schema_type: str) -> dict:
+    """Ambil definisi skema; selain 'dublin_core' dianggap ISAD(G) seperti di agent"""
+    return DUBLIN_CORE_SCHEMA if schema_type == "dublin_core" else ISAD_G_SCHEMA
@@ -0,0 +1,248 @@
+"""
+Shard SQLite per proses untuk ingest paralel
+
+Pada mode sharded setiap proses worker menulis ke file database sendiri
+(skema sama dengan MetadataDatabase), sehingga penulisan tidak lagi dibatasi
+satu writer SQLite. Setelah ingest, merge_shards() melipat setiap shard ke
+database utama dalam satu transaksi per shard: id metadata_records digeser
+dengan offset di atas id tertinggi database utama (urutan id tetap naik,
+sehingga watermark indeks kemiripan dan antrian review tetap berlaku) dan
+foreign key di validation_results, human_feedback serta ingested_files ikut
+dipetakan. File yang hash-nya sudah ada di database utama dilewati beserta
+baris turunannya. Setiap shard memiliki shard_id yang dicatat di
+shard_merges, sehingga merge ulang setelah crash tidak menggandakan data.
+
+ShardedReader membaca database utama dan shard yang belum di-merge sekaligus
+lewat ATTACH DATABASE.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import os
+import sqlite3
+import uuid
+
+from database import MetadataDatabase
+from usage_ledger import UsageLedger
+
+# Batas ATTACH bawaan SQLite (SQLITE_MAX_ATTACHED)
+MAX_ATTACHED_SHARDS = 10
+
+# Tabel yang disalin saat merge beserta kolom id record yang dipetakan
+REMAPPED_TABLES = (
+    ("metadata_records", "id"),
+    ("validation_results", "metadata_id"),
+    ("human_feedback", "metadata_id"),
+    ("ingested_files", "metadata_id")
+)
+
+# Tabel tanpa referensi record yang disalin apa adanya (tanpa kolom id)
+COPIED_TABLES = ("model_calls",)
+
+
+def shard_path(db_path: str, index: int) -> str:
+    """Path shard ke-index di samping database utama, mis. metadata.shard-0.db"""
+    path = Path(db_path)
+    return str(path.with_name(f"{path.stem}.shard-{index}{path.suffix or '.db'}"))
+
+
+def find_shards(db_path: str) -> List[str]:
+    """Shard yang ada di samping database utama, urut menurut index"""
+    path = Path(db_path)
+    shards = path.parent.glob(f"{path.stem}.shard-*{path.suffix or '.db'}")
+    return sorted((str(shard) for shard in shards), key=lambda name: int(name.rsplit("shard-", 1)[1].split(".")[0]))
+
+
+def init_shard(path: str) -> MetadataDatabase:
+    """Buat (atau buka) shard dengan skema database utama dan shard_id unik"""
+    db = MetadataDatabase(path)
+    UsageLedger.init_tables(path)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS shard_info (shard_id TEXT PRIMARY KEY, created_at TIMESTAMP)")
+    if conn.execute("SELECT COUNT(*) FROM shard_info").fetchone()[0] == 0:
+        conn.execute("INSERT INTO shard_info (shard_id, created_at) VALUES (?, ?)",
+                     (uuid.uuid4().hex, datetime.now().isoformat(sep=" ", timespec="seconds")))
+    conn.commit()
+    conn.close()
+    return db
+
+
+def _columns(cursor: sqlite3.Cursor, schema: str, table: str) -> List[str]:
+    cursor.execute(f"PRAGMA {schema}.table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def merge_shard(db: MetadataDatabase, path: str) -> Dict[str, Any]:
+    """Lipat satu shard ke database utama dalam satu transaksi"""
+    UsageLedger.init_tables(db.db_path)
+    conn = sqlite3.connect(db.db_path, timeout=30)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS shard_merges (
+            shard_id TEXT PRIMARY KEY,
+            shard_path TEXT,
+            records INTEGER,
+            skipped INTEGER,
+            merged_at TIMESTAMP
+        )
+    ''')
+    conn.commit()
+    cursor.execute("ATTACH DATABASE ? AS shard", (path,))
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT shard_id FROM shard.shard_info")
+        shard_id = cursor.fetchone()[0]
+        cursor.execute("SELECT records, skipped FROM main.shard_merges WHERE shard_id = ?", (shard_id,))
+        previous = cursor.fetchone()
+        if previous is not None:
+            conn.rollback()
+            return {"shard": path, "records": previous[0], "skipped": previous[1], "already_merged": True}
+
+        # Offset di atas id tertinggi yang pernah dipakai (termasuk record terhapus)
+        cursor.execute('''
+            SELECT MAX(COALESCE((SELECT MAX(id) FROM main.metadata_records), 0),
+                       COALESCE((SELECT seq FROM main.sqlite_sequence WHERE name = 'metadata_records'), 0))
+        ''')
+        offset = cursor.fetchone()[0]
+
+        # Record dari file yang sudah ada di database utama tidak disalin
+        cursor.execute("DROP TABLE IF EXISTS temp.merge_skip")
+        cursor.execute('''
+            CREATE TEMP TABLE merge_skip AS
+            SELECT sf.metadata_id FROM shard.ingested_files sf
+            JOIN main.ingested_files mf ON mf.file_hash = sf.file_hash
+        ''')
+        cursor.execute("SELECT COUNT(*) FROM temp.merge_skip")
+        skipped = cursor.fetchone()[0]
+
+        counts: Dict[str, int] = {}
+        for table, record_column in REMAPPED_TABLES:
+            main_columns = set(_columns(cursor, "main", table))
+            columns = [column for column in _columns(cursor, "shard", table)
+                       if column in main_columns and (column != "id" or record_column == "id")]
+            select = ", ".join(f"{column} + ?" if column == record_column else column for column in columns)
+            cursor.execute(f'''
+                INSERT INTO main.{table} ({", ".join(columns)})
+                SELECT {select} FROM shard.{table}
+                WHERE {record_column} NOT IN (SELECT metadata_id FROM temp.merge_skip)
+                ORDER BY rowid
+            ''', (offset,))
+            counts[table] = cursor.rowcount
+
+        for table in COPIED_TABLES:
+            main_columns = set(_columns(cursor, "main", table))
+            columns = [column for column in _columns(cursor, "shard", table)
+                       if column in main_columns and column != "id"]
+            if columns:
+                cursor.execute(f'''
+                    INSERT INTO main.{table} ({", ".join(columns)})
+                    SELECT {", ".join(columns)} FROM shard.{table} ORDER BY rowid
+                ''')
+                counts[table] = cursor.rowcount
+
+        cursor.execute('''
+            INSERT INTO main.shard_merges (shard_id, shard_path, records, skipped, merged_at) VALUES (?, ?, ?, ?, ?)
+        ''', (shard_id, path, counts["metadata_records"], skipped,
+              datetime.now().isoformat(sep=" ", timespec="seconds")))
+        cursor.execute("DROP TABLE temp.merge_skip")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("DETACH DATABASE shard")
+        conn.close()
+
+    db.bump_data_version("metadata_records", "validation_results", "human_feedback")
+    return {"shard": path, "records": counts["metadata_records"], "skipped": skipped, "rows": counts,
+            "id_offset": offset, "already_merged": False}
+
+
+def merge_shards(db: MetadataDatabase, paths: Sequence[str], remove: bool = False) -> List[Dict[str, Any]]:
+    """Merge shard satu per satu; dengan remove=True file shard dihapus setelah tercatat di shard_merges"""
+    results = []
+    for path in paths:
+        results.append(merge_shard(db, path))
+        if remove:
+            for suffix in ("", "-wal", "-shm", "-journal"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+    return results
+
+
+class ShardedReader:
+    """Query baca atas database utama dan shard lewat ATTACH DATABASE
+
+    Hasil membawa kolom source ("main" atau "shard0", "shard1", ...) karena id
+    record di shard bersifat lokal sampai shard di-merge.
+    """
+
+    def __init__(self, db_path: str, shard_paths: Sequence[str]):
+        if len(shard_paths) > MAX_ATTACHED_SHARDS:
+            raise ValueError(f"At most {MAX_ATTACHED_SHARDS} shards can be attached, got {len(shard_paths)}")
+        self.db_path = db_path
+        self.shard_paths = list(shard_paths)
+        self.schemas = ["main"] + [f"shard{index}" for index in range(len(self.shard_paths))]
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        for schema, path in zip(self.schemas[1:], self.shard_paths):
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+        return conn
+
+    def union_query(self, select_sql: str, params: Sequence[Any] = (), order_by: str = "",
+                    limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Jalankan select_sql ({db} diganti nama skema) di semua database, digabung UNION ALL"""
+        parts = [f"SELECT '{schema}' AS source, * FROM ({select_sql.format(db=schema)})" for schema in self.schemas]
+        sql = " UNION ALL ".join(parts)
+        all_params = list(params) * len(self.schemas)
+        if order_by:
+            sql = f"SELECT * FROM ({sql}) ORDER BY {order_by}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            all_params.append(limit)
+        conn = self._connect()
+        try:
+            return [dict(row) for row in conn.execute(sql, all_params).fetchall()]
+        finally:
+            conn.close()
+
+    def count_records(self) -> Dict[str, int]:
+        """Jumlah record metadata per database"""
+        rows = self.union_query("SELECT COUNT(*) AS records FROM {db}.metadata_records")
+        return {row["source"]: row["records"] for row in rows}
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Total record dan rata-rata confidence/completeness atas semua database"""
+        records = self.union_query('''
+            SELECT COUNT(*) AS records, SUM(confidence_score) AS confidence_sum FROM {db}.metadata_records
+        ''')
+        validations = self.union_query('''
+            SELECT COUNT(*) AS validations, SUM(completeness_score) AS completeness_sum FROM {db}.validation_results
+        ''')
+        total = sum(row["records"] for row in records)
+        total_validations = sum(row["validations"] for row in validations)
+        return {
+            "total_records": total,
+            "records_by_source": {row["source"]: row["records"] for row in records},
+            "average_confidence": sum(row["confidence_sum"] or 0 for row in records) / total if total else 0.0,
+            "average_completeness": (
+                sum(row["completeness_sum"] or 0 for row in validations) / total_validations
+                if total_validations else 0.0
+            )
+        }
+
+    def get_recent_records(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Record terbaru dari semua database"""
+        return self.union_query('''
+            SELECT id, file_name, schema_type, confidence_score, created_at FROM {db}.metadata_records
+            ORDER BY created_at DESC, id DESC LIMIT ?
+        ''', [limit], order_by="created_at DESC, id DESC", limit=limit)
+
+    def find_ingested_file(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Lokasi (source, metadata_id) file berdasarkan hash di database mana pun"""
+        rows = self.union_query("SELECT metadata_id, file_name FROM {db}.ingested_files WHERE file_hash = ?",
+                                [file_hash], limit=1)
+        return rows[0] if rows else None
@@ -0,0 +1,196 @@
+"""
+Indeks BM25 untuk pencarian record metadata serupa
+
+Inverted index in-memory atas field Dublin Core: setiap term menyimpan
+posting list {id record: bobot tf}. Record baru ditambahkan secara
+inkremental (sync membaca record di atas watermark lewat
+iter_metadata_sections), sehingga query top-k hanya menyentuh posting list
+term yang ada di query dan selesai dalam hitungan milidetik.
+"""
+
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Tuple
+import heapq
+import math
+import re
+import threading
+import time
+
+from database import CACHE_TTL_SECONDS, MetadataDatabase
+
+# Bobot field saat menghitung term frequency
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "subject": 2.0,
+    "creator": 2.0,
+    "description": 1.0,
+    "coverage": 1.0,
+    "publisher": 1.0,
+    "type": 1.0,
+    "relation": 0.5
+}
+
+# Parameter BM25
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Term yang muncul di lebih dari proporsi ini tidak ikut di-scoring saat query
+MAX_DOCUMENT_FREQUENCY = 0.5
+
+STOPWORDS = frozenset("""
+dan atau yang di ke dari untuk dengan pada dalam oleh ini itu adalah sebagai tentang tahun
+the of and or to in on for by with from a an is are as at this that
+""".split())
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Pecah teks menjadi term lowercase tanpa stopword"""
+    return [
+        token for token in _TOKEN_PATTERN.findall(str(text).lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def weighted_terms(section: Dict[str, Any]) -> Counter:
+    """Term frequency berbobot field dari section Dublin Core"""
+    terms: Counter = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        value = section.get(field)
+        if value:
+            for token in tokenize(value):
+                terms[token] += weight
+    return terms
+
+
+def field_consensus(section: Dict[str, Any], neighbours: List[Dict[str, Any]], fields: Iterable[str],
+                    min_support: float = 0.5) -> Dict[str, Dict[str, Any]]:
+    """Nilai pre-fill untuk field kosong yang disepakati mayoritas record serupa
+
+    Mengembalikan {field: {"value", "support"}} dengan support = proporsi
+    tetangga yang memakai nilai tersebut (hanya jika >= min_support).
+    """
+    suggestions = {}
+    if not neighbours:
+        return suggestions
+    for field in fields:
+        if section.get(field):
+            continue
+        values = Counter(str(neighbour[field]).strip() for neighbour in neighbours if neighbour.get(field))
+        if not values:
+            continue
+        value, count = values.most_common(1)[0]
+        support = count / len(neighbours)
+        if support >= min_support:
+            suggestions[field] = {"value": value, "support": round(support, 2)}
+    return suggestions
+
+
+class SimilarityIndex:
+    """Inverted index BM25 dengan penambahan/penghapusan record inkremental"""
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.doc_lengths: Dict[int, float] = {}
+        self.doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self.total_length = 0.0
+        self.watermark = 0
+        self._synced_version: Tuple[int, ...] = ()
+        self._synced_until = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, record_id: int, section: Dict[str, Any]):
+        """Tambahkan atau perbarui satu record"""
+        terms = weighted_terms(section)
+        with self._lock:
+            if record_id in self.doc_lengths:
+                self.remove(record_id)
+            for term, weight in terms.items():
+                self.postings[term][record_id] = weight
+            length = sum(terms.values())
+            self.doc_lengths[record_id] = length
+            self.doc_terms[record_id] = tuple(terms)
+            self.total_length += length
+
+    def remove(self, record_id: int):
+        """Hapus record dari indeks (no-op jika tidak ada)"""
+        with self._lock:
+            if record_id not in self.doc_lengths:
+                return
+            for term in self.doc_terms.pop(record_id):
+                posting = self.postings[term]
+                posting.pop(record_id, None)
+                if not posting:
+                    del self.postings[term]
+            self.total_length -= self.doc_lengths.pop(record_id)
+
+    def sync(self, db: MetadataDatabase, batch_size: int = 10000, force: bool = False) -> int:
+        """Indeks record baru di database sejak sync terakhir; kembalikan jumlahnya
+
+        Tanpa query bila versi data metadata_records belum berubah sejak sync
+        terakhir; seperti cache query, penulisan dari proses lain terlihat
+        paling lambat setelah CACHE_TTL_SECONDS.
+        """
+        added = 0
+        with self._lock:
+            # Versi dibaca sebelum query sehingga penulisan di antaranya memicu sync berikutnya
+            version = db.data_version("metadata_records")
+            if not force and version == self._synced_version and time.monotonic() < self._synced_until:
+                return 0
+            for batch in db.iter_metadata_sections("dublin_core", batch_size, after_id=self.watermark):
+                for section in batch:
+                    self.add(section["id"], section)
+                added += len(batch)
+                self.watermark = batch[-1]["id"]
+            self._synced_version = version
+            self._synced_until = time.monotonic() + CACHE_TTL_SECONDS
+        return added
+
+    def search(self, query: Any, k: int = 5, exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """Top-k record paling mirip sebagai list (id, skor BM25)
+
+        query dapat berupa section Dublin Core (dict) atau teks bebas.
+        """
+        terms = weighted_terms(query) if isinstance(query, dict) else Counter(tokenize(query))
+        excluded = set(exclude)
+        with self._lock:
+            count = len(self.doc_lengths)
+            if not count or not terms:
+                return []
+            average_length = self.total_length / count or 1.0
+            max_frequency = max(1, int(MAX_DOCUMENT_FREQUENCY * count)) if count > 10 else count
+
+            scores: Dict[int, float] = defaultdict(float)
+            for term, query_weight in terms.items():
+                posting = self.postings.get(term)
+                if not posting or len(posting) > max_frequency:
+                    continue
+                frequency = len(posting)
+                idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+                for record_id, weight in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[record_id] / average_length)
+                    scores[record_id] += query_weight * idf * weight * (self.k1 + 1) / (weight + norm)
+
+        for record_id in excluded:
+            scores.pop(record_id, None)
+        return [(record_id, round(score, 4)) for record_id, score in heapq.nlargest(k, scores.items(), key=lambda item: item[1])]
+
+
+_INDEXES: Dict[str, SimilarityIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_index(db: MetadataDatabase) -> SimilarityIndex:
+    """Indeks bersama per file database, disinkronkan dengan record terbaru"""
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(db.db_path)
+        if index is None:
+            index = _INDEXES[db.db_path] = SimilarityIndex()
+    index.sync(db)
+    return index
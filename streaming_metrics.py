@@ -0,0 +1,316 @@
+"""
+Metrik konsistensi streaming dengan memori terbatas
+
+Accumulator membaca record satu per satu (atau per chunk dari generator)
+dan hanya menyimpan histogram format per field serta sketch probabilistik:
+HyperLogLog untuk perkiraan jumlah nilai unik dan Count-Min Sketch untuk
+perkiraan frekuensi. Memori konstan terhadap jumlah record, dan accumulator
+parsial dapat digabung (merge) sehingga konsistensi bisa dihitung per shard
+secara paralel lalu disatukan.
+"""
+
+from array import array
+from collections import Counter
+from hashlib import blake2b
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import math
+
+from languages import normalize_language
+from utils import MetadataValidator
+
+# Ukuran chunk saat mengonsumsi generator record
+ACCUMULATOR_CHUNK_SIZE = 10000
+
+
+def _hash64(value: str) -> Tuple[int, int]:
+    """Dua hash 64-bit independen dari satu digest blake2b"""
+    digest = blake2b(value.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+class HyperLogLog:
+    """Perkiraan jumlah nilai unik dengan 2^precision register (galat ~1.04/sqrt(m))"""
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: str):
+        """Tambahkan satu nilai"""
+        self.add_hash(_hash64(value)[0])
+
+    def add_hash(self, hashed: int):
+        """Tambahkan nilai yang sudah di-hash (64-bit)"""
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Gabungkan sketch lain (register-wise max)"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> float:
+        """Perkiraan jumlah nilai unik"""
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # Linear counting untuk kardinalitas kecil
+            return size * math.log(size / zeros)
+        return estimate
+
+
+class CountMinSketch:
+    """Perkiraan frekuensi nilai (overestimate maksimal ~ e/width * total)"""
+
+    def __init__(self, width: int = 8192, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.counters = array("Q", bytes(8 * width * depth))
+        self.total = 0
+
+    def _indexes(self, hashes: Tuple[int, int]) -> List[int]:
+        first, second = hashes
+        return [row * self.width + (first + row * second) % self.width for row in range(self.depth)]
+
+    def add(self, value: str, count: int = 1) -> int:
+        """Tambahkan nilai dan kembalikan perkiraan frekuensi terbarunya"""
+        return self.add_hashes(_hash64(value), count)
+
+    def add_hashes(self, hashes: Tuple[int, int], count: int = 1) -> int:
+        """Tambahkan nilai yang sudah di-hash; kembalikan perkiraan frekuensinya"""
+        counters = self.counters
+        estimate = None
+        for index in self._indexes(hashes):
+            counters[index] += count
+            estimate = counters[index] if estimate is None else min(estimate, counters[index])
+        self.total += count
+        return estimate or 0
+
+    def estimate(self, value: str) -> int:
+        """Perkiraan frekuensi suatu nilai"""
+        return min(self.counters[index] for index in self._indexes(_hash64(value)))
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        """Gabungkan sketch lain dengan ukuran yang sama"""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge CountMinSketch with different dimensions")
+        self.counters = array("Q", map(sum, zip(self.counters, other.counters)))
+        self.total += other.total
+        return self
+
+
+class FieldStatistics:
+    """Statistik streaming untuk satu field: histogram format, HLL, CMS dan top-k"""
+
+    def __init__(self, precision: int = 12, width: int = 8192, depth: int = 4, top_k: int = 20):
+        self.count = 0
+        self.formats: Counter = Counter()
+        self.distinct = HyperLogLog(precision)
+        self.frequencies = CountMinSketch(width, depth)
+        self.top_k = top_k
+        self.heavy_hitters: Dict[str, int] = {}
+
+    def add(self, value: str, value_format: str, count: int = 1):
+        """Catat nilai (sudah dinormalisasi) sebanyak count beserta kategori formatnya"""
+        hashes = _hash64(value)
+        self.count += count
+        self.formats[value_format] += count
+        self.distinct.add_hash(hashes[0])
+        self._track(value, self.frequencies.add_hashes(hashes, count))
+
+    def _track(self, value: str, estimate: int):
+        """Pertahankan maksimal top_k kandidat nilai paling sering"""
+        if value in self.heavy_hitters or len(self.heavy_hitters) < self.top_k:
+            self.heavy_hitters[value] = estimate
+            return
+        weakest = min(self.heavy_hitters, key=self.heavy_hitters.get)
+        if estimate > self.heavy_hitters[weakest]:
+            del self.heavy_hitters[weakest]
+            self.heavy_hitters[value] = estimate
+
+    def merge(self, other: "FieldStatistics") -> "FieldStatistics":
+        """Gabungkan statistik field dari accumulator lain"""
+        self.count += other.count
+        self.formats.update(other.formats)
+        self.distinct.merge(other.distinct)
+        self.frequencies.merge(other.frequencies)
+        candidates = set(self.heavy_hitters) | set(other.heavy_hitters)
+        ranked = sorted(((self.frequencies.estimate(value), value) for value in candidates), reverse=True)
+        self.heavy_hitters = {value: estimate for estimate, value in ranked[:self.top_k]}
+        return self
+
+    def to_state(self) -> Dict[str, Any]:
+        """State yang dapat disimpan (sketch sebagai bytes)"""
+        return {
+            "count": self.count,
+            "formats": dict(self.formats),
+            "top_values": dict(self.heavy_hitters),
+            "distinct_sketch": bytes(self.distinct.registers),
+            "frequency_sketch": self.frequencies.counters.tobytes(),
+            "frequency_total": self.frequencies.total
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> "FieldStatistics":
+        """Pulihkan state dari to_state; ukuran sketch harus sama"""
+        registers = bytearray(state["distinct_sketch"])
+        counters = array("Q")
+        counters.frombytes(state["frequency_sketch"])
+        if len(registers) != len(self.distinct.registers) or len(counters) != len(self.frequencies.counters):
+            raise ValueError("Stored sketch dimensions do not match FieldStatistics configuration")
+        self.count = state["count"]
+        self.formats = Counter(state["formats"])
+        self.heavy_hitters = dict(state["top_values"])
+        self.distinct.registers = registers
+        self.frequencies.counters = counters
+        self.frequencies.total = state["frequency_total"]
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        """Ringkasan statistik field"""
+        return {
+            "count": self.count,
+            "formats": dict(self.formats),
+            "distinct_estimate": round(self.distinct.count()) if self.count else 0,
+            "top_values": sorted(self.heavy_hitters.items(), key=lambda item: item[1], reverse=True)
+        }
+
+
+def _language_form(value: str) -> str:
+    """Kategori penulisan bahasa: kode ISO kanonik, alias/nama, atau tidak dikenal"""
+    info = normalize_language(value)
+    if info is None:
+        return "unknown"
+    return "iso_code" if value == info.code else "alias"
+
+
+def _creator_form(value: str) -> str:
+    """Kategori penulisan creator berdasarkan validator creator"""
+    suggestions = MetadataValidator.validate_creator_format(value)["suggestions"]
+    if any("organization" in suggestion for suggestion in suggestions):
+        return "organization"
+    if any("capitalization" in suggestion for suggestion in suggestions):
+        return "lowercase"
+    if any("full name" in suggestion for suggestion in suggestions):
+        return "single_token"
+    return "name"
+
+
+class ConsistencyAccumulator:
+    """Accumulator online untuk skor konsistensi batch metadata yang sangat besar"""
+
+    FIELDS = ("date", "language", "creator")
+
+    def __init__(self, precision: int = 12, width: int = 8192, depth: int = 4, top_k: int = 20):
+        self.records = 0
+        self.fields = {
+            field: FieldStatistics(precision, width, depth, top_k) for field in self.FIELDS
+        }
+        # Memo kategori format terbatas agar memori tetap konstan
+        self._form_cache: Dict[Tuple[str, str], str] = {}
+
+    def update(self, metadata: Dict[str, Any]):
+        """Konsumsi satu record metadata (section Dublin Core)"""
+        self.update_many([metadata])
+
+    def update_many(self, records: Iterable[Dict[str, Any]], chunk_size: int = ACCUMULATOR_CHUNK_SIZE) -> "ConsistencyAccumulator":
+        """Konsumsi record dari iterable/generator per chunk"""
+        iterator = iter(records)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return self
+            self.records += len(chunk)
+            self._update_chunk(chunk)
+
+    def _update_chunk(self, chunk: List[Dict[str, Any]]):
+        values = {field: Counter() for field in self.FIELDS}
+        for metadata in chunk:
+            for field in self.FIELDS:
+                value = metadata.get(field, "")
+                if value:
+                    values[field][str(value)] += 1
+
+        # Nilai berulang dalam satu chunk di-hash dan dikategorikan sekali saja
+        if values["date"]:
+            dates = list(values["date"])
+            for value, date_format in zip(dates, self.value_formats("date", dates)):
+                self.fields["date"].add(value.strip(), date_format, values["date"][value])
+
+        for value, count in values["language"].items():
+            self.fields["language"].add(value.lower(), self._form("language", value.strip()), count)
+
+        for value, count in values["creator"].items():
+            self.fields["creator"].add(value.strip(), self._form("creator", value), count)
+
+    def value_formats(self, field: str, values: List[str]) -> List[str]:
+        """Kategori format setiap nilai mentah suatu field (sama dengan yang diakumulasi)"""
+        if field == "date":
+            return list(MetadataValidator.validate_dates_batch(values)["format"]) if values else []
+        return [self._form(field, value.strip() if field == "language" else value) for value in values]
+
+    def _form(self, field: str, value: str) -> str:
+        key = (field, value)
+        form = self._form_cache.get(key)
+        if form is None:
+            form = _language_form(value) if field == "language" else _creator_form(value)
+            if len(self._form_cache) >= 100000:
+                self._form_cache.clear()
+            self._form_cache[key] = form
+        return form
+
+    def merge(self, other: "ConsistencyAccumulator") -> "ConsistencyAccumulator":
+        """Gabungkan accumulator parsial (mis. dari shard lain)"""
+        self.records += other.records
+        for field, statistics in self.fields.items():
+            statistics.merge(other.fields[field])
+        return self
+
+    def to_state(self) -> Dict[str, Dict[str, Any]]:
+        """State per field untuk disimpan (lihat FieldStatistics.to_state)"""
+        return {field: statistics.to_state() for field, statistics in self.fields.items()}
+
+    def load_state(self, records: int, states: Dict[str, Dict[str, Any]]) -> "ConsistencyAccumulator":
+        """Lanjutkan akumulasi dari state yang tersimpan"""
+        self.records = records
+        for field, state in states.items():
+            if field in self.fields:
+                self.fields[field].load_state(state)
+        return self
+
+    def distinct_count(self, field: str) -> int:
+        """Perkiraan jumlah nilai unik suatu field"""
+        statistics = self.fields[field]
+        return round(statistics.distinct.count()) if statistics.count else 0
+
+    def estimate_frequency(self, field: str, value: str) -> int:
+        """Perkiraan frekuensi suatu nilai field"""
+        return self.fields[field].frequencies.estimate(value)
+
+    def consistency_scores(self) -> Dict[str, float]:
+        """Skor konsistensi dengan aturan yang sama seperti QualityMetrics"""
+        if self.records < 2:
+            return {"overall": 1.0}
+        consistency_scores = {
+            "date_format": 1.0 if len(self.fields["date"].formats) <= 1 else 0.5,
+            "language": 1.0 if self.distinct_count("language") <= 1 else 0.7
+        }
+        consistency_scores["overall"] = sum(consistency_scores.values()) / len(consistency_scores)
+        return consistency_scores
+
+    def summary(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Ringkasan per field: histogram format, perkiraan nilai unik dan top values"""
+        return {
+            "records": self.records,
+            "fields": {field: self.fields[field].summary() for field in (fields or self.FIELDS)},
+            "consistency": self.consistency_scores()
+        }
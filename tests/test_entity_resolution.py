@@ -0,0 +1,66 @@
+"""
+Regression test cluster entitas creator: instansi dengan wilayah berbeda tidak boleh digabung
+"""
+
+import pytest
+
+from entity_resolution import CreatorResolver, KnownCreators, creators_conflict, normalize_creator
+
+REGIONAL_FAMILIES = [
+    ["Dinas Pendidikan Kota Bogor", "Dinas Pendidikan Kota Bekasi", "Dinas Pendidikan Kota Bandung",
+     "Dinas Pendidikan Kabupaten Bandung"],
+    ["BPS Provinsi Jawa Barat", "BPS Provinsi Jawa Tengah", "BPS Provinsi Jawa Timur"],
+]
+
+
+def _clusters(names):
+    return [set(cluster.variants) for cluster in CreatorResolver().add_many(names).resolve()]
+
+
+@pytest.mark.parametrize("family", REGIONAL_FAMILIES)
+def test_regional_agencies_stay_separate(family):
+    assert _clusters(family) == []
+
+
+def test_regional_agencies_keep_their_own_variants():
+    names = [name for family in REGIONAL_FAMILIES for name in family]
+    names += ["Dinas Pendidikan Kab. Bandung", "Dinas Pendidikan Kota Bandng", "BPS Prov. Jawa Barat"]
+    clusters = _clusters(names)
+    assert {"Dinas Pendidikan Kabupaten Bandung", "Dinas Pendidikan Kab. Bandung"} in clusters
+    assert {"Dinas Pendidikan Kota Bandung", "Dinas Pendidikan Kota Bandng"} in clusters
+    assert {"BPS Provinsi Jawa Barat", "BPS Prov. Jawa Barat"} in clusters
+    assert len(clusters) == 3
+
+
+def test_spelling_variants_still_merge():
+    clusters = _clusters(["Departemen Keuangan", "Dept. Keuangan", "Departemen Keuangan RI",
+                          "Soekarno", "Ir. Sukarno", "Pemerintah Kota Bandung", "Pemkot Bandung"])
+    assert {"Departemen Keuangan", "Dept. Keuangan", "Departemen Keuangan RI"} in clusters
+    assert {"Soekarno", "Ir. Sukarno"} in clusters
+    assert {"Pemerintah Kota Bandung", "Pemkot Bandung"} in clusters
+
+
+def test_no_transitive_chaining():
+    # Setiap anggota harus mirip dengan kunci kanonik, bukan hanya dengan tetangganya
+    resolver = CreatorResolver().add_many(["Badan Arsip Daerah", "Badan Arsip Daerah Kota", "Badan Arsip"])
+    for cluster in resolver.resolve():
+        canonical = normalize_creator(cluster.canonical)
+        for variant in cluster.variants:
+            assert resolver.similarity(canonical, normalize_creator(variant)) >= resolver.threshold
+
+
+def test_conflicting_tokens():
+    assert creators_conflict("dinas pendidikan kota bandung", "dinas pendidikan kabupaten bandung")
+    assert creators_conflict("bps provinsi jawa barat", "bps provinsi jawa timur")
+    assert creators_conflict("dinas pendidikan kota bogor", "dinas pendidikan kota bekasi")
+    assert not creators_conflict("dinas pendidikan kota bandung", "dinas pendidikan kota bandng")
+
+
+@pytest.mark.parametrize("family", REGIONAL_FAMILIES)
+def test_incremental_assignment_keeps_regions_apart(family):
+    first, rest = family[0], family[1:]
+    known = KnownCreators([{"variant": first, "normalized": normalize_creator(first), "entity_id": 1,
+                            "occurrences": 5}])
+    entities = CreatorResolver().add_many(rest).assign_entities(known)
+    assert len({entities[normalize_creator(name)] for name in family if normalize_creator(name) in entities}
+               | {1}) == len(family)
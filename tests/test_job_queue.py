@@ -0,0 +1,134 @@
+"""
+Regression test JobQueue: lease kedaluwarsa, fencing token klaim dan retry item gagal
+"""
+
+import os
+
+import pytest
+
+from database import MetadataDatabase
+from job_queue import JobQueue
+
+
+def _queue(temp_dir, **kwargs):
+    queue = JobQueue(MetadataDatabase(os.path.join(temp_dir, "jobs.db")), **kwargs)
+    queue.register("echo", lambda payload, content: {"total_tokens": 0})
+    return queue
+
+
+def _job(queue, count=1):
+    return queue.enqueue("echo", [{"key": f"item-{i}", "payload": {"i": i}} for i in range(count)])
+
+
+def test_claim_sets_lease_and_token(temp_dir):
+    queue = _queue(temp_dir)
+    job_id = _job(queue, 2)
+    first, second = queue.claim(), queue.claim()
+    assert first["id"] != second["id"]
+    assert first["attempts"] == 1 and first["claim_token"] != second["claim_token"]
+    assert queue.claim() is None
+    assert queue.get_job_progress(job_id)["running"] == 2
+    assert queue.list_jobs()[0]["status"] == "running"
+
+
+def test_live_lease_is_not_reclaimed(temp_dir):
+    queue = _queue(temp_dir, lease_seconds=600)
+    _job(queue)
+    assert queue.claim() is not None
+    assert queue.claim() is None
+
+
+def test_expired_lease_is_reclaimed_and_stale_claim_is_fenced(temp_dir):
+    queue = _queue(temp_dir, lease_seconds=-1)
+    job_id = _job(queue)
+    stale = queue.claim()
+    current = queue.claim()
+    assert current["id"] == stale["id"]
+    assert current["attempts"] == 2
+    assert current["claim_token"] != stale["claim_token"]
+
+    # Worker lama tidak boleh menimpa hasil atau melepas klaim yang sudah diambil alih
+    assert queue.complete(stale, result={"worker": "stale"}) is False
+    assert queue.release(stale) is False
+    assert queue.get_job_items(job_id)[0]["status"] == "running"
+
+    assert queue.complete(current, result={"worker": "current"}) is True
+    item = queue.get_job_items(job_id)[0]
+    assert item["status"] == "done" and item["result"] == {"worker": "current"}
+    assert queue.list_jobs()[0]["status"] == "completed"
+
+
+def test_expired_lease_without_attempts_left_fails_item(temp_dir):
+    queue = _queue(temp_dir, lease_seconds=-1, max_attempts=2)
+    job_id = _job(queue)
+    queue.claim()
+    queue.claim()
+    assert queue.claim() is None
+    item = queue.get_job_items(job_id)[0]
+    assert item["status"] == "failed"
+    assert item["error"] == "Lease expired after 2 attempts"
+    assert queue.list_jobs()[0]["status"] == "completed"
+
+
+def test_release_keeps_attempt_count(temp_dir):
+    queue = _queue(temp_dir)
+    job_id = _job(queue)
+    item = queue.claim()
+    assert queue.release(item) is True
+    assert queue.release(item) is False
+    assert queue.get_job_items(job_id)[0]["attempts"] == 0
+    assert queue.claim()["attempts"] == 1
+
+
+@pytest.mark.parametrize("max_attempts,final_status", [(1, "failed"), (2, "done")])
+def test_handler_error_is_retried_until_attempts_run_out(temp_dir, max_attempts, final_status):
+    queue = _queue(temp_dir, max_attempts=max_attempts)
+    calls = []
+
+    def flaky(payload, content):
+        calls.append(payload["i"])
+        if len(calls) == 1:
+            raise RuntimeError("model error")
+        return {"total_tokens": 0}
+
+    queue.register("echo", flaky)
+    job_id = _job(queue)
+    while queue.process_next():
+        pass
+    item = queue.get_job_items(job_id)[0]
+    assert item["status"] == final_status
+    assert item["attempts"] == len(calls) == max_attempts
+
+
+def test_queue_budget_is_charged_once(temp_dir):
+    queue = _queue(temp_dir)
+    queue.set_token_budget(1000)
+
+    class Worker:
+        token_budget = None
+
+        def handle(self, payload, content):
+            # Handler dengan budget sendiri tidak membebani budget antrian
+            if self.token_budget is not None:
+                self.token_budget.charge(100)
+            return {"total_tokens": 100}
+
+    worker = Worker()
+    queue.register("echo", worker.handle)
+    _job(queue)
+    assert queue.process_next() is True
+    assert queue.token_budget.used == 100
+
+    worker.token_budget = queue.token_budget
+    _job(queue)
+    assert queue.process_next() is True
+    assert queue.token_budget.used == 200
+
+
+def test_exhausted_budget_stops_claiming(temp_dir):
+    queue = _queue(temp_dir)
+    queue.set_token_budget(10)
+    queue.token_budget.charge(10)
+    job_id = _job(queue)
+    assert queue.process_next() is False
+    assert queue.get_job_progress(job_id)["pending"] == 1
@@ -0,0 +1,103 @@
+"""
+Regression test record __slots__: round-trip dict/JSON/pickle tanpa kehilangan data
+"""
+
+import copy
+import pickle
+
+import pytest
+
+from records import (DublinCoreRecord, MetadataRecord, ValidationResultRecord, _ABSENT, metadata_records,
+                     validation_columns, validation_records)
+
+METADATA = {
+    "dublin_core": {"title": "Laporan Tahunan 2021", "creator": None, "subject": ["pendidikan"],
+                    "catatan_kurator": "dicek ulang"},
+    "isad_g": {},
+    "confidence_score": None,
+    "suggestions": [],
+    "model_version": "offline-heuristic",
+}
+
+VALIDATION = {
+    "is_valid": False,
+    "completeness_score": 0.5,
+    "missing_fields": ["date"],
+    "invalid_fields": [],
+    "warnings": None,
+    "field_validations": {"title": {"valid": True}},
+    "reviewer_note": "perlu tanggal",
+}
+
+
+@pytest.mark.parametrize("record_class,data", [(MetadataRecord, METADATA), (ValidationResultRecord, VALIDATION)])
+def test_dict_and_json_round_trip(record_class, data):
+    record = record_class.from_dict(data)
+    assert record.to_dict() == data
+    assert record_class.from_json(record.to_json()) == record
+    assert record_class.from_json(record.to_json()).to_dict() == data
+
+
+@pytest.mark.parametrize("record_class,data", [(MetadataRecord, METADATA), (ValidationResultRecord, VALIDATION)])
+def test_pickle_and_copy_keep_absent_singleton(record_class, data):
+    record = record_class.from_dict(data)
+    for restored in (pickle.loads(pickle.dumps(record)), copy.deepcopy(record)):
+        assert restored == record
+        assert restored.to_dict() == data
+    assert pickle.loads(pickle.dumps(_ABSENT)) is _ABSENT
+
+
+def test_lookup_follows_dict_semantics():
+    record = MetadataRecord.from_dict(METADATA)
+    assert isinstance(record["dublin_core"], DublinCoreRecord)
+    # Key bernilai None tetap ada; key yang tidak ada tidak
+    assert "confidence_score" in record and record["confidence_score"] is None
+    assert record.get("confidence_score", 1.0) is None
+    assert "extraction_notes" not in record and record.get("extraction_notes", "-") == "-"
+    with pytest.raises(KeyError):
+        record["extraction_notes"]
+    assert record["model_version"] == "offline-heuristic"
+    assert record.extra == {"model_version": "offline-heuristic"}
+
+    dublin_core = record["dublin_core"]
+    assert dublin_core.get("creator", "x") is None
+    assert dublin_core["catatan_kurator"] == "dicek ulang"
+    assert "date" not in dublin_core and "catatan_kurator" in dublin_core
+
+
+def test_constructor_keeps_unknown_keys_in_extra():
+    record = DublinCoreRecord(title="Surat Edaran", nomor="12/2020")
+    assert record.to_dict() == {"title": "Surat Edaran", "nomor": "12/2020"}
+    assert DublinCoreRecord(title="Surat Edaran").extra is None
+
+
+def test_empty_matches_agent_empty_structure():
+    data = MetadataRecord.empty().to_dict()
+    assert "extraction_notes" not in data
+    assert data["confidence_score"] == 0.0 and data["suggestions"] == []
+    assert data["dublin_core"]["title"] == ""
+    assert data["quality_metrics"] == {"completeness_score": 0.0, "richness_score": 0.0}
+    # Default list tidak dibagi antar record
+    first, second = MetadataRecord.empty(), MetadataRecord.empty()
+    first["suggestions"].append("tambahkan tanggal")
+    assert second["suggestions"] == []
+
+
+def test_metadata_records_converts_batch():
+    records = metadata_records([METADATA, {"confidence_score": 0.7}])
+    assert [record.to_dict() for record in records] == [METADATA, {"confidence_score": 0.7}]
+
+
+def test_validation_columns_round_trip():
+    columns = {
+        "is_valid": [True, False],
+        "completeness_score": [1.0, 0.25],
+        "missing_fields": [[], ["creator", "date"]],
+        "invalid_fields": [[], ["language"]],
+        "warnings": [[], [None]],
+    }
+    records = list(validation_records(columns))
+    assert records[1]["missing_fields"] == ["creator", "date"]
+    assert "recommendations" not in records[1]
+    assert records[1].to_dict() == {name: values[1] for name, values in columns.items()}
+    assert validation_columns(records) == columns
@@ -0,0 +1,92 @@
+"""
+Regression test ReviewQueue: klaim paralel tanpa tabrakan, lease kedaluwarsa dan kepemilikan klaim
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+from database import MetadataDatabase
+from review_queue import ReviewQueue, review_priority
+
+RECORD_COUNT = 40
+REVIEWERS = 8
+
+
+def _queue(temp_dir, count=RECORD_COUNT, **kwargs):
+    db = MetadataDatabase(os.path.join(temp_dir, "review.db"))
+    ids = [
+        db.save_metadata(f"dokumen-{i}.txt", {"title": f"Dokumen {i}", "confidence_score": (i % 10) / 10},
+                         "dublin_core")
+        for i in range(count)
+    ]
+    queue = ReviewQueue(db, **kwargs)
+    assert queue.sync()["added"] == count
+    return db, queue, ids
+
+
+def test_concurrent_claims_do_not_collide(temp_dir):
+    _, queue, ids = _queue(temp_dir)
+
+    def review(reviewer):
+        claimed = []
+        while True:
+            metadata_id = queue.claim(reviewer)
+            if metadata_id is None:
+                return claimed
+            claimed.append(metadata_id)
+            assert queue.complete(metadata_id, reviewer, "approved")
+
+    with ThreadPoolExecutor(max_workers=REVIEWERS) as executor:
+        results = list(executor.map(review, [f"reviewer-{i}" for i in range(REVIEWERS)]))
+    claimed = [metadata_id for result in results for metadata_id in result]
+    assert len(claimed) == len(set(claimed))
+    assert sorted(claimed) == sorted(ids)
+    assert queue.stats()["done"] == RECORD_COUNT
+
+
+def test_claim_returns_highest_priority_and_reuses_active_claim(temp_dir):
+    _, queue, ids = _queue(temp_dir)
+    # Confidence 0 dan kelengkapan belum diketahui: prioritas tertinggi, urut metadata_id
+    assert queue.peek(1)[0]["priority"] == review_priority(0.0, None)
+    first = queue.claim("ana")
+    assert first == ids[0]
+    assert queue.claim("ana") == first
+    assert queue.claim("budi") == ids[10]
+    assert queue.stats()["reviewers"] == {"ana": 1, "budi": 1}
+
+
+def test_expired_lease_returns_to_queue(temp_dir):
+    _, queue, _ = _queue(temp_dir, count=1, lease_seconds=-1)
+    metadata_id = queue.claim("ana")
+    assert queue.claim("budi") == metadata_id
+    # Klaim ana sudah diambil alih: feedback dari ana ditolak
+    assert queue.complete(metadata_id, "ana", "approved") is False
+    assert queue.complete(metadata_id, "budi", "approved") is True
+    assert queue.claim("ana") is None
+
+
+def test_complete_and_release_by_non_owner_return_false(temp_dir):
+    db, queue, _ = _queue(temp_dir, count=1)
+    metadata_id = queue.claim("ana")
+    assert queue.complete(metadata_id, "budi", "approved") is False
+    assert queue.release(metadata_id, "budi") is False
+    assert db.get_metadata_detail(metadata_id)["feedback"] == []
+
+    assert queue.release(metadata_id, "ana") is True
+    assert queue.stats()["pending"] == 1
+    assert queue.claim("budi") == metadata_id
+
+
+def test_sync_rescores_late_validation_and_external_feedback(temp_dir):
+    db, queue, ids = _queue(temp_dir, count=2)
+    before = {item["metadata_id"]: item["priority"] for item in queue.peek()}
+    db.save_validation_results([ids[0]], {"is_valid": [True], "completeness_score": [1.0],
+                                          "missing_fields": [[]], "invalid_fields": [[]]})
+    db.save_human_feedback(ids[1], "approved", "sudah dicek")
+    result = queue.sync()
+    assert result["added"] == 0
+    assert result["rescored"] == 1 and result["reviewed"] == 1
+    items = queue.peek()
+    assert [item["metadata_id"] for item in items] == [ids[0]]
+    assert items[0]["completeness_score"] == 1.0
+    assert items[0]["priority"] < before[ids[0]]
@@ -0,0 +1,100 @@
+"""
+Regression test merge shard: offset id, pemetaan foreign key, hash duplikat dan merge ulang
+"""
+
+import os
+import sqlite3
+
+from database import MetadataDatabase
+from shards import find_shards, init_shard, merge_shard, merge_shards, shard_path
+
+VALIDATION = {"is_valid": True, "completeness_score": 0.8, "missing_fields": [], "invalid_fields": []}
+
+
+def _save(db, file_hash, file_name):
+    metadata = {"dublin_core": {"title": file_name}, "confidence_score": 0.9}
+    return db.save_file_metadata(file_hash, file_name, metadata, "dublin_core", VALIDATION)[0]
+
+
+def _rows(db, sql):
+    conn = sqlite3.connect(db.db_path)
+    rows = conn.execute(sql).fetchall()
+    conn.close()
+    return rows
+
+
+def _setup(temp_dir):
+    db = MetadataDatabase(os.path.join(temp_dir, "metadata.db"))
+    _save(db, "hash-main-1", "utama-1.txt")
+    _save(db, "hash-main-2", "utama-2.txt")
+    shard = init_shard(shard_path(db.db_path, 0))
+    for file_hash, file_name in (("hash-shard-1", "shard-1.txt"), ("hash-main-2", "utama-2-salinan.txt"),
+                                 ("hash-shard-2", "shard-2.txt")):
+        _save(shard, file_hash, file_name)
+    shard.save_human_feedback(3, "approved", "ok")
+    return db, shard
+
+
+def test_shard_path_and_discovery(temp_dir):
+    db_path = os.path.join(temp_dir, "metadata.db")
+    paths = [shard_path(db_path, index) for index in (10, 2, 0)]
+    for path in paths:
+        init_shard(path)
+    assert paths[2].endswith("metadata.shard-0.db")
+    assert find_shards(db_path) == list(reversed(paths))
+
+
+def test_merge_offsets_ids_and_remaps_foreign_keys(temp_dir):
+    db, shard = _setup(temp_dir)
+    result = merge_shard(db, shard.db_path)
+    assert result["already_merged"] is False
+    assert result["id_offset"] == 2
+    assert result["records"] == 2 and result["skipped"] == 1
+
+    records = dict(_rows(db, "SELECT id, file_name FROM metadata_records"))
+    assert records == {1: "utama-1.txt", 2: "utama-2.txt", 3: "shard-1.txt", 5: "shard-2.txt"}
+    files = dict(_rows(db, "SELECT file_hash, metadata_id FROM ingested_files"))
+    assert files == {"hash-main-1": 1, "hash-main-2": 2, "hash-shard-1": 3, "hash-shard-2": 5}
+    validations = sorted(row[0] for row in _rows(db, "SELECT metadata_id FROM validation_results"))
+    assert validations == [1, 2, 3, 5]
+    assert _rows(db, "SELECT metadata_id, validation_status FROM human_feedback") == [(5, "approved")]
+    # Semua foreign key menunjuk record yang ada
+    assert _rows(db, '''
+        SELECT COUNT(*) FROM validation_results WHERE metadata_id NOT IN (SELECT id FROM metadata_records)
+    ''') == [(0,)]
+
+
+def test_offset_skips_ids_of_deleted_records(temp_dir):
+    db, shard = _setup(temp_dir)
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("DELETE FROM ingested_files WHERE metadata_id = 2")
+    conn.execute("DELETE FROM validation_results WHERE metadata_id = 2")
+    conn.execute("DELETE FROM metadata_records WHERE id = 2")
+    conn.commit()
+    conn.close()
+    result = merge_shard(db, shard.db_path)
+    assert result["id_offset"] == 2
+    assert result["skipped"] == 0
+    assert [row[0] for row in _rows(db, "SELECT id FROM metadata_records ORDER BY id")] == [1, 3, 4, 5]
+
+
+def test_remerge_is_idempotent(temp_dir):
+    db, shard = _setup(temp_dir)
+    first = merge_shard(db, shard.db_path)
+    before = _rows(db, "SELECT COUNT(*) FROM metadata_records")
+    again = merge_shard(db, shard.db_path)
+    assert again["already_merged"] is True
+    assert again["records"] == first["records"] and again["skipped"] == first["skipped"]
+    assert _rows(db, "SELECT COUNT(*) FROM metadata_records") == before
+    assert _rows(db, "SELECT COUNT(*) FROM shard_merges") == [(1,)]
+
+
+def test_merge_shards_removes_merged_files(temp_dir):
+    db, shard = _setup(temp_dir)
+    second = init_shard(shard_path(db.db_path, 1))
+    _save(second, "hash-shard-1", "shard-1-salinan.txt")
+    results = merge_shards(db, [shard.db_path, second.db_path], remove=True)
+    assert [result["records"] for result in results] == [2, 0]
+    assert results[1]["skipped"] == 1
+    assert find_shards(db.db_path) == []
+    assert db.get_statistics()["total_records"] == 4
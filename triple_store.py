@@ -0,0 +1,282 @@
+"""
+Triple store in-memory untuk eksplorasi graf metadata
+
+Field Dublin Core yang membentuk graf (creator, subject, coverage, relation)
+disimpan sebagai triple (subjek, predikat, objek). Setiap term di-intern
+menjadi integer dan triple diindeks tiga kali (SPO, POS, OSP) sehingga pola
+dengan posisi apapun yang terikat dijawab lewat lookup dict, bukan scan.
+Nilai relation yang sama dengan identifier/title record lain dipetakan ke
+IRI record tersebut sehingga rantai provenance dapat ditelusuri.
+"""
+
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import re
+import threading
+
+from database import MetadataDatabase
+from linked_data import DEFAULT_BASE_IRI, DUBLIN_CORE_PROPERTIES
+
+# Field yang dimasukkan ke graf
+GRAPH_FIELDS = ("title", "creator", "subject", "coverage", "relation", "identifier", "date")
+
+# Field multi-nilai dan pemisahnya
+MULTI_VALUE_FIELDS = ("subject", "coverage", "relation")
+_VALUE_SEPARATOR = re.compile(r"\s*[;|]\s*")
+
+Triple = Tuple[str, str, str]
+TriplePattern = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+def _is_variable(term: Optional[str]) -> bool:
+    return term is None or term.startswith("?")
+
+
+class TripleStore:
+    """Triple store dengan term ter-intern dan indeks SPO/POS/OSP"""
+
+    def __init__(self, base_iri: str = DEFAULT_BASE_IRI, fields: Sequence[str] = GRAPH_FIELDS):
+        self.base_iri = base_iri
+        self.fields = tuple(fields)
+        self.terms: List[str] = []
+        self.term_ids: Dict[str, int] = {}
+        self.spo: Dict[int, Dict[int, set]] = defaultdict(lambda: defaultdict(set))
+        self.pos: Dict[int, Dict[int, set]] = defaultdict(lambda: defaultdict(set))
+        self.osp: Dict[int, Dict[int, set]] = defaultdict(lambda: defaultdict(set))
+        self.size = 0
+        self.watermark = 0
+        # identifier/title -> IRI record, untuk menautkan dc:relation antar record
+        self._record_keys: Dict[str, str] = {}
+        self._pending_relations: Dict[str, List[int]] = defaultdict(list)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def intern(self, term: str) -> int:
+        """Id integer untuk term (dibuat jika belum ada)"""
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            term_id = self.term_ids[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def record_iri(self, record_id: int) -> str:
+        return f"{self.base_iri}{record_id}"
+
+    def add(self, subject: str, predicate: str, obj: str) -> bool:
+        """Tambahkan satu triple; False jika sudah ada"""
+        with self._lock:
+            s, p, o = self.intern(subject), self.intern(predicate), self.intern(obj)
+            objects = self.spo[s][p]
+            if o in objects:
+                return False
+            objects.add(o)
+            self.pos[p][o].add(s)
+            self.osp[o][s].add(p)
+            self.size += 1
+            return True
+
+    def remove(self, subject: str, predicate: str, obj: str) -> bool:
+        """Hapus satu triple; False jika tidak ada"""
+        with self._lock:
+            s, p, o = self.term_ids.get(subject), self.term_ids.get(predicate), self.term_ids.get(obj)
+            if s is None or p is None or o is None or o not in self.spo.get(s, {}).get(p, ()):
+                return False
+            for index, first, second, third in ((self.spo, s, p, o), (self.pos, p, o, s), (self.osp, o, s, p)):
+                inner = index[first]
+                inner[second].discard(third)
+                if not inner[second]:
+                    del inner[second]
+                if not inner:
+                    del index[first]
+            self.size -= 1
+            return True
+
+    def add_record(self, record_id: int, section: Dict[str, Any]):
+        """Tambahkan triple untuk field graf dari satu record Dublin Core"""
+        with self._lock:
+            subject = self.record_iri(record_id)
+            for key_field in ("identifier", "title"):
+                key = str(section.get(key_field) or "").strip()
+                if key:
+                    self._record_keys.setdefault(key, subject)
+                    # Relation yang sebelumnya menunjuk literal kini diarahkan ke record
+                    for source in self._pending_relations.pop(key, []):
+                        self.remove(self.terms[source], DUBLIN_CORE_PROPERTIES["relation"], key)
+                        self.add(self.terms[source], DUBLIN_CORE_PROPERTIES["relation"], subject)
+
+            for field in self.fields:
+                value = section.get(field)
+                if not value:
+                    continue
+                values = _VALUE_SEPARATOR.split(str(value)) if field in MULTI_VALUE_FIELDS else [str(value)]
+                predicate = DUBLIN_CORE_PROPERTIES[field]
+                for item in values:
+                    item = item.strip()
+                    if not item:
+                        continue
+                    if field == "relation":
+                        target = self._record_keys.get(item)
+                        if target is None:
+                            self._pending_relations[item].append(self.intern(subject))
+                            target = item
+                        self.add(subject, predicate, target)
+                    else:
+                        self.add(subject, predicate, item)
+
+    def sync(self, db: MetadataDatabase, batch_size: int = 10000) -> int:
+        """Tambahkan record baru dari database sejak sync terakhir"""
+        added = 0
+        with self._lock:
+            for batch in db.iter_metadata_sections("dublin_core", batch_size, after_id=self.watermark):
+                for section in batch:
+                    self.add_record(section["id"], section)
+                added += len(batch)
+                self.watermark = batch[-1]["id"]
+        return added
+
+    def count(self, subject: Optional[str] = None, predicate: Optional[str] = None, obj: Optional[str] = None) -> int:
+        """Jumlah triple yang cocok dengan pola (None = bebas)"""
+        return sum(1 for _ in self._match_ids(subject, predicate, obj))
+
+    def match(self, subject: Optional[str] = None, predicate: Optional[str] = None,
+              obj: Optional[str] = None) -> Iterator[Triple]:
+        """Triple yang cocok dengan pola; posisi None atau '?var' berarti bebas"""
+        terms = self.terms
+        for s, p, o in self._match_ids(subject, predicate, obj):
+            yield terms[s], terms[p], terms[o]
+
+    def _match_ids(self, subject: Optional[str], predicate: Optional[str], obj: Optional[str]) -> Iterator[Tuple[int, int, int]]:
+        bound = []
+        for term in (subject, predicate, obj):
+            if _is_variable(term):
+                bound.append(None)
+            else:
+                term_id = self.term_ids.get(term)
+                if term_id is None:
+                    return
+                bound.append(term_id)
+        s, p, o = bound
+
+        # Pilih indeks dengan posisi terikat paling depan
+        if s is not None:
+            predicates = self.spo.get(s, {})
+            for p_id in ([p] if p is not None else list(predicates)):
+                objects = predicates.get(p_id, ())
+                if o is not None:
+                    if o in objects:
+                        yield s, p_id, o
+                else:
+                    for o_id in list(objects):
+                        yield s, p_id, o_id
+        elif p is not None:
+            objects = self.pos.get(p, {})
+            for o_id in ([o] if o is not None else list(objects)):
+                for s_id in list(objects.get(o_id, ())):
+                    yield s_id, p, o_id
+        elif o is not None:
+            for s_id, predicates in list(self.osp.get(o, {}).items()):
+                for p_id in list(predicates):
+                    yield s_id, p_id, o
+        else:
+            for s_id, predicates in list(self.spo.items()):
+                for p_id, objects in list(predicates.items()):
+                    for o_id in list(objects):
+                        yield s_id, p_id, o_id
+
+    def query(self, patterns: Sequence[TriplePattern], limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """Jalankan basic graph pattern; variabel ditulis '?nama'
+
+        Contoh record oleh creator X yang berelasi dengan Y:
+        query([("?record", "dc:creator", "X"), ("?record", "dc:relation", "Y")])
+        """
+        results: List[Dict[str, str]] = []
+        with self._lock:
+            self._solve(list(patterns), {}, results, limit)
+        return results
+
+    def _solve(self, patterns: List[TriplePattern], binding: Dict[str, str], results: List[Dict[str, str]],
+               limit: Optional[int]):
+        if limit is not None and len(results) >= limit:
+            return
+        if not patterns:
+            results.append(dict(binding))
+            return
+
+        # Evaluasi pola paling selektif lebih dulu
+        resolved = [tuple(binding.get(term, term) if term else term for term in pattern) for pattern in patterns]
+        best = min(range(len(resolved)), key=lambda index: self._estimate(resolved[index]))
+        pattern, rest = resolved[best], patterns[:best] + patterns[best + 1:]
+
+        for triple in self.match(*pattern):
+            extended = dict(binding)
+            consistent = True
+            for term, value in zip(pattern, triple):
+                if term and term.startswith("?"):
+                    if extended.setdefault(term, value) != value:
+                        consistent = False
+                        break
+            if consistent:
+                self._solve(rest, extended, results, limit)
+                if limit is not None and len(results) >= limit:
+                    return
+
+    def _estimate(self, pattern: TriplePattern) -> int:
+        """Perkiraan kasar jumlah hasil pola untuk urutan join"""
+        s, p, o = (None if _is_variable(term) else self.term_ids.get(term, -1) for term in pattern)
+        if -1 in (s, p, o):
+            return 0
+        if s is not None:
+            return len(self.spo.get(s, {}).get(p, ())) if p is not None else sum(map(len, self.spo.get(s, {}).values()))
+        if o is not None:
+            return len(self.pos.get(p, {}).get(o, ())) if p is not None else len(self.osp.get(o, {}))
+        if p is not None:
+            return sum(map(len, self.pos.get(p, {}).values()))
+        return self.size
+
+    def traverse(self, start: str, predicates: Sequence[str] = (DUBLIN_CORE_PROPERTIES["relation"],),
+                 max_depth: int = 5) -> List[Tuple[int, str, str, str]]:
+        """Telusuri rantai relasi (mis. provenance) secara BFS dari satu term
+
+        Mengembalikan list (kedalaman, subjek, predikat, objek) dengan arah
+        keluar maupun masuk, tanpa mengunjungi term yang sama dua kali.
+        """
+        edges = []
+        with self._lock:
+            predicate_ids = {self.term_ids[p] for p in predicates if p in self.term_ids}
+            start_id = self.term_ids.get(start)
+            if start_id is None or not predicate_ids:
+                return edges
+            seen = {start_id}
+            visited_edges = set()
+            queue = deque([(start_id, 0)])
+            while queue:
+                node, depth = queue.popleft()
+                if depth >= max_depth:
+                    continue
+                outgoing = ((node, p, o, o) for p, objects in self.spo.get(node, {}).items() if p in predicate_ids for o in objects)
+                incoming = ((s, p, node, s) for s, preds in self.osp.get(node, {}).items() for p in preds if p in predicate_ids)
+                for s, p, o, neighbour in list(outgoing) + list(incoming):
+                    if (s, p, o) in visited_edges:
+                        continue
+                    visited_edges.add((s, p, o))
+                    edges.append((depth + 1, self.terms[s], self.terms[p], self.terms[o]))
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        queue.append((neighbour, depth + 1))
+        return edges
+
+
+_STORES: Dict[str, TripleStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_triple_store(db: MetadataDatabase) -> TripleStore:
+    """Triple store bersama per file database, disinkronkan dengan record terbaru"""
+    with _STORES_LOCK:
+        store = _STORES.get(db.db_path)
+        if store is None:
+            store = _STORES[db.db_path] = TripleStore()
+    store.sync(db)
+    return store
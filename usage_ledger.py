@@ -0,0 +1,199 @@
+"""
+Pencatatan pemakaian token dan biaya per panggilan model
+
+Setiap panggilan generate_content dicatat di tabel model_calls: jumlah token
+prompt/jawaban (dari response.usage_metadata), token dari context cache,
+latensi, nama model, versi template prompt, jenis file dan skema. Biaya
+dihitung saat pencatatan dari tabel harga sehingga riwayat tidak berubah
+bila harga diperbarui. Agregat per hari, jenis file, skema, model atau versi
+prompt dihitung di SQL.
+
+TokenBudget adalah batas token untuk satu run batch (CLI) atau antrian job;
+pemakaian diperiksa sebelum setiap panggilan model, sehingga batas dapat
+terlampaui paling banyak sebesar panggilan yang sedang berjalan bersamaan.
+"""
+
+from datetime import datetime
+from pathlib import PurePath
+from typing import Any, Dict, List, Optional
+import sqlite3
+import threading
+
+from database import MetadataDatabase, init_once
+
+# Harga USD per 1 juta token (input, output)
+MODEL_PRICING_PER_MILLION = {
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-flash-8b": (0.0375, 0.15),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "offline-heuristic": (0.0, 0.0)
+}
+
+# Token dari context cache ditagih sebagian dari harga input
+CACHED_INPUT_PRICE_RATIO = 0.25
+
+# Kolom pengelompokan yang diizinkan untuk usage_summary
+USAGE_GROUPS = {
+    "day": "substr(created_at, 1, 10)",
+    "file_type": "file_type",
+    "schema_type": "schema_type",
+    "model_name": "model_name",
+    "prompt_version": "prompt_version"
+}
+
+
+class TokenBudgetExceeded(Exception):
+    """Batas token tercapai; pekerjaan batch harus dihentikan"""
+
+
+class TokenBudget:
+    """Batas token yang aman antar thread untuk satu run atau antrian"""
+
+    def __init__(self, ceiling: int):
+        self.ceiling = ceiling
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def charge(self, tokens: int):
+        with self._lock:
+            self.used += tokens
+
+    @property
+    def remaining(self) -> int:
+        return max(self.ceiling - self.used, 0)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.used >= self.ceiling
+
+    def check(self):
+        """Lempar TokenBudgetExceeded bila batas sudah tercapai"""
+        if self.exhausted:
+            raise TokenBudgetExceeded(f"Token budget exhausted: {self.used}/{self.ceiling} tokens used")
+
+
+def file_type_of(file_name: str) -> str:
+    """Jenis file dari ekstensi nama file ('text' untuk input tanpa ekstensi)"""
+    return PurePath(file_name).suffix.lstrip(".").lower() or "text"
+
+
+def estimate_cost(model_name: str, prompt_tokens: int, response_tokens: int, cached_tokens: int = 0) -> float:
+    """Biaya USD satu panggilan; model tanpa harga dihitung 0"""
+    input_price, output_price = MODEL_PRICING_PER_MILLION.get(model_name, (0.0, 0.0))
+    billed_input = (prompt_tokens - cached_tokens) + cached_tokens * CACHED_INPUT_PRICE_RATIO
+    return (billed_input * input_price + response_tokens * output_price) / 1_000_000
+
+
+class UsageLedger:
+    """Tabel model_calls beserta query agregat pemakaian"""
+
+    def __init__(self, db: MetadataDatabase):
+        self.db_path = db.db_path
+        # Agent dibuat ulang setiap rerun Streamlit; DDL cukup sekali per file database
+        init_once(self.db_path, "usage", lambda: self.init_tables(self.db_path))
+
+    @staticmethod
+    def init_tables(db_path: str):
+        """Buat tabel model_calls"""
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS model_calls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                file_name TEXT,
+                file_type TEXT,
+                schema_type TEXT,
+                model_name TEXT,
+                prompt_version TEXT,
+                prompt_tokens INTEGER DEFAULT 0,
+                response_tokens INTEGER DEFAULT 0,
+                cached_tokens INTEGER DEFAULT 0,
+                total_tokens INTEGER DEFAULT 0,
+                cache_hit BOOLEAN DEFAULT 0,
+                latency_ms REAL,
+                cost_usd REAL DEFAULT 0,
+                status TEXT DEFAULT 'ok',
+                created_at TIMESTAMP
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_model_calls_created ON model_calls (created_at)")
+        conn.commit()
+        conn.close()
+
+    def record(self, model_name: str, prompt_version: str, usage: Any, latency_ms: float, file_name: str = "",
+               schema_type: str = "", status: str = "ok") -> Dict[str, Any]:
+        """Catat satu panggilan model; usage adalah response.usage_metadata (boleh None)"""
+        prompt_tokens = int(getattr(usage, "prompt_token_count", 0) or 0)
+        response_tokens = int(getattr(usage, "candidates_token_count", 0) or 0)
+        cached_tokens = int(getattr(usage, "cached_content_token_count", 0) or 0)
+        call = {
+            "file_name": file_name,
+            "file_type": file_type_of(file_name),
+            "schema_type": schema_type,
+            "model_name": model_name,
+            "prompt_version": prompt_version,
+            "prompt_tokens": prompt_tokens,
+            "response_tokens": response_tokens,
+            "cached_tokens": cached_tokens,
+            "total_tokens": int(getattr(usage, "total_token_count", 0) or 0) or prompt_tokens + response_tokens,
+            "cache_hit": cached_tokens > 0,
+            "latency_ms": round(latency_ms, 2),
+            "cost_usd": estimate_cost(model_name, prompt_tokens, response_tokens, cached_tokens),
+            "status": status,
+            "created_at": datetime.now().isoformat(sep=" ", timespec="seconds")
+        }
+        columns = ", ".join(call)
+        placeholders = ", ".join("?" for _ in call)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute(f"INSERT INTO model_calls ({columns}) VALUES ({placeholders})", list(call.values()))
+        conn.commit()
+        conn.close()
+        return call
+
+    def usage_summary(self, group_by: str = "day", since: Optional[str] = None,
+                      limit: int = 100) -> List[Dict[str, Any]]:
+        """Jumlah panggilan, token, biaya, latensi rata-rata dan cache hit per kelompok
+
+        Hari diurutkan dari yang terbaru, kelompok lain dari token terbanyak.
+        """
+        if group_by not in USAGE_GROUPS:
+            raise ValueError(f"Unknown usage group: {group_by}")
+        where, params = ("WHERE created_at >= ?", [since]) if since else ("", [])
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {USAGE_GROUPS[group_by]} AS "group",
+                   COUNT(*) AS calls,
+                   SUM(status != 'ok') AS errors,
+                   SUM(prompt_tokens) AS prompt_tokens,
+                   SUM(response_tokens) AS response_tokens,
+                   SUM(total_tokens) AS total_tokens,
+                   SUM(cost_usd) AS cost_usd,
+                   AVG(latency_ms) AS avg_latency_ms,
+                   SUM(cache_hit) AS cache_hits
+            FROM model_calls {where}
+            GROUP BY 1
+            ORDER BY {"1 DESC" if group_by == "day" else "total_tokens DESC"}
+            LIMIT ?
+        ''', params + [limit])
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        for row in rows:
+            row["cost_usd"] = round(row["cost_usd"] or 0.0, 6)
+            row["avg_latency_ms"] = round(row["avg_latency_ms"] or 0.0, 2)
+        return rows
+
+    def totals(self, since: Optional[str] = None) -> Dict[str, Any]:
+        """Total pemakaian (opsional sejak tanggal/waktu tertentu)"""
+        where, params = ("WHERE created_at >= ?", [since]) if since else ("", [])
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT COUNT(*), COALESCE(SUM(total_tokens), 0), COALESCE(SUM(cost_usd), 0), COALESCE(SUM(cache_hit), 0)
+            FROM model_calls {where}
+        ''', params)
+        calls, tokens, cost, cache_hits = cursor.fetchone()
+        conn.close()
+        return {"calls": calls, "total_tokens": tokens, "cost_usd": round(cost, 6), "cache_hits": cache_hits}
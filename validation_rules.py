@@ -0,0 +1,222 @@
+"""
+Rule engine validasi metadata deklaratif
+
+Aturan per skema ditulis sebagai data (field -> jenis aturan) lalu
+dikompilasi sekali menjadi dispatch table. Engine mengevaluasi semua aturan
+dalam satu pass: kelengkapan dihitung bersamaan dengan pemeriksaan field.
+Untuk batch, kolom tanggal dan bahasa divalidasi tervektorisasi dan hasilnya
+dikembalikan dalam bentuk kolom yang bisa langsung di-bulk-insert lewat
+MetadataDatabase.save_validation_results.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from schemas import get_schema
+from utils import MetadataValidator
+
+# Setiap field skema wajib diisi; aturan di bawah menambah pemeriksaan format
+VALIDATION_RULES = {
+    "dublin_core": {
+        "date": "date",
+        "language": "language",
+        "creator": "creator"
+    },
+    "isad_g": {
+        "date": "date",
+        "language_of_material": "language",
+        "name_of_creator": "creator"
+    }
+}
+
+# Ambang kelengkapan untuk rekomendasi
+COMPLETENESS_THRESHOLD = 0.7
+
+FieldCheck = Tuple[Dict[str, Any], List[str], List[str]]
+
+
+class RuleKind(NamedTuple):
+    """Pasangan checker satu nilai dan checker satu kolom untuk jenis aturan"""
+    check: Callable[[str], FieldCheck]
+    check_batch: Callable[[List[str]], Tuple[List[List[str]], List[List[str]]]]
+
+
+def _check_present(value: str) -> FieldCheck:
+    return {"status": "valid", "value": value}, [], []
+
+
+def _check_present_batch(values: List[str]) -> Tuple[List[List[str]], List[List[str]]]:
+    return [[] for _ in values], [[] for _ in values]
+
+
+def _date_warning(value: str, standardized: str) -> str:
+    return f"Ambiguous date '{value}' interpreted as {standardized}"
+
+
+def _check_date(value: str) -> FieldCheck:
+    result = MetadataValidator.validate_date_format(value)
+    result["status"] = "valid" if result["is_valid"] else "invalid"
+    warnings = [_date_warning(value, result["standardized"])] if result["ambiguous"] and result["is_valid"] else []
+    return result, list(result["errors"]), warnings
+
+
+def _check_date_batch(values: List[str]) -> Tuple[List[List[str]], List[List[str]]]:
+    result = MetadataValidator.validate_dates_batch(values)
+    invalid = [[error] if error else [] for error in result["errors"]]
+    warnings = [
+        [_date_warning(value, standardized)] if ambiguous and valid else []
+        for value, standardized, ambiguous, valid in zip(
+            values, result["standardized"], result["ambiguous"], result["is_valid"]
+        )
+    ]
+    return invalid, warnings
+
+
+def _language_warning(value: str, suggestion: str) -> str:
+    return f"Language code '{value}' may not be standard. {suggestion}"
+
+
+_UNKNOWN_LANGUAGE_SUGGESTION = MetadataValidator.validate_language_code("")["suggestion"]
+
+
+def _check_language(value: str) -> FieldCheck:
+    result = MetadataValidator.validate_language_code(value)
+    result["status"] = "valid" if result["is_valid"] else "warning"
+    warnings = [] if result["is_valid"] else [_language_warning(value, result["suggestion"])]
+    return result, [], warnings
+
+
+def _check_language_batch(values: List[str]) -> Tuple[List[List[str]], List[List[str]]]:
+    result = MetadataValidator.validate_language_codes_batch(values)
+    warnings = [
+        [] if valid else [_language_warning(value, _UNKNOWN_LANGUAGE_SUGGESTION)]
+        for value, valid in zip(values, result["is_valid"])
+    ]
+    return [[] for _ in values], warnings
+
+
+def _check_creator(value: str) -> FieldCheck:
+    result = MetadataValidator.validate_creator_format(value)
+    result["status"] = "warning" if result["suggestions"] else "valid"
+    return result, [], list(result["suggestions"])
+
+
+def _check_creator_batch(values: List[str]) -> Tuple[List[List[str]], List[List[str]]]:
+    # Nama creator sangat berulang di arsip; validasi tiap nilai unik sekali
+    suggestions = {value: MetadataValidator.validate_creator_format(value)["suggestions"] for value in set(values)}
+    return [[] for _ in values], [list(suggestions[value]) for value in values]
+
+
+RULE_KINDS = {
+    "present": RuleKind(_check_present, _check_present_batch),
+    "date": RuleKind(_check_date, _check_date_batch),
+    "language": RuleKind(_check_language, _check_language_batch),
+    "creator": RuleKind(_check_creator, _check_creator_batch)
+}
+
+
+def _field_value(section: Dict[str, Any], field: str) -> str:
+    """Nilai field sebagai string ter-strip ('' jika kosong)"""
+    value = section.get(field, "")
+    return str(value).strip() if value else ""
+
+
+class ValidationEngine:
+    """Validator metadata berbasis aturan yang dikompilasi per skema"""
+
+    def __init__(self, schema_type: str = "dublin_core", schema_fields: Optional[Dict[str, str]] = None,
+                 rules: Optional[Dict[str, str]] = None):
+        self.schema_type = schema_type
+        self.schema_fields = dict(schema_fields if schema_fields is not None else get_schema(schema_type))
+        rules = rules if rules is not None else VALIDATION_RULES.get(schema_type, {})
+
+        unknown = set(rules.values()) - set(RULE_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown validation rule kinds: {sorted(unknown)}")
+
+        # Dispatch table: (field, checker) untuk setiap field skema
+        self.dispatch: Tuple[Tuple[str, RuleKind], ...] = tuple(
+            (field, RULE_KINDS[rules.get(field, "present")]) for field in self.schema_fields
+        )
+
+    def validate(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Validasi satu record metadata dalam satu pass"""
+        section = metadata.get(self.schema_type, {}) or {}
+        missing_fields: List[str] = []
+        invalid_fields: List[str] = []
+        warnings: List[str] = []
+        field_validations: Dict[str, Dict[str, Any]] = {}
+
+        for field, rule in self.dispatch:
+            value = _field_value(section, field)
+            if not value:
+                missing_fields.append(field)
+                field_validations[field] = {
+                    "status": "missing",
+                    "message": f"Field {field} is required but empty"
+                }
+                continue
+            field_validation, invalid, field_warnings = rule.check(value)
+            field_validations[field] = field_validation
+            invalid_fields.extend(invalid)
+            warnings.extend(field_warnings)
+
+        total = len(self.dispatch)
+        return {
+            "is_valid": not missing_fields and not invalid_fields,
+            "missing_fields": missing_fields,
+            "invalid_fields": invalid_fields,
+            "warnings": warnings,
+            "field_validations": field_validations,
+            "completeness_score": (total - len(missing_fields)) / total if total else 0.0,
+            "recommendations": self.recommendations(total - len(missing_fields), total, bool(invalid_fields))
+        }
+
+    def validate_many(self, records: Iterable[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """Validasi banyak record sekaligus dan kembalikan hasil kolumnar
+
+        Setiap field dibaca sebagai satu kolom dan aturannya dievaluasi per
+        kolom (tanggal dan bahasa tervektorisasi).
+        Kunci hasil: is_valid, completeness_score, missing_fields,
+        invalid_fields, warnings - masing-masing list sejajar input.
+        """
+        sections = [record.get(self.schema_type, {}) or {} for record in records]
+        count = len(sections)
+        missing_fields: List[List[str]] = [[] for _ in range(count)]
+        invalid_fields: List[List[str]] = [[] for _ in range(count)]
+        warnings: List[List[str]] = [[] for _ in range(count)]
+
+        for field, rule in self.dispatch:
+            column = [str(value).strip() if (value := section.get(field)) else "" for section in sections]
+            present = [row for row, value in enumerate(column) if value]
+            if len(present) < count:
+                present_rows = set(present)
+                for row in range(count):
+                    if row not in present_rows:
+                        missing_fields[row].append(field)
+            if not present or rule is RULE_KINDS["present"]:
+                continue
+            invalid, field_warnings = rule.check_batch([column[row] for row in present])
+            for row, row_invalid, row_warnings in zip(present, invalid, field_warnings):
+                if row_invalid:
+                    invalid_fields[row].extend(row_invalid)
+                if row_warnings:
+                    warnings[row].extend(row_warnings)
+
+        total = len(self.dispatch)
+        return {
+            "is_valid": [not missing and not invalid for missing, invalid in zip(missing_fields, invalid_fields)],
+            "completeness_score": [(total - len(missing)) / total if total else 0.0 for missing in missing_fields],
+            "missing_fields": missing_fields,
+            "invalid_fields": invalid_fields,
+            "warnings": warnings
+        }
+
+    @staticmethod
+    def recommendations(filled: int, total: int, has_invalid: bool) -> List[str]:
+        """Rekomendasi perbaikan berdasarkan kelengkapan dan field tidak valid"""
+        recommendations = []
+        if total and filled / total < COMPLETENESS_THRESHOLD:
+            recommendations.append("Consider filling more metadata fields to improve discoverability")
+        if has_invalid:
+            recommendations.append("Fix invalid field formats for better data quality")
+        return recommendations